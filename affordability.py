@@ -0,0 +1,171 @@
+import heapq
+
+from building_store import BUILDING_TYPE_TABLE, TYPE_IDS_BY_NAME, CompactBuildingStore
+from game import BUILDING_CLASSES, get_production_rates
+from research import RESEARCH_PROJECTS
+
+# Resources may drift from the linear prediction by float rounding alone;
+# anything larger means something (an event, a purchase) changed them.
+DRIFT_TOLERANCE = 1e-6
+
+
+def seconds_to_afford(cost, resources, rates):
+    """Seconds until `resources` growing at `rates` cover `cost`, 0.0 if
+    affordable now and None if a missing resource is not being produced."""
+    wait = 0.0
+    for resource_name, needed in cost.items():
+        have = resources.get(resource_name, 0.0)
+        if needed > have:
+            rate = rates.get(resource_name, 0.0)
+            if rate <= 0:
+                return None
+            wait = max(wait, (needed - have) / rate)
+    return wait
+
+
+class AffordabilityScheduler:
+    """
+    Knows when every build, upgrade and research option becomes affordable.
+
+    Production is linear between mutations, so each option's "affordable at"
+    time (in colony time, see Colony.elapsed_time) is computed once and kept
+    in a min-heap. The schedule is only rebuilt when the colony's resources
+    or rates stop following that straight line, i.e. after a purchase, an
+    event or a building change.
+
+    Option keys are ("build", name), ("upgrade", (name, level)) and
+    ("research", project_id). Every building of one type and level costs
+    the same to upgrade, so upgrades are scheduled once per distinct
+    (name, level) rather than once per building, and a rebuild does not
+    grow with the colony. ("upgrade", building_index) is accepted wherever
+    a key is and stands for that building's group; resolve() picks a
+    concrete building for a group once the option is acted on.
+    """
+
+    def __init__(self, colony):
+        self.colony = colony
+        self.affordable_at = {}
+        self._groups = None
+        self._groups_stamp = None
+        self._heap = []
+        self._base_time = None
+        self._base_resources = None
+        self._base_rates = None
+        self.rebuild_count = 0
+
+    def _options(self):
+        colony = self.colony
+        for name, building_class in BUILDING_CLASSES.items():
+            if name in colony.unlocked_buildings:
+                yield ("build", name), building_class.BASE_COST
+        for name, level in self._upgrade_groups():
+            yield ("upgrade", (name, level)), BUILDING_TYPE_TABLE[TYPE_IDS_BY_NAME[name]].upgrade_cost(level)
+        for project_id, project in RESEARCH_PROJECTS.items():
+            if project_id not in colony.completed_research:
+                yield ("research", project_id), {"ResearchPoints": project["cost"]}
+
+    def _upgrade_groups(self):
+        """The distinct (name, level) pairs of the colony's buildings, rescanned only after building changes."""
+        colony = self.colony
+        versions = colony.versions
+        stamp = (versions, versions.building_change_count, len(colony.buildings))
+        if self._groups_stamp != stamp:
+            buildings = colony.buildings
+            if isinstance(buildings, CompactBuildingStore):
+                pairs = set(zip(buildings.type_ids, buildings.levels))
+                self._groups = {(BUILDING_TYPE_TABLE[type_id].name, level) for type_id, level in pairs}
+            else:
+                self._groups = {(building.name, building.level) for building in buildings}
+            self._groups_stamp = stamp
+        return self._groups
+
+    def _group_key(self, key):
+        """Maps ("upgrade", building_index) to the building's group key; other keys are returned as is."""
+        if key[0] != "upgrade" or not isinstance(key[1], int):
+            return key
+        buildings = self.colony.buildings
+        if not 0 <= key[1] < len(buildings):
+            return None
+        building = buildings[key[1]]
+        return ("upgrade", (building.name, building.level))
+
+    def resolve(self, key):
+        """
+        The option to act on for key: ("upgrade", index) of the first
+        building in an upgrade group (None if there is none any more), any
+        other key as is.
+        """
+        if key[0] != "upgrade" or isinstance(key[1], int):
+            return key
+        name, level = key[1]
+        buildings = self.colony.buildings
+        if isinstance(buildings, CompactBuildingStore):
+            type_id = TYPE_IDS_BY_NAME[name]
+            for index, (building_type, building_level) in enumerate(zip(buildings.type_ids, buildings.levels)):
+                if building_type == type_id and building_level == level:
+                    return ("upgrade", index)
+        else:
+            for index, building in enumerate(buildings):
+                if building.name == name and building.level == level:
+                    return ("upgrade", index)
+        return None
+
+    def _is_stale(self, now):
+        if self._base_time is None or now < self._base_time:
+            return True
+        rates = get_production_rates(self.colony)
+        if rates != self._base_rates:
+            return True
+        elapsed = now - self._base_time
+        for resource_name, amount in self.colony.resources.items():
+            expected = self._base_resources.get(resource_name, 0.0) + rates.get(resource_name, 0.0) * elapsed
+            if abs(amount - expected) > DRIFT_TOLERANCE * max(1.0, abs(expected)):
+                return True
+        return False
+
+    def rebuild(self, now=None):
+        """Recomputes every option's affordable-at time from the current state."""
+        now = self.colony.elapsed_time if now is None else now
+        resources = dict(self.colony.resources)
+        rates = get_production_rates(self.colony)
+        self.affordable_at = {}
+        self._heap = []
+        for key, cost in self._options():
+            wait = seconds_to_afford(cost, resources, rates)
+            when = None if wait is None else now + wait
+            self.affordable_at[key] = when
+            if when is not None and wait > 0:
+                self._heap.append((when, key))
+        heapq.heapify(self._heap)
+        self._base_time, self._base_resources, self._base_rates = now, resources, rates
+        self.rebuild_count += 1
+
+    def refresh(self, now=None):
+        """Rebuilds the schedule only if the colony changed discontinuously."""
+        now = self.colony.elapsed_time if now is None else now
+        if self._is_stale(now):
+            self.rebuild(now)
+        return now
+
+    def is_affordable(self, key, now=None):
+        now = self.refresh(now)
+        when = self.affordable_at.get(self._group_key(key))
+        return when is not None and when <= now + DRIFT_TOLERANCE
+
+    def seconds_until(self, key, now=None):
+        """Seconds until the option is affordable (0.0 if it is now), or None if never at current rates."""
+        now = self.refresh(now)
+        when = self.affordable_at.get(self._group_key(key))
+        return None if when is None else max(0.0, when - now)
+
+    def next_unlock(self, now=None):
+        """Returns (seconds_from_now, key) for the next option that becomes
+        affordable, or None if nothing else will unlock at current rates."""
+        now = self.refresh(now)
+        heap = self._heap
+        while heap and heap[0][0] <= now + DRIFT_TOLERANCE:
+            heapq.heappop(heap) # Already affordable
+        if not heap:
+            return None
+        when, key = heap[0]
+        return when - now, key
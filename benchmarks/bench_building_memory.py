@@ -0,0 +1,50 @@
+"""Memory benchmark: list of Building objects vs CompactBuildingStore.
+
+Run from the project root:
+
+    python benchmarks/bench_building_memory.py [building_count]
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from colony import Colony
+from building_store import BUILDING_TYPES
+
+
+def fill_colony(colony, count):
+    for i in range(count):
+        building = BUILDING_TYPES[i % len(BUILDING_TYPES)]()
+        building.level = 1 + i % 7
+        colony.add_building(building)
+
+
+def measure(compact, count):
+    tracemalloc.start()
+    start = time.perf_counter()
+    colony = Colony(compact_buildings=compact)
+    fill_colony(colony, count)
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return colony, current, peak, elapsed
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    print(f"Buildings: {count}")
+    for label, compact in (("list of objects", False), ("compact store", True)):
+        colony, current, peak, elapsed = measure(compact, count)
+        print(
+            f"{label:>16}: {current / 1024 / 1024:8.2f} MiB retained "
+            f"({current / count:6.1f} B/building), peak {peak / 1024 / 1024:8.2f} MiB, "
+            f"fill {elapsed:.2f}s"
+        )
+        del colony
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Event sampling benchmark: EventRegistry alias tables vs random.choices.
+
+Registers hundreds of weighted event types, some with cooldowns or
+predicates, and reports draws per second. Run from the project root:
+
+    python benchmarks/bench_event_sampling.py [event_types] [draws]
+"""
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from colony import Colony
+from events import MinorResourceBoost
+from event_registry import EventRegistry
+
+
+def build_registry(event_types, conditional_share):
+    rng = random.Random(0)
+    registry = EventRegistry()
+    classes, weights = [], []
+    for index in range(event_types):
+        event_class = type(f"BenchEvent{index}", (MinorResourceBoost,), {})
+        weight = rng.uniform(0.1, 10.0)
+        if index < event_types * conditional_share:
+            registry.register(event_class, weight, cooldown=rng.uniform(30.0, 600.0))
+        else:
+            registry.register(event_class, weight)
+        classes.append(event_class)
+        weights.append(weight)
+    return registry, classes, weights
+
+
+def main():
+    event_types = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    draws = int(sys.argv[2]) if len(sys.argv) > 2 else 200_000
+    print(f"Event types: {event_types}, draws: {draws}")
+
+    for share in (0.0, 0.02):
+        registry, classes, weights = build_registry(event_types, share)
+        colony = Colony(seed=1)
+        rng = random.Random(1)
+        start = time.perf_counter()
+        for draw in range(draws):
+            colony.elapsed_time = draw * 10.0 # One draw per event check
+            registry.choose(colony, rng)
+        elapsed = time.perf_counter() - start
+        print(
+            f"registry ({share:4.0%} with cooldowns): {draws / elapsed:12,.0f} draws/s, "
+            f"{registry.table_builds} alias tables built"
+        )
+
+    rng = random.Random(1)
+    start = time.perf_counter()
+    for _ in range(draws):
+        rng.choices(classes, weights)
+    elapsed = time.perf_counter() - start
+    print(f"random.choices (no cooldowns): {draws / elapsed:12,.0f} draws/s")
+
+
+if __name__ == "__main__":
+    main()
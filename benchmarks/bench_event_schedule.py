@@ -0,0 +1,54 @@
+"""Event scheduling benchmark: many colonies on one Poisson event schedule.
+
+Puts every colony's next event on an EventSchedule, then simulates ten
+minutes (by default) of server time, touching a colony only when its event
+is due. Reports how many colony wake-ups that took against fixed-interval
+polling of every colony. Run from the project root:
+
+    python benchmarks/bench_event_schedule.py [colonies] [seconds]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from colony import Colony
+from event_schedule import EventSchedule
+from game import fast_forward, seconds_until_event, EVENT_CHECK_INTERVAL
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    duration = float(sys.argv[2]) if len(sys.argv) > 2 else 600.0
+    colonies = [Colony(seed=index) for index in range(count)]
+
+    start = time.perf_counter()
+    schedule = EventSchedule()
+    for colony_id, colony in enumerate(colonies):
+        schedule.push(colony_id, seconds_until_event(colony))
+    setup = time.perf_counter() - start
+
+    start = time.perf_counter()
+    wake_ups = 0
+    now = 0.0
+    while True:
+        now = schedule.next_due()
+        if now is None or now > duration:
+            break
+        for colony_id in schedule.pop_due(now):
+            colony = colonies[colony_id]
+            fast_forward(colony, now - colony.elapsed_time) # Credits production and fires the due event
+            schedule.push(colony_id, now + seconds_until_event(colony))
+            wake_ups += 1
+    elapsed = time.perf_counter() - start
+
+    polls = int(count * duration / EVENT_CHECK_INTERVAL)
+    print(f"Colonies: {count}, simulated {duration:.0f} s")
+    print(f"Scheduling every colony: {setup * 1000:.1f} ms")
+    print(f"Event wake-ups: {wake_ups} in {elapsed:.2f} s ({wake_ups / max(elapsed, 1e-9):.0f}/s)")
+    print(f"Fixed {EVENT_CHECK_INTERVAL:.0f} s polling would check {polls} times ({polls / max(wake_ups, 1):.1f}x as many)")
+
+
+if __name__ == "__main__":
+    main()
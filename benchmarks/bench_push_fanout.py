@@ -0,0 +1,107 @@
+"""Push stream benchmark: thousands of subscribers on colony update feeds.
+
+Subscribes 5000 clients (by default) to the feeds of a few colonies, one in
+ten of them slow (half a second per message), and changes a colony five
+times a second for ten seconds while everyone also gets resource ticks.
+Reports how long a change takes to reach every fast subscriber, and how many
+messages were delivered against how many had to be built and serialized.
+Runs the UpdateHub in process, without the web server. Run from the project
+root:
+
+    python benchmarks/bench_push_fanout.py [subscribers] [colonies] [seconds]
+"""
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from buildings import Mine
+from colony import Colony
+from colony_sessions import ColonySession
+from colony_updates import UpdateHub
+
+TICK_RATE = 2.0        # Resource ticks per second asked for by each subscriber
+CHANGES_PER_SECOND = 5
+SLOW_EVERY = 10        # Every tenth subscriber is slow
+SLOW_SECONDS = 0.5
+
+
+async def consume(subscriber, slow, totals):
+    while True:
+        message = await subscriber.next_message()
+        if message is None:
+            return
+        totals["messages"] += 1
+        totals["bytes"] += len(message)
+        if slow:
+            await asyncio.sleep(SLOW_SECONDS)
+
+
+async def run_benchmark(subscriber_count, colony_count, duration):
+    sessions = {index: ColonySession(index, Colony(seed=index)) for index in range(colony_count)}
+
+    async def run(key, action):
+        session = sessions[key]
+        with session.lock:
+            session.advance()
+            return action(session)
+
+    hub = UpdateHub(run)
+    totals = {"messages": 0, "bytes": 0}
+    subscribers, consumers = [], []
+    start = time.perf_counter()
+    for index in range(subscriber_count):
+        subscriber = hub.subscribe(index % colony_count, TICK_RATE)
+        slow = index % SLOW_EVERY == 0
+        subscribers.append((subscriber, slow))
+        consumers.append(asyncio.create_task(consume(subscriber, slow, totals)))
+    while any(subscriber.version is None for subscriber, _ in subscribers):
+        await asyncio.sleep(0.01)
+    print(f"Subscribed {subscriber_count} clients to {colony_count} colonies in {time.perf_counter() - start:.2f} s")
+
+    fast = [subscriber for subscriber, slow in subscribers if not slow]
+    latencies = []
+    built_before = hub.messages_built
+    start = time.perf_counter()
+    change = 0
+    while time.perf_counter() - start < duration:
+        key = change % colony_count
+        session = sessions[key]
+        with session.lock:
+            session.colony.add_buildings(Mine, 1)
+        changed_at = time.perf_counter()
+        watched = [(subscriber, subscriber.messages_sent) for subscriber in fast if subscriber._feed.key == key]
+        hub.notify(key)
+        while any(subscriber.messages_sent == sent for subscriber, sent in watched):
+            await asyncio.sleep(0.001)
+        latencies.append(time.perf_counter() - changed_at)
+        change += 1
+        await asyncio.sleep(max(0.0, change / CHANGES_PER_SECOND - (time.perf_counter() - start)))
+    elapsed = time.perf_counter() - start
+    built = hub.messages_built - built_before
+
+    for key in sessions:
+        hub.close(key)
+    await asyncio.gather(*consumers)
+
+    print(f"Changes: {change} in {elapsed:.1f} s; delivery to every fast subscriber: "
+          f"median {statistics.median(latencies) * 1000:.1f} ms, max {max(latencies) * 1000:.1f} ms")
+    print(f"Messages delivered: {totals['messages']} ({totals['bytes'] / 1e6:.1f} MB), "
+          f"built and serialized: {built} ({totals['messages'] / max(built, 1):.0f} deliveries per build)")
+    slow_sent = [subscriber.messages_sent for subscriber, slow in subscribers if slow]
+    print(f"Slow subscribers got {statistics.mean(slow_sent):.1f} messages each (coalesced), "
+          f"fast ones {statistics.mean(subscriber.messages_sent for subscriber in fast):.1f}")
+
+
+def main():
+    subscriber_count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    colony_count = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    duration = float(sys.argv[3]) if len(sys.argv) > 3 else 10.0
+    asyncio.run(run_benchmark(subscriber_count, colony_count, duration))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Save cost benchmark: full JSON saves vs full binary saves vs delta saves.
+
+Simulates an autosave after every small change (one upgrade plus a few
+seconds of production) and reports bytes written and time per save.
+Run from the project root:
+
+    python benchmarks/bench_save_journal.py [building_count] [saves]
+"""
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from colony import Colony
+from buildings import Mine
+from game import save_game, load_game, generate_resources
+from save_journal import SaveJournal, journal_path
+
+
+def make_colony(count):
+    colony = Colony(seed=1, compact_buildings=True)
+    colony.resources.update({"Minerals": 1e9, "Energy": 1e9})
+    colony.add_buildings(Mine, count)
+    return colony
+
+
+def run(label, count, saves, save):
+    colony = make_colony(count)
+    save(colony) # Initial full save is not part of the steady state
+    total_time = 0.0
+    total_bytes = 0
+    for i in range(saves):
+        colony.upgrade_building(i % count)
+        generate_resources(colony, 5.0)
+        start = time.perf_counter()
+        total_bytes += save(colony)
+        total_time += time.perf_counter() - start
+    print(f"{label:>12}: {total_bytes / saves / 1024:10.1f} KiB/save, {total_time / saves * 1000:8.2f} ms/save")
+    return colony
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    saves = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    directory = tempfile.mkdtemp()
+    try:
+        print(f"Buildings: {count}, saves: {saves}")
+        json_path = os.path.join(directory, "colony.json")
+        binary_path = os.path.join(directory, "colony.sav")
+        delta_path = os.path.join(directory, "colony-delta.sav")
+
+        def save_json(colony):
+            with contextlib.redirect_stdout(io.StringIO()):
+                save_game(colony, json_path)
+            return os.path.getsize(json_path)
+
+        def save_binary(colony):
+            with contextlib.redirect_stdout(io.StringIO()):
+                save_game(colony, binary_path, binary=True)
+            return os.path.getsize(binary_path)
+
+        journal = SaveJournal(delta_path)
+
+        def save_delta(colony):
+            before = os.path.getsize(journal_path(delta_path)) if os.path.exists(journal_path(delta_path)) else 0
+            kind = journal.save(colony)
+            if kind == "full":
+                return os.path.getsize(delta_path)
+            return os.path.getsize(journal_path(delta_path)) - before
+
+        run("full JSON", count, saves, save_json)
+        run("full binary", count, saves, save_binary)
+        colony = run("delta", count, saves, save_delta)
+
+        start = time.perf_counter()
+        loaded = load_game(delta_path, compact_buildings=True)
+        print(f"Load base + {saves} deltas: {(time.perf_counter() - start) * 1000:.1f} ms")
+        assert list(loaded.buildings.levels) == list(colony.buildings.levels)
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
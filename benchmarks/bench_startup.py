@@ -0,0 +1,95 @@
+"""CLI startup benchmark: launch to first frame for a large resumed session.
+
+Writes a save with many buildings plus a few journal deltas, then times a
+fresh interpreter importing main.py, resuming the session and computing
+everything the first frame shows, including the next unlock (the target
+is under 100 ms). The offline catch-up that runs right after the first
+frame and the first autosave's pause of the render thread are timed
+separately.
+Run from the project root:
+
+    python benchmarks/bench_startup.py [building_count]
+"""
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from colony import Colony
+from buildings import Mine, SolarPanel
+from save_journal import SaveJournal
+
+CHILD = """
+import time
+start = time.perf_counter()
+import main
+colony, offline_seconds = main.resume_session({path!r})
+# Everything main_curses computes for the first frame, minus the curses calls
+scheduler = main.AffordabilityScheduler(colony)
+saver = main.BackgroundSaver(main.SaveJournal({path!r}))
+clock = main.SimulationClock()
+clock.advance(colony, 0.0)
+main.alert_indicator(colony, clock.speed)
+colony.get_resources()
+next_unlock = scheduler.next_unlock()
+if next_unlock:
+    main.describe_option(next_unlock[1])
+main.building_lines(colony.get_buildings(), 20)
+[record.message for record in colony.event_history[:20]]
+first_frame = time.perf_counter()
+colony.fast_forward(offline_seconds)
+done = time.perf_counter()
+saver.save(colony) # The first autosave is a full one; only its copy runs on the render thread
+queued = time.perf_counter()
+saver.stop()
+written = time.perf_counter()
+print(f"{{(first_frame - start) * 1000:.1f}} {{(done - first_frame) * 1000:.1f}} {{len(colony.buildings)}} "
+      f"{{(queued - done) * 1000:.1f}} {{(written - queued) * 1000:.1f}}")
+"""
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    directory = tempfile.mkdtemp()
+    try:
+        path = os.path.join(directory, "session.sav")
+        colony = Colony(seed=1, compact_buildings=True)
+        colony.resources.update({"Minerals": 1e9, "Energy": 1e9})
+        colony.add_buildings(Mine, count // 2)
+        colony.add_buildings(SolarPanel, count - count // 2)
+        journal = SaveJournal(path)
+        journal.save(colony)
+        for index in range(20):
+            colony.upgrade_building(index)
+            journal.save(colony)
+
+        # Pretend the game was closed a day ago
+        with open(path + ".journal") as f:
+            deltas = [json.loads(line) for line in f]
+        for delta in deltas:
+            delta["saved_at"] -= 86400
+        with open(path + ".journal", "w") as f:
+            f.writelines(json.dumps(delta) + "\n" for delta in deltas)
+        first_frame_ms = []
+        for _ in range(5):
+            output = subprocess.run(
+                [sys.executable, "-c", CHILD.format(path=path)],
+                cwd=ROOT, capture_output=True, text=True, check=True,
+            ).stdout.split()
+            first_frame_ms.append(float(output[0]))
+        print(f"Buildings: {output[2]}")
+        print(f"Launch to first frame: best {min(first_frame_ms):.1f} ms, worst {max(first_frame_ms):.1f} ms (target < 100 ms)")
+        print(f"Offline catch-up after first frame: {float(output[1]):.1f} ms")
+        print(f"First autosave: render thread paused {float(output[3]):.1f} ms, "
+              f"written in {float(output[4]):.1f} ms on the saver thread")
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+from array import array
+from itertools import compress
+from buildings import Mine, SolarPanel, HydroponicsFarm, ResearchLab, GeothermalPlant, get_upgrade_cost_table
+
+# Type ids are positions in this tuple. They end up in save files, so new
+# building classes must only ever be appended.
+BUILDING_TYPES = (Mine, SolarPanel, HydroponicsFarm, ResearchLab, GeothermalPlant)
+
+
+class BuildingType:
+    """Flyweight holding the data shared by every building of one type."""
+    __slots__ = ("type_id", "building_class", "name", "cost", "upgrade_cost_table", "production_per_level")
+
+    def __init__(self, type_id, building_class):
+        self.type_id = type_id
+        self.building_class = building_class
+        self.name = building_class.NAME
+        self.cost = dict(building_class.BASE_COST)
+        self.upgrade_cost_table = get_upgrade_cost_table(building_class)
+        self.production_per_level = dict(building_class.PRODUCTION_PER_LEVEL)
+
+    def upgrade_cost(self, level):
+        if self.upgrade_cost_table is None:
+            return {"Minerals": 99999, "Energy": 99999}
+        return self.upgrade_cost_table.step_cost(level)
+
+    def production_bonus(self, level):
+        return {
+            resource_name: amount * level
+            for resource_name, amount in self.production_per_level.items()
+        }
+
+
+BUILDING_TYPE_TABLE = tuple(BuildingType(type_id, cls) for type_id, cls in enumerate(BUILDING_TYPES))
+TYPE_IDS_BY_NAME = {building_type.name: building_type.type_id for building_type in BUILDING_TYPE_TABLE}
+# bytes.translate tables mapping one type id to 1 and every other byte to 0.
+_TYPE_MASKS = [bytes(int(value == type_id) for value in range(256)) for type_id in range(len(BUILDING_TYPE_TABLE))]
+
+
+class BuildingView:
+    """Lightweight stand-in for a Building object stored in a CompactBuildingStore.
+
+    Exposes the same attributes the rest of the game uses (name, level, cost,
+    upgrade_cost(), get_production_bonus()). A view refers to a position in the
+    store, so it should not be kept around across removals.
+    """
+    __slots__ = ("_store", "_index")
+
+    def __init__(self, store, index):
+        self._store = store
+        self._index = index
+
+    @property
+    def building_type(self):
+        return BUILDING_TYPE_TABLE[self._store.type_ids[self._index]]
+
+    @property
+    def name(self):
+        return self.building_type.name
+
+    @property
+    def cost(self):
+        return dict(self.building_type.cost)
+
+    @property
+    def level(self):
+        return self._store.levels[self._index]
+
+    @level.setter
+    def level(self, value):
+        self._store.levels[self._index] = value
+
+    def upgrade_cost_table(self):
+        return self.building_type.upgrade_cost_table
+
+    def upgrade_cost(self):
+        return self.building_type.upgrade_cost(self.level)
+
+    def get_production_bonus(self):
+        return self.building_type.production_bonus(self.level)
+
+
+class CompactBuildingStore:
+    """List-like building container backed by packed arrays.
+
+    Stores one byte of type id and one unsigned int of level per building
+    instead of a full Python object, which matters for colonies with hundreds
+    of thousands of buildings. Indexing returns a BuildingView, so code written
+    against Colony.buildings as a list of Building objects keeps working.
+    """
+
+    def __init__(self, type_ids=None, levels=None):
+        self.type_ids = type_ids if type_ids is not None else array("B")
+        self.levels = levels if levels is not None else array("I")
+
+    def __len__(self):
+        return len(self.type_ids)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [BuildingView(self, i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("building index out of range")
+        return BuildingView(self, index)
+
+    def __delitem__(self, index):
+        del self.type_ids[index]
+        del self.levels[index]
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield BuildingView(self, index)
+
+    def append(self, building):
+        """Adds a Building (or BuildingView) by copying its type and level."""
+        type_id = TYPE_IDS_BY_NAME.get(building.name)
+        if type_id is None:
+            raise ValueError(f"Unknown building type '{building.name}' for compact storage.")
+        self.append_type(type_id, building.level)
+
+    def append_type(self, type_id, level=1):
+        self.type_ids.append(type_id)
+        self.levels.append(level)
+
+    def extend_type(self, type_id, count, level=1):
+        """Appends count buildings of one type without creating any objects."""
+        self.type_ids.extend(array("B", [type_id]) * count)
+        self.levels.extend(array("I", [level]) * count)
+
+    def remove(self, building):
+        if isinstance(building, BuildingView) and building._store is self:
+            del self[building._index]
+            return
+        for index, view in enumerate(self):
+            if view.name == building.name and view.level == building.level:
+                del self[index]
+                return
+        raise ValueError("building not in store")
+
+    def clear(self):
+        del self.type_ids[:]
+        del self.levels[:]
+
+    def copy(self):
+        return CompactBuildingStore(array("B", self.type_ids), array("I", self.levels))
+
+    def production_bonuses(self):
+        """Full recompute of building bonuses, summing levels per type first."""
+        # Per type, mask the levels with a translated copy of the type ids so
+        # the summing loop runs in C instead of once per building in Python.
+        type_id_bytes = self.type_ids.tobytes()
+        level_sums = []
+        for building_type in BUILDING_TYPE_TABLE:
+            mask = type_id_bytes.translate(_TYPE_MASKS[building_type.type_id])
+            level_sums.append(sum(compress(self.levels, mask)))
+        bonuses = {}
+        for building_type, level_sum in zip(BUILDING_TYPE_TABLE, level_sums):
+            if level_sum:
+                for resource_name, amount in building_type.production_bonus(level_sum).items():
+                    bonuses[resource_name] = bonuses.get(resource_name, 0.0) + amount
+        return bonuses
+
+    def to_dicts(self):
+        names = [building_type.name for building_type in BUILDING_TYPE_TABLE]
+        return [{"name": names[type_id], "level": level} for type_id, level in zip(self.type_ids, self.levels)]
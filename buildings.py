@@ -1,80 +1,152 @@
+from bisect import bisect_right
+
+
+# Safety cap for cost table growth; no colony gets anywhere near it.
+MAX_BUILDING_LEVEL = 1_000_000
+
+
+class UpgradeCostTable:
+    """Precomputed per-level upgrade costs for one building class.
+
+    step_costs[resource][L] is the cost of going from level L to L+1 and
+    cumulative_costs[resource][L] is the total cost of going from level 1 to
+    level L, so the cost of any multi-level upgrade is one subtraction. The
+    tables grow on demand.
+    """
+
+    def __init__(self, cost_factors):
+        self.cost_factors = cost_factors
+        # Index 0 is unused padding so that list positions equal levels.
+        self.step_costs = {resource_name: [0] for resource_name in cost_factors}
+        self.cumulative_costs = {resource_name: [0, 0] for resource_name in cost_factors}
+        self.max_level = 1
+
+    def _extend_to(self, level):
+        while self.max_level < level:
+            current = self.max_level
+            for resource_name, factor in self.cost_factors.items():
+                step = int(factor * (current**1.5))
+                self.step_costs[resource_name].append(step)
+                self.cumulative_costs[resource_name].append(self.cumulative_costs[resource_name][-1] + step)
+            self.max_level += 1
+
+    def step_cost(self, level):
+        """Cost of upgrading from level to level + 1."""
+        self._extend_to(level + 1)
+        return {resource_name: steps[level] for resource_name, steps in self.step_costs.items()}
+
+    def cost_between(self, from_level, to_level):
+        """Total cost of upgrading from from_level to to_level."""
+        self._extend_to(to_level)
+        return {
+            resource_name: cumulative[to_level] - cumulative[from_level]
+            for resource_name, cumulative in self.cumulative_costs.items()
+        }
+
+    def max_affordable_level(self, from_level, resources):
+        """Highest level reachable from from_level with the given resources."""
+        # Double the table until its top level is out of reach, so the binary
+        # search below always has an upper bound.
+        limit = max(self.max_level, from_level + 1)
+        self._extend_to(limit)
+        while limit < MAX_BUILDING_LEVEL and self._can_afford(self.cost_between(from_level, limit), resources):
+            limit = min(2 * limit, MAX_BUILDING_LEVEL)
+            self._extend_to(limit)
+        best_level = limit
+        for resource_name, cumulative in self.cumulative_costs.items():
+            budget = resources.get(resource_name, 0.0) + cumulative[from_level]
+            best_level = min(best_level, bisect_right(cumulative, budget, from_level) - 1)
+        return max(best_level, from_level)
+
+    @staticmethod
+    def _can_afford(cost, resources):
+        return all(resources.get(resource_name, 0.0) >= amount for resource_name, amount in cost.items())
+
+
+_UPGRADE_COST_TABLES = {}
+
+def get_upgrade_cost_table(building_class):
+    """Returns the shared UpgradeCostTable for a building class, or None for the base class."""
+    if building_class.UPGRADE_COST_FACTORS is None:
+        return None
+    table = _UPGRADE_COST_TABLES.get(building_class)
+    if table is None:
+        table = _UPGRADE_COST_TABLES[building_class] = UpgradeCostTable(building_class.UPGRADE_COST_FACTORS)
+    return table
+
+
 class Building:
+    # Per-type data shared by every instance of a building class. Subclasses
+    # override these; the compact building store reads them directly so the
+    # numbers only live in one place.
+    NAME = "Building"
+    BASE_COST = {}
+    UPGRADE_COST_FACTORS = None # Cost of level L -> L+1 is int(factor * L**1.5)
+    PRODUCTION_PER_LEVEL = {}   # Per-second bonus is amount * level
+
     def __init__(self, name, cost):
         self.name = name
         self.cost = cost
         self.level = 1
 
+    @classmethod
+    def upgrade_cost_table(cls):
+        return get_upgrade_cost_table(cls)
+
     def upgrade_cost(self):
-        return {"Minerals": 99999, "Energy": 99999}
+        table = get_upgrade_cost_table(type(self))
+        if table is None:
+            return {"Minerals": 99999, "Energy": 99999}
+        return table.step_cost(self.level)
 
     def get_production_bonus(self):
-        return {}
-
-class Mine(Building):
-    def __init__(self):
-        super().__init__(name="Mine", cost={"Minerals": 50})
-
-    def upgrade_cost(self):
         return {
-            "Minerals": int(25 * (self.level**1.5)),
-            "Energy": int(10 * (self.level**1.5)),
+            resource_name: amount * self.level
+            for resource_name, amount in self.PRODUCTION_PER_LEVEL.items()
         }
 
-    def get_production_bonus(self):
-        return {"Minerals": 5 * self.level}
+class Mine(Building):
+    NAME = "Mine"
+    BASE_COST = {"Minerals": 50}
+    UPGRADE_COST_FACTORS = {"Minerals": 25, "Energy": 10}
+    PRODUCTION_PER_LEVEL = {"Minerals": 5}
 
-class SolarPanel(Building):
     def __init__(self):
-        super().__init__(name="Solar Panel", cost={"Minerals": 30, "Energy": 20})
-
-    def upgrade_cost(self):
-        return {
-            "Minerals": int(15 * (self.level**1.5)),
-            "Energy": int(10 * (self.level**1.5)),
-        }
+        super().__init__(name=self.NAME, cost=dict(self.BASE_COST))
 
-    def get_production_bonus(self):
-        return {"Energy": 3 * self.level}
+class SolarPanel(Building):
+    NAME = "Solar Panel"
+    BASE_COST = {"Minerals": 30, "Energy": 20}
+    UPGRADE_COST_FACTORS = {"Minerals": 15, "Energy": 10}
+    PRODUCTION_PER_LEVEL = {"Energy": 3}
 
-class HydroponicsFarm(Building):
     def __init__(self):
-        super().__init__(name="Hydroponics Farm", cost={"Minerals": 70.0, "Energy": 30.0})
-
-    def upgrade_cost(self):
-        return {
-            "Minerals": int(35 * (self.level**1.5)),
-            "Energy": int(20 * (self.level**1.5)),
-        }
+        super().__init__(name=self.NAME, cost=dict(self.BASE_COST))
 
-    def get_production_bonus(self):
-        return {"Food": 2.0 * self.level}
+class HydroponicsFarm(Building):
+    NAME = "Hydroponics Farm"
+    BASE_COST = {"Minerals": 70.0, "Energy": 30.0}
+    UPGRADE_COST_FACTORS = {"Minerals": 35, "Energy": 20}
+    PRODUCTION_PER_LEVEL = {"Food": 2.0}
 
-class ResearchLab(Building):
     def __init__(self):
-        super().__init__(name="Research Lab", cost={"Minerals": 100.0, "Energy": 50.0})
+        super().__init__(name=self.NAME, cost=dict(self.BASE_COST))
 
-    def upgrade_cost(self):
-        return {
-            "Minerals": int(50 * (self.level**1.5)),
-            "Energy": int(25 * (self.level**1.5)),
-        }
+class ResearchLab(Building):
+    NAME = "Research Lab"
+    BASE_COST = {"Minerals": 100.0, "Energy": 50.0}
+    UPGRADE_COST_FACTORS = {"Minerals": 50, "Energy": 25}
+    PRODUCTION_PER_LEVEL = {"ResearchPoints": 0.5}
 
-    def get_production_bonus(self):
-        return {"ResearchPoints": 0.5 * self.level}
+    def __init__(self):
+        super().__init__(name=self.NAME, cost=dict(self.BASE_COST))
 
 class GeothermalPlant(Building):
+    NAME = "Geothermal Plant"
+    BASE_COST = {"Minerals": 150, "Energy": 100}
+    UPGRADE_COST_FACTORS = {"Minerals": 75, "Energy": 50}
+    PRODUCTION_PER_LEVEL = {"Energy": 10}
+
     def __init__(self):
-        super().__init__(name="Geothermal Plant", cost={"Minerals": 150, "Energy": 100})
+        super().__init__(name=self.NAME, cost=dict(self.BASE_COST))
         # self.level is initialized in the base Building class
-
-    def upgrade_cost(self):
-        base_minerals = 75
-        base_energy = 50
-        return {
-            "Minerals": int(base_minerals * (self.level**1.5)),
-            "Energy": int(base_energy * (self.level**1.5)),
-        }
-
-    def get_production_bonus(self):
-        base_energy_bonus = 10
-        return {"Energy": base_energy_bonus * self.level}
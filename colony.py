@@ -1,9 +1,26 @@
 from collections import defaultdict
+import os
 import random
+from building_store import BUILDING_TYPE_TABLE, CompactBuildingStore, TYPE_IDS_BY_NAME
+from rng import new_seed, derive_seed
+from event_log import EventHistory, EventRecord, DEFAULT_HISTORY_CAPACITY, SEVERITY_INFO, SEVERITY_WARNING, SEVERITY_ERROR
 from research import RESEARCH_PROJECTS # Import RESEARCH_PROJECTS
+from major_events import MajorEventQueue
+from state_versions import VersionLog
+from events import EVENT_CLASSES_BY_NAME
+
+# When enabled, every read of the cached production rates is checked against a
+# full recompute over all buildings. Useful while debugging, far too slow for
+# large colonies, so it is off unless COLONY_DEBUG_PRODUCTION=1 is set.
+DEBUG_VERIFY_PRODUCTION = os.environ.get("COLONY_DEBUG_PRODUCTION") == "1"
+
+# Building changes kept for delta saves before tracking gives up and the next
+# save has to write a full snapshot instead.
+MAX_TRACKED_BUILDING_CHANGES = 10000
 
 class Colony:
-    def __init__(self, initial_turn_number=1):
+    def __init__(self, initial_turn_number=1, compact_buildings=False,
+                 event_history_capacity=DEFAULT_HISTORY_CAPACITY, event_sink=None, seed=None):
         # Adjusted initial values for testing; Minerals & Energy also adjusted for consistency
         self.resources = {
             "Minerals": 50.0, 
@@ -11,19 +28,51 @@ class Colony:
             "Food": 10.0, 
             "ResearchPoints": 0.0
         }
-        self.buildings = []
+        # compact_buildings switches to array-backed storage for very large
+        # colonies; indexing it yields lightweight views instead of Building objects.
+        self.buildings = CompactBuildingStore() if compact_buildings else []
+        # Running per-resource total of all building bonuses. Kept up to date
+        # by every method that adds, removes or re-levels a building so that
+        # reading the production rates does not depend on the building count.
+        self.production_rates = defaultdict(float)
         self.turn_number = initial_turn_number
-        self.event_history = []
+        # Private random stream for events and damage. Without an explicit
+        # seed one is drawn from the global random module.
+        self.rng_seed = seed if seed is not None else new_seed()
+        self.rng = random.Random(self.rng_seed)
+        # Newest-first ring buffer of EventRecords; event_sink (e.g. a
+        # JsonLinesSink) receives every record if the full history is wanted.
+        self.event_history = EventHistory(event_history_capacity, event_sink)
         self.completed_research = set()
         self.unlocked_buildings = {"Mine", "Solar Panel", "Hydroponics Farm", "Research Lab"}
+        # Major events waiting for the player to pick a choice, each with a
+        # deadline after which its default choice applies (see major_events.py).
+        self.pending_major_events = MajorEventQueue()
+        # Colony time of the next random event, drawn from an exponential
+        # distribution (see game.schedule_next_event). None until first needed.
+        self.next_event_time = None
+        # Event name -> colony time before which it may not fire again
+        # (see event_registry.EventRegistry).
+        self.event_cooldowns = {}
+        # Seconds of production simulated so far; the colony's own clock.
+        self.elapsed_time = 0.0
+        # Building adds, level changes and removals since the last save
+        # checkpoint, replayed by delta saves (see save_journal.py). None once
+        # more than MAX_TRACKED_BUILDING_CHANGES piled up.
+        self.building_changes = []
+        # Wall-clock time of the save this colony was loaded from, if any.
+        self.saved_at = None
+        # State version for API clients and the changes between recent
+        # versions (see state_versions.py).
+        self.versions = VersionLog()
 
     def research_project(self, project_id):
         if project_id not in RESEARCH_PROJECTS:
-            self.add_event_to_history(f"Error: Research project '{project_id}' not found.")
+            self.add_event_to_history(f"Error: Research project '{project_id}' not found.", "research", SEVERITY_ERROR)
             return False
 
         if project_id in self.completed_research:
-            self.add_event_to_history(f"Project '{RESEARCH_PROJECTS[project_id]['name']}' already researched.")
+            self.add_event_to_history(f"Project '{RESEARCH_PROJECTS[project_id]['name']}' already researched.", "research")
             return False
 
         project_details = RESEARCH_PROJECTS[project_id]
@@ -39,15 +88,88 @@ class Colony:
             # Future: Handle unlocks_upgrades
             
             self.add_event_to_history(
-                f"Research complete: {project_details['name']}. Unlocked: {', '.join(project_details.get('unlocks_buildings', [])) or 'None'}."
+                f"Research complete: {project_details['name']}. Unlocked: {', '.join(project_details.get('unlocks_buildings', [])) or 'None'}.",
+                "research", deltas={"ResearchPoints": -float(cost)}
             )
             return True
         else:
             self.add_event_to_history(
-                f"Not enough Research Points for '{project_details['name']}'. Need {cost}, have {self.resources.get('ResearchPoints', 0.0):.0f}."
+                f"Not enough Research Points for '{project_details['name']}'. Need {cost}, have {self.resources.get('ResearchPoints', 0.0):.0f}.",
+                "research", SEVERITY_ERROR
             )
             return False
 
+    def fast_forward(self, seconds):
+        """Advances the colony by `seconds` of idle time in one step (see game.fast_forward)."""
+        from game import fast_forward # game imports this module, so import at call time
+        return fast_forward(self, seconds)
+
+    def event_state(self):
+        """Queued major events, cooldowns and the next event time, JSON-ready for saves."""
+        return {
+            "major_events": self.pending_major_events.to_dict(),
+            "event_cooldowns": dict(self.event_cooldowns),
+            "next_event_time": self.next_event_time,
+        }
+
+    def restore_event_state(self, state):
+        """Restores what event_state() returned; missing parts keep their defaults."""
+        if "major_events" in state:
+            self.pending_major_events = MajorEventQueue.from_dict(state["major_events"], EVENT_CLASSES_BY_NAME)
+        self.event_cooldowns = dict(state.get("event_cooldowns", {}))
+        self.next_event_time = state.get("next_event_time")
+
+    def state_version(self):
+        """The version of the current state; goes up whenever the state read through to_dict() changed."""
+        return self.versions.observe(self)
+
+    def discrete_version(self):
+        """The version at which something last happened to the colony, ignoring accrual (see state_versions.py)."""
+        self.versions.observe(self)
+        return self.versions.discrete_version
+
+    def restore_version(self, version):
+        """Continues versioning after `version`, the version a loaded save was taken at."""
+        self.versions = VersionLog(version + 1)
+
+    def snapshot(self):
+        """
+        Returns a detached copy of the colony's state for serializing
+        elsewhere (e.g. on a background thread) while this colony keeps
+        changing. Buildings are copied into a CompactBuildingStore, which is a
+        plain array copy when this colony already uses one.
+        """
+        copy = Colony(
+            initial_turn_number=self.turn_number,
+            compact_buildings=True,
+            event_history_capacity=self.event_history.capacity,
+            seed=self.rng_seed,
+        )
+        copy.rng.setstate(self.rng.getstate())
+        copy.resources = dict(self.resources)
+        if isinstance(self.buildings, CompactBuildingStore):
+            copy.buildings = self.buildings.copy()
+        else:
+            for building in self.buildings:
+                copy.buildings.append(building)
+        copy.production_rates = defaultdict(float, self.production_rates)
+        for record in reversed(list(self.event_history)): # Records are never mutated, so sharing is safe
+            copy.event_history.append(record)
+        copy.completed_research = set(self.completed_research)
+        copy.unlocked_buildings = set(self.unlocked_buildings)
+        copy.pending_major_events = self.pending_major_events.copy()
+        copy.next_event_time = self.next_event_time
+        copy.event_cooldowns = dict(self.event_cooldowns)
+        copy.elapsed_time = self.elapsed_time
+        copy.building_changes = None # Not a checkpoint anyone can save deltas against
+        copy.versions = VersionLog(self.state_version())
+        return copy
+
+    def split_seeds(self, count):
+        """Derives `count` independent child seeds, e.g. for worker processes
+        simulating variations of this colony. Does not consume the colony's stream."""
+        return [derive_seed(self.rng_seed, "child", index) for index in range(count)]
+
     def get_resources(self):
         return self.resources
 
@@ -61,6 +183,63 @@ class Colony:
 
     def add_building(self, building_instance):
         self.buildings.append(building_instance)
+        self._apply_production_bonus(building_instance, 1)
+        self._record_building_change("add", building_instance.name, building_instance.level, 1)
+
+    def add_buildings(self, building_class, count):
+        """Adds count new level 1 buildings of one class in a single step."""
+        if isinstance(self.buildings, CompactBuildingStore):
+            self.buildings.extend_type(TYPE_IDS_BY_NAME[building_class.NAME], count)
+        else:
+            self.buildings.extend(building_class() for _ in range(count))
+        for resource_name, amount in building_class.PRODUCTION_PER_LEVEL.items():
+            self.production_rates[resource_name] += amount * count
+        self._record_building_change("add", building_class.NAME, 1, count)
+
+    def _record_building_change(self, *change):
+        """Appends ("add", name, level, count), ("level", index, level) or
+        ("remove", index) to building_changes."""
+        self.versions.record_building_change(change)
+        if self.building_changes is None:
+            return
+        if len(self.building_changes) >= MAX_TRACKED_BUILDING_CHANGES:
+            self.building_changes = None
+            return
+        self.building_changes.append(change)
+
+    def apply_building_change(self, change):
+        """
+        Replays one change in the format of building_changes, e.g. from a
+        save journal, keeping the cached production rates in step. The
+        change is not recorded again.
+        """
+        kind = change[0]
+        if kind == "add":
+            _, name, level, count = change
+            building_type = BUILDING_TYPE_TABLE[TYPE_IDS_BY_NAME[name]]
+            if isinstance(self.buildings, CompactBuildingStore):
+                self.buildings.extend_type(building_type.type_id, count, level)
+            else:
+                for _ in range(count):
+                    building = building_type.building_class()
+                    building.level = level
+                    self.buildings.append(building)
+            for resource_name, amount in building_type.production_bonus(level * count).items():
+                self.production_rates[resource_name] += amount
+        elif kind == "level":
+            _, index, level = change
+            building = self.buildings[index]
+            self._apply_production_bonus(building, -1)
+            building.level = level
+            self._apply_production_bonus(building, 1)
+        elif kind == "remove":
+            self._apply_production_bonus(self.buildings[change[1]], -1)
+            del self.buildings[change[1]]
+
+    def _apply_production_bonus(self, building_instance, sign):
+        """Adds (sign=1) or removes (sign=-1) a building's bonus from the cached rates."""
+        for resource_name, bonus_amount in building_instance.get_production_bonus().items():
+            self.production_rates[resource_name] += sign * bonus_amount
 
     def get_buildings(self):
         return self.buildings
@@ -73,13 +252,19 @@ class Colony:
         if not self.buildings:
             return "No buildings to damage."
 
-        building = random.choice(self.buildings)
+        building_index = self.rng.randrange(len(self.buildings))
+        building = self.buildings[building_index]
+        self._apply_production_bonus(building, -1)
         if building.level > 1:
             building.level -= 1
+            self._apply_production_bonus(building, 1)
+            self._record_building_change("level", building_index, building.level)
             return f"{building.name} damaged and downgraded to level {building.level}."
         else:
-            self.buildings.remove(building)
-            return f"{building.name} destroyed."
+            building_name = building.name # Read before removal; compact store views go stale
+            del self.buildings[building_index]
+            self._record_building_change("remove", building_index)
+            return f"{building_name} destroyed."
 
     def has_enough_resources(self, cost_dict):
         for resource_name, required_amount in cost_dict.items():
@@ -95,6 +280,21 @@ class Colony:
         return False
 
     def calculate_production_bonuses(self):
+        """Returns the per-resource production bonus of all buildings.
+        Reads the incrementally maintained cache, so the cost is independent
+        of the number of buildings.
+        """
+        if DEBUG_VERIFY_PRODUCTION and not self.verify_production_rates():
+            raise AssertionError(
+                f"Cached production rates {dict(self.production_rates)} do not match "
+                f"recomputed rates {self.recalculate_production_bonuses()}."
+            )
+        return dict(self.production_rates)
+
+    def recalculate_production_bonuses(self):
+        """Recomputes the production bonuses by walking every building."""
+        if isinstance(self.buildings, CompactBuildingStore):
+            return self.buildings.production_bonuses()
         bonuses = defaultdict(float) # Changed to float to handle potential float bonuses
         for building in self.buildings:
             # All building instances should have get_production_bonus method
@@ -104,12 +304,25 @@ class Colony:
                 bonuses[resource_name] += bonus_amount
         return dict(bonuses)
 
+    def verify_production_rates(self, tolerance=1e-6):
+        """Debug check: True if the cached rates match a full recompute."""
+        recomputed = self.recalculate_production_bonuses()
+        for resource_name in set(recomputed) | set(self.production_rates):
+            cached = self.production_rates.get(resource_name, 0.0)
+            if abs(cached - recomputed.get(resource_name, 0.0)) > tolerance:
+                return False
+        return True
+
+    def rebuild_production_rates(self):
+        """Resets the cache from a full recompute, e.g. after levels were edited directly."""
+        self.production_rates = defaultdict(float, self.recalculate_production_bonuses())
+
     def upgrade_building(self, building_instance_index):
         if (
             building_instance_index < 0
             or building_instance_index >= len(self.buildings)
         ):
-            self.add_event_to_history("Error: Invalid building index for upgrade.")
+            self.add_event_to_history("Error: Invalid building index for upgrade.", "upgrade", SEVERITY_ERROR)
             return False
         building_to_upgrade = self.buildings[building_instance_index]
 
@@ -117,27 +330,93 @@ class Colony:
 
         if self.has_enough_resources(current_upgrade_cost):
             self.spend_resources(current_upgrade_cost)
+            self._apply_production_bonus(building_to_upgrade, -1)
             building_to_upgrade.level += 1
+            self._apply_production_bonus(building_to_upgrade, 1)
+            self._record_building_change("level", building_instance_index, building_to_upgrade.level)
             self.add_event_to_history(
-                f"{building_to_upgrade.name} upgraded to level {building_to_upgrade.level}."
+                f"{building_to_upgrade.name} upgraded to level {building_to_upgrade.level}.",
+                "upgrade", deltas=_negated(current_upgrade_cost)
             )
             return True
         else:
             self.add_event_to_history(
-                f"Not enough resources to upgrade {building_to_upgrade.name} to level {building_to_upgrade.level + 1}."
+                f"Not enough resources to upgrade {building_to_upgrade.name} to level {building_to_upgrade.level + 1}.",
+                "upgrade", SEVERITY_ERROR
             )
             return False
 
+    def upgrade_to(self, building_instance_index, target_level):
+        """Raises a building straight to target_level, paying the summed cost of
+        every intermediate level in one all-or-nothing step.
+        Returns (success, max_affordable_level), where the second value is the
+        highest level the colony could reach with its current resources.
+        """
+        if (
+            building_instance_index < 0
+            or building_instance_index >= len(self.buildings)
+        ):
+            self.add_event_to_history("Error: Invalid building index for upgrade.", "upgrade", SEVERITY_ERROR)
+            return False, None
+        building_to_upgrade = self.buildings[building_instance_index]
+        current_level = building_to_upgrade.level
+
+        cost_table = building_to_upgrade.upgrade_cost_table()
+        if cost_table is None:
+            self.add_event_to_history(f"{building_to_upgrade.name} cannot be upgraded.", "upgrade", SEVERITY_WARNING)
+            return False, current_level
+
+        max_affordable_level = cost_table.max_affordable_level(current_level, self.resources)
+        if target_level <= current_level:
+            self.add_event_to_history(
+                f"{building_to_upgrade.name} is already at level {current_level}.", "upgrade", SEVERITY_WARNING
+            )
+            return False, max_affordable_level
+        if target_level > max_affordable_level:
+            self.add_event_to_history(
+                f"Not enough resources to upgrade {building_to_upgrade.name} to level {target_level} "
+                f"(can reach level {max_affordable_level}).",
+                "upgrade", SEVERITY_ERROR
+            )
+            return False, max_affordable_level
+
+        total_cost = cost_table.cost_between(current_level, target_level)
+        if not self.spend_resources(total_cost): # The summed cost can round past the level check
+            self.add_event_to_history(
+                f"Not enough resources to upgrade {building_to_upgrade.name} to level {target_level}.",
+                "upgrade", SEVERITY_ERROR
+            )
+            return False, max_affordable_level
+        self._apply_production_bonus(building_to_upgrade, -1)
+        building_to_upgrade.level = target_level
+        self._apply_production_bonus(building_to_upgrade, 1)
+        self._record_building_change("level", building_instance_index, target_level)
+        self.add_event_to_history(
+            f"{building_to_upgrade.name} upgraded to level {target_level}.",
+            "upgrade", deltas=_negated(total_cost)
+        )
+        return True, max_affordable_level
+
     def to_dict(self):
         return {
             "resources": self.resources,
-            "buildings": [{"name": building.name, "level": building.level} for building in self.buildings],
+            "buildings": self.buildings.to_dicts() if isinstance(self.buildings, CompactBuildingStore)
+                         else [{"name": building.name, "level": building.level} for building in self.buildings],
             "turn_number": self.turn_number,
-            "event_history": self.event_history, # Ensure event_history is saved
+            "elapsed_time": self.elapsed_time,
+            "rng_seed": self.rng_seed,
+            "event_history": self.event_history.to_list(), # Newest first
             "completed_research": list(self.completed_research),
-            "unlocked_buildings": list(self.unlocked_buildings)
+            "unlocked_buildings": list(self.unlocked_buildings),
+            "version": self.state_version(),
         }
 
-    def add_event_to_history(self, event_message, max_history=10):
-        self.event_history.insert(0, event_message) # Add to the beginning
-        self.event_history = self.event_history[:max_history] # Keep only the last max_history items
+    def add_event_to_history(self, event_message, event_type="info", severity=SEVERITY_INFO, deltas=None):
+        record = EventRecord(event_message, self.turn_number, event_type, severity, deltas)
+        self.event_history.append(record)
+        return record
+
+
+def _negated(cost_dict):
+    """Turns a cost dict into the resource deltas recorded in event history."""
+    return {resource_name: -float(amount) for resource_name, amount in cost_dict.items()}
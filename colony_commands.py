@@ -0,0 +1,133 @@
+"""
+The actions API clients take on a colony, shared by web_api's single-action
+routes and its batched /commands endpoint.
+
+Each command takes the colony and the request data and returns a result
+dict with "success". Malformed requests raise CommandError carrying the
+HTTP status the API answers them with.
+"""
+from game import build_structure, build_many, resolve_pending_event, BUILDING_CLASSES
+from research import RESEARCH_PROJECTS
+
+# Most commands a single batch may hold.
+MAX_BATCH_COMMANDS = 1000
+
+ATOMIC = "atomic"           # All commands succeed or none is applied
+BEST_EFFORT = "best_effort" # Every command is tried; failures are reported and skipped
+BATCH_MODES = (ATOMIC, BEST_EFFORT)
+
+
+class CommandError(Exception):
+    """A malformed command. status is the HTTP status to answer it with."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def _int_field(data, field):
+    try:
+        return int(data[field])
+    except KeyError:
+        raise CommandError(f"Missing {field}")
+    except (TypeError, ValueError):
+        raise CommandError(f"{field} must be an integer")
+
+
+def build(colony, data):
+    """Builds data["building"]; an optional "count" builds several at once."""
+    name = data.get("building")
+    if not name:
+        raise CommandError("Missing building name")
+    cls = BUILDING_CLASSES.get(name)
+    if not cls:
+        raise CommandError("Unknown building")
+    if "count" in data:
+        count = _int_field(data, "count")
+        if count < 1:
+            raise CommandError("count must be at least 1")
+        success, affordable = build_many(colony, cls, count)
+        return {"success": success, "affordable": affordable}
+    return {"success": build_structure(colony, cls)}
+
+
+def upgrade(colony, data):
+    """Upgrades the building at data["index"]; an optional "target_level" upgrades several levels at once."""
+    index = _int_field(data, "index")
+    if "target_level" in data:
+        success, affordable_level = colony.upgrade_to(index, _int_field(data, "target_level"))
+        return {"success": success, "affordable_level": affordable_level}
+    return {"success": colony.upgrade_building(index)}
+
+
+def research(colony, data):
+    project_id = data.get("project_id")
+    if not project_id:
+        raise CommandError("Missing project_id")
+    if project_id not in RESEARCH_PROJECTS:
+        raise CommandError("Invalid project_id")
+    return {"success": colony.research_project(project_id)}
+
+
+def resolve_event(colony, data):
+    """Resolves the queued major event data["event_id"] with data["choice"]."""
+    event_id = _int_field(data, "event_id")
+    try:
+        record = resolve_pending_event(colony, event_id, data.get("choice"))
+    except KeyError:
+        raise CommandError("No such pending event (resolved or expired)", status=404)
+    except ValueError as e:
+        raise CommandError(str(e))
+    return {"success": True, "message": record.message}
+
+
+COMMANDS = {
+    "build": build,
+    "upgrade": upgrade,
+    "research": research,
+    "resolve": resolve_event,
+}
+
+
+def run_command(colony, command):
+    """Runs one {"action": name, ...} command. Errors are reported in the result instead of raised."""
+    try:
+        if not isinstance(command, dict):
+            raise CommandError("A command must be an object")
+        action = COMMANDS.get(command.get("action"))
+        if action is None:
+            raise CommandError(f"Unknown action {command.get('action')!r}")
+        return action(colony, command)
+    except CommandError as e:
+        return {"success": False, "error": str(e), "status": e.status}
+
+
+def run_batch(colony, commands, mode=ATOMIC):
+    """
+    Runs commands in order and returns (committed, results), one result per
+    command run.
+
+    In BEST_EFFORT mode every command runs against the colony and committed
+    is True. In ATOMIC mode the batch first runs on a snapshot of the colony
+    and stops at the first failure; only if every command succeeded there is
+    it run again on the colony itself. Commands are deterministic given the
+    colony's state and random stream, so the second run succeeds the same
+    way. After a failure the colony is untouched, committed is False and
+    the results are those of the trial run.
+    """
+    if mode not in BATCH_MODES:
+        raise CommandError(f"mode must be one of {', '.join(BATCH_MODES)}")
+    if not isinstance(commands, list) or not commands:
+        raise CommandError("Missing commands")
+    if len(commands) > MAX_BATCH_COMMANDS:
+        raise CommandError(f"At most {MAX_BATCH_COMMANDS} commands per batch")
+    if mode == BEST_EFFORT:
+        return True, [run_command(colony, command) for command in commands]
+
+    trial = colony.snapshot()
+    results = []
+    for command in commands:
+        results.append(run_command(trial, command))
+        if not results[-1]["success"]:
+            return False, results
+    return True, [run_command(colony, command) for command in commands]
@@ -0,0 +1,342 @@
+"""In-memory LRU of colony sessions backed by the SQLite colony store.
+
+The API server keeps recently used colonies resident and evicts the least
+recently used ones to the store (see colony_store.py) once there are more
+than max_colonies of them or their estimated size exceeds max_bytes. An
+evicted colony is loaded again on its next request and credited with the
+time it spent on disk.
+"""
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from colony import Colony
+from game import AccrualClock
+from affordability import AffordabilityScheduler
+
+DEFAULT_MAX_COLONIES = 1000
+
+# Rough resident size of a session, used for the byte budget: fixed
+# overhead (dicts, random state, scheduler) plus compact building
+# arrays and the event history ring buffer.
+SESSION_OVERHEAD_BYTES = 16 * 1024
+BYTES_PER_BUILDING = 5 # One type byte and one uint32 level (CompactBuildingStore)
+BYTES_PER_EVENT_RECORD = 400
+
+
+class UnknownColonyError(KeyError):
+    """No colony with this id exists, in memory or in the store."""
+
+
+class ColonySession:
+    """A colony together with its clock, affordability scheduler and lock."""
+
+    def __init__(self, colony_id, colony, speed=1.0, last_update=None, clock=None, lock=None):
+        self.colony_id = colony_id
+        self.colony = colony
+        self.clock = clock if clock is not None else AccrualClock(speed=speed)
+        self.scheduler = AffordabilityScheduler(colony)
+        self.lock = lock if lock is not None else threading.RLock()
+        # Wall-clock time the colony was last advanced to; resources are
+        # derived from it and the production rates when the colony is used
+        self.last_update = time.time() if last_update is None else last_update
+        self.dirty = False   # Changed since it was last written to the store
+        self.evicted = False # Set once written out; holders must look the colony up again
+        self.estimated_bytes = 0
+
+    def advance(self, now=None):
+        """Advances the colony by the real time elapsed since the last update."""
+        now = time.time() if now is None else now
+        version = self.colony.discrete_version()
+        self.clock.advance(self.colony, now - self.last_update)
+        self.last_update = now
+        self.mark_if_changed(version)
+
+    def mark_if_changed(self, discrete_version):
+        """
+        Marks the session dirty if something happened to the colony since
+        `discrete_version`. Accrual alone is not written out: the stored
+        last_update lets a reload credit it again.
+        """
+        if self.colony.discrete_version() != discrete_version:
+            self.dirty = True
+
+    def estimate_bytes(self):
+        self.estimated_bytes = (
+            SESSION_OVERHEAD_BYTES
+            + BYTES_PER_BUILDING * len(self.colony.buildings)
+            + BYTES_PER_EVENT_RECORD * len(self.colony.event_history)
+        )
+        return self.estimated_bytes
+
+
+class SessionCache:
+    """
+    Colony sessions by id, the most recently used ones resident in memory.
+
+    use(colony_id) is the way in for request handlers: it loads the colony
+    if needed, holds its lock and advances it to the current time. Eviction
+    and flushing never wait for a colony that is in use; they skip it
+    instead. The cache lock only guards the bookkeeping and is never held
+    during store I/O or while waiting for a colony's lock, so a slow
+    request or load on one colony does not hold up the others. A colony
+    being loaded, created, written out or deleted has a transfer in
+    progress; other threads wait for it to finish before they touch the
+    colony, so it is never read from the store while it is being written.
+    """
+
+    def __init__(self, store, max_colonies=DEFAULT_MAX_COLONIES, max_bytes=None, speed=1.0):
+        if max_colonies < 1:
+            raise ValueError("max_colonies must be at least 1.")
+        self.store = store
+        self.max_colonies = max_colonies
+        self.max_bytes = max_bytes # None for no byte budget
+        self.speed = speed
+        self._sessions = OrderedDict() # Least recently used first
+        self._transfers = {} # Colony id -> Event set when its load or write finishes
+        self._lock = threading.Lock()
+        self.resident_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.creations = 0
+        self.evictions = 0
+        self.load_seconds = 0.0
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def create(self, colony_id=None, seed=None):
+        """Starts a new colony and returns its session. Raises ValueError if the id is taken."""
+        colony_id = colony_id or uuid.uuid4().hex
+        if self._claim(colony_id) is not None:
+            raise ValueError(f"Colony {colony_id!r} already exists.")
+        try:
+            if self.store.summary(colony_id) is not None:
+                raise ValueError(f"Colony {colony_id!r} already exists.")
+            session = ColonySession(colony_id, Colony(seed=seed, compact_buildings=True), self.speed)
+            session.dirty = True
+            with self._lock:
+                victims = self._insert(session)
+                self.creations += 1
+        finally:
+            self._end_transfer(colony_id)
+        self._write_out(victims)
+        return session
+
+    def _insert(self, session):
+        """Makes session resident and returns the sessions evicted to make room. Caller holds the cache lock."""
+        self._sessions[session.colony_id] = session
+        self.resident_bytes += session.estimate_bytes()
+        return self._detach_over_budget(keep=session)
+
+    def _claim(self, colony_id, touch=False):
+        """
+        Returns the resident session of colony_id, or None once this thread
+        owns a transfer of colony_id and must end it with _end_transfer.
+        Waits while another thread's transfer of the colony is in progress.
+        touch counts a hit and marks the session most recently used.
+        """
+        while True:
+            with self._lock:
+                session = self._sessions.get(colony_id)
+                if session is not None:
+                    if touch:
+                        self._sessions.move_to_end(colony_id)
+                        self.hits += 1
+                    return session
+                transfer = self._transfers.get(colony_id)
+                if transfer is None:
+                    self._transfers[colony_id] = threading.Event()
+                    return None
+            transfer.wait()
+
+    def _end_transfer(self, colony_id):
+        with self._lock:
+            transfer = self._transfers.pop(colony_id)
+        transfer.set()
+
+    def _get(self, colony_id):
+        session = self._claim(colony_id, touch=True)
+        if session is not None:
+            return session
+        try:
+            start = time.perf_counter()
+            colony = self.store.load(colony_id, compact_buildings=True)
+            if colony is None:
+                raise UnknownColonyError(colony_id)
+            # The first advance credits the time the colony spent on disk
+            session = ColonySession(colony_id, colony, self.speed, last_update=colony.saved_at)
+            with self._lock:
+                self.misses += 1
+                self.load_seconds += time.perf_counter() - start
+                victims = self._insert(session)
+        finally:
+            self._end_transfer(colony_id)
+        self._write_out(victims)
+        return session
+
+    def resident(self, colony_id):
+        """The resident session for colony_id, or None. Not counted and does not refresh its LRU position."""
+        return self._sessions.get(colony_id)
+
+    @contextmanager
+    def use(self, colony_id):
+        """
+        Yields the session of colony_id locked and advanced to now. Raises
+        UnknownColonyError if there is no such colony.
+        """
+        while True:
+            session = self._get(colony_id)
+            with session.lock:
+                if session.evicted: # Written out between lookup and lock; look it up again
+                    continue
+                session.advance()
+                version = session.colony.discrete_version()
+                try:
+                    yield session
+                finally:
+                    session.mark_if_changed(version)
+                before = session.estimated_bytes
+                after = session.estimate_bytes()
+            with self._lock:
+                self.resident_bytes += after - before
+                victims = self._detach_over_budget(keep=session)
+            self._write_out(victims)
+            return
+
+    def _over_budget(self):
+        return len(self._sessions) > self.max_colonies or (
+            self.max_bytes is not None and self.resident_bytes > self.max_bytes
+        )
+
+    def _detach(self, session):
+        """
+        Marks session evicted, drops it from memory and starts its transfer.
+        Caller holds the cache lock and either the session's lock or knows
+        it is idle.
+        """
+        session.evicted = True
+        del self._sessions[session.colony_id]
+        self._transfers[session.colony_id] = threading.Event()
+        self.resident_bytes -= session.estimated_bytes
+
+    def _detach_over_budget(self, keep=None):
+        """
+        Detaches least recently used idle sessions until within budget and
+        returns them for _write_out. Caller holds the cache lock.
+        """
+        victims = []
+        if not self._over_budget():
+            return victims
+        for session in list(self._sessions.values()):
+            if session is keep or session.colony_id in self._transfers: # Being flushed
+                continue
+            if not session.lock.acquire(blocking=False): # In use; try the next one
+                continue
+            try:
+                self._detach(session)
+            finally:
+                session.lock.release()
+            self.evictions += 1
+            victims.append(session)
+            if not self._over_budget():
+                break
+        return victims
+
+    def _write_out(self, victims):
+        """Saves detached sessions that changed to the store and ends their transfers."""
+        for session in victims:
+            try:
+                if session.dirty:
+                    self.store.save(session.colony_id, session.colony, last_update=session.last_update)
+            finally:
+                self._end_transfer(session.colony_id)
+
+    def _take(self, colony_id):
+        """
+        Detaches colony_id once it is idle and returns its session, or None
+        if it was not resident. Either way this thread then owns a transfer
+        of colony_id.
+        """
+        while True:
+            session = self._claim(colony_id)
+            if session is None:
+                return None
+            with session.lock:
+                with self._lock:
+                    transfer = self._transfers.get(colony_id)
+                    if transfer is None and self._sessions.get(colony_id) is session:
+                        self._detach(session)
+                        return session
+            if transfer is not None: # Being flushed
+                transfer.wait()
+
+    def evict(self, colony_id):
+        """Writes colony_id to the store and drops it from memory. Returns False if it was not resident."""
+        session = self._take(colony_id)
+        if session is None:
+            self._end_transfer(colony_id)
+            return False
+        with self._lock:
+            self.evictions += 1
+        self._write_out([session])
+        return True
+
+    def delete(self, colony_id):
+        """Deletes a colony from memory and the store. Returns False if it did not exist."""
+        session = self._take(colony_id)
+        try:
+            return self.store.delete(colony_id) or session is not None
+        finally:
+            self._end_transfer(colony_id)
+
+    def flush(self, wait=False):
+        """
+        Writes every changed resident colony to the store in one transaction
+        and returns how many were written. Each colony is only locked while
+        it is copied. Colonies in use are left for the next flush unless
+        wait is set, as it is on shutdown. A colony being flushed is not
+        evicted until its copy is written, so an eviction cannot be
+        overwritten by an older copy.
+        """
+        with self._lock:
+            resident = list(self._sessions.values())
+        items = []
+        try:
+            for session in resident:
+                if not session.lock.acquire(blocking=wait):
+                    continue
+                try:
+                    if not session.dirty:
+                        continue
+                    with self._lock:
+                        if session.evicted or session.colony_id in self._transfers:
+                            continue
+                        self._transfers[session.colony_id] = threading.Event()
+                    items.append((session.colony_id, session.colony.snapshot(), None, session.last_update))
+                    session.dirty = False
+                finally:
+                    session.lock.release()
+            if items:
+                self.store.save_many(items)
+        finally:
+            for colony_id, *_ in items:
+                self._end_transfer(colony_id)
+        return len(items)
+
+    def metrics(self):
+        lookups = self.hits + self.misses
+        return {
+            "resident": len(self._sessions),
+            "resident_bytes": self.resident_bytes,
+            "max_colonies": self.max_colonies,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else None,
+            "creations": self.creations,
+            "evictions": self.evictions,
+            "average_load_ms": self.load_seconds / self.misses * 1000 if self.misses else None,
+        }
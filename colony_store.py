@@ -0,0 +1,216 @@
+"""SQLite-backed store for many colonies, e.g. one per player on a server.
+
+Run `python colony_store.py import colonies.db savegame.json ...` to import
+existing JSON (or binary) save files.
+"""
+import argparse
+import os
+import queue
+import sqlite3
+import time
+from contextlib import contextmanager
+
+from game import load_game, colony_from_bytes
+from save_format import encode_colony
+
+DEFAULT_POOL_SIZE = 4
+
+# Hot fields get their own columns so they can be queried and indexed; the
+# full colony lives in `state` in the binary save format.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS colonies (
+    colony_id       TEXT PRIMARY KEY,
+    owner           TEXT,
+    turn_number     INTEGER NOT NULL,
+    minerals        REAL NOT NULL,
+    energy          REAL NOT NULL,
+    food            REAL NOT NULL,
+    research_points REAL NOT NULL,
+    building_count  INTEGER NOT NULL,
+    last_update     REAL NOT NULL,
+    state           BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS colonies_owner ON colonies (owner);
+CREATE INDEX IF NOT EXISTS colonies_last_update ON colonies (last_update);
+"""
+
+UPSERT = """
+INSERT INTO colonies (colony_id, owner, turn_number, minerals, energy, food,
+                      research_points, building_count, last_update, state)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (colony_id) DO UPDATE SET
+    owner = COALESCE(excluded.owner, colonies.owner),
+    turn_number = excluded.turn_number,
+    minerals = excluded.minerals,
+    energy = excluded.energy,
+    food = excluded.food,
+    research_points = excluded.research_points,
+    building_count = excluded.building_count,
+    last_update = excluded.last_update,
+    state = excluded.state
+"""
+
+
+class ColonyStore:
+    """
+    Keeps colonies in one SQLite database.
+
+    Connections come from a small pool so concurrent request threads do not
+    open a new connection each time; the database runs in WAL mode so
+    readers are not blocked by an autosave in progress.
+    """
+
+    def __init__(self, path, pool_size=DEFAULT_POOL_SIZE):
+        self.path = path
+        self._pool = queue.Queue()
+        self._connections = []
+        for _ in range(pool_size):
+            connection = sqlite3.connect(path, check_same_thread=False, timeout=30.0)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._connections.append(connection)
+            self._pool.put(connection)
+        with self.connection() as connection:
+            connection.executescript(SCHEMA)
+
+    @contextmanager
+    def connection(self):
+        """Borrows a pooled connection; commits on success, rolls back on error."""
+        connection = self._pool.get()
+        try:
+            with connection:
+                yield connection
+        finally:
+            self._pool.put(connection)
+
+    def close(self):
+        for connection in self._connections:
+            connection.close()
+        self._connections = []
+
+    @staticmethod
+    def _row(colony_id, colony, owner, last_update):
+        resources = colony.resources
+        return (
+            colony_id, owner, colony.turn_number,
+            resources.get("Minerals", 0.0), resources.get("Energy", 0.0),
+            resources.get("Food", 0.0), resources.get("ResearchPoints", 0.0),
+            len(colony.buildings), last_update, encode_colony(colony, last_update),
+        )
+
+    def save(self, colony_id, colony, owner=None, last_update=None):
+        self.save_many([(colony_id, colony, owner, last_update)])
+
+    def save_many(self, items):
+        """
+        Upserts many (colony_id, colony, owner) or (colony_id, colony, owner,
+        last_update) tuples in one transaction, e.g. everything an autosave
+        pass found dirty. An owner of None keeps the stored owner.
+        last_update is the wall-clock time the colony's state was advanced
+        to, from which a reload credits idle time; None means now.
+        """
+        now = time.time()
+        rows = []
+        for item in items:
+            colony_id, colony, owner = item[:3]
+            last_update = item[3] if len(item) > 3 and item[3] is not None else now
+            rows.append(self._row(colony_id, colony, owner, last_update))
+        with self.connection() as connection:
+            connection.executemany(UPSERT, rows)
+        return len(rows)
+
+    def load(self, colony_id, compact_buildings=False):
+        """Returns the stored colony, or None if there is no such colony."""
+        with self.connection() as connection:
+            row = connection.execute("SELECT state FROM colonies WHERE colony_id = ?", (colony_id,)).fetchone()
+        if row is None:
+            return None
+        return colony_from_bytes(row[0], compact_buildings)
+
+    def delete(self, colony_id):
+        with self.connection() as connection:
+            return connection.execute("DELETE FROM colonies WHERE colony_id = ?", (colony_id,)).rowcount > 0
+
+    def summary(self, colony_id):
+        """Hot fields of one colony as a dict, without decoding its state."""
+        with self.connection() as connection:
+            connection.row_factory = sqlite3.Row
+            try:
+                row = connection.execute(
+                    "SELECT colony_id, owner, turn_number, minerals, energy, food, research_points, "
+                    "building_count, last_update FROM colonies WHERE colony_id = ?", (colony_id,)
+                ).fetchone()
+            finally:
+                connection.row_factory = None
+        return dict(row) if row is not None else None
+
+    def colonies_of(self, owner):
+        with self.connection() as connection:
+            rows = connection.execute(
+                "SELECT colony_id FROM colonies WHERE owner = ? ORDER BY colony_id", (owner,)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def idle_colonies(self, idle_seconds, now=None, limit=None):
+        """
+        Colonies not saved for more than idle_seconds (e.g. 3600 * N for "idle
+        for N hours"), longest idle first, as (colony_id, owner, last_update).
+        Uses the last_update index.
+        """
+        cutoff = (time.time() if now is None else now) - idle_seconds
+        sql = "SELECT colony_id, owner, last_update FROM colonies WHERE last_update < ? ORDER BY last_update"
+        params = (cutoff,)
+        if limit is not None:
+            sql += " LIMIT ?"
+            params += (limit,)
+        with self.connection() as connection:
+            return connection.execute(sql, params).fetchall()
+
+    def count(self):
+        with self.connection() as connection:
+            return connection.execute("SELECT COUNT(*) FROM colonies").fetchone()[0]
+
+
+def import_save_files(store, paths, owner=None):
+    """
+    Imports save files (JSON or binary) into the store, using each file
+    name without extension as the colony id. The colony keeps the time it
+    was saved as its last_update. Returns (imported ids, skipped paths).
+    """
+    imported, skipped, rows = [], [], []
+    for path in paths:
+        colony = load_game(path)
+        if colony is None:
+            skipped.append(path)
+            continue
+        colony_id = os.path.splitext(os.path.basename(path))[0]
+        last_update = colony.saved_at or os.path.getmtime(path)
+        rows.append(ColonyStore._row(colony_id, colony, owner, last_update))
+        imported.append(colony_id)
+    with store.connection() as connection:
+        connection.executemany(UPSERT, rows)
+    return imported, skipped
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python colony_store.py", description="Manage the SQLite colony store.")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    import_parser = subcommands.add_parser("import", help="import save files (e.g. savegame.json)")
+    import_parser.add_argument("database", help="SQLite database file (created if missing)")
+    import_parser.add_argument("saves", nargs="+", help="save files to import")
+    import_parser.add_argument("--owner", default=None, help="owner to record for the imported colonies")
+    args = parser.parse_args(argv)
+
+    store = ColonyStore(args.database, pool_size=1)
+    try:
+        imported, skipped = import_save_files(store, args.saves, args.owner)
+    finally:
+        store.close()
+    for colony_id in imported:
+        print(f"imported {colony_id}")
+    for path in skipped:
+        print(f"skipped {path} (not a readable save)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+"""
+Push updates of colonies to subscribed clients (the API's WebSocket and
+Server-Sent Events streams).
+
+Each colony with subscribers has a feed that sends a subscriber the full
+state first and JSON Patch deltas after that (see state_versions.py):
+resource ticks at the rate the subscriber asked for, and changes as soon as
+the server is told about them with notify(). A subscriber holds at most one
+unsent message. One that is still busy with the last message is skipped and
+later gets a single patch covering everything it missed, so slow clients
+cost neither memory nor extra work. A message is built and serialized once
+per round for all subscribers at the same version.
+"""
+import asyncio
+import json
+import math
+
+DEFAULT_PUSH_RATE = 1.0 # Resource ticks per second
+MIN_PUSH_RATE = 0.1
+MAX_PUSH_RATE = 10.0    # One per simulation tick
+
+
+class Subscriber:
+    """
+    One client's view of a feed. The transport loops over next_message()
+    and sends what it returns until it returns None (the feed closed).
+    """
+
+    def __init__(self, rate=DEFAULT_PUSH_RATE):
+        self.set_rate(rate)
+        self.version = None   # Version of the client's copy; None until it got the full state
+        self.alert_ids = None # Pending major events the client was last told about
+        self.stale = True     # A change happened that the client has not been sent
+        self.next_tick = 0.0  # Event loop time the next resource tick is due
+        self.waiting = False  # The transport is ready for the next message
+        self.closed = False
+        self.messages_sent = 0
+        self._message = None
+        self._has_message = asyncio.Event()
+        self._feed = None
+
+    def set_rate(self, rate):
+        """
+        Sets the resource tick rate, clamped to MIN_PUSH_RATE..MAX_PUSH_RATE.
+        A rate that is not a finite number gets DEFAULT_PUSH_RATE.
+        """
+        if not isinstance(rate, (int, float)) or not math.isfinite(rate):
+            rate = DEFAULT_PUSH_RATE
+        self.rate = min(max(rate, MIN_PUSH_RATE), MAX_PUSH_RATE)
+        self.interval = 1.0 / self.rate
+
+    async def next_message(self):
+        """The next message as JSON text, or None once the feed is closed."""
+        if self._message is None and not self.closed:
+            self.waiting = True
+            self._feed.wake()
+            await self._has_message.wait()
+        self._has_message.clear()
+        message, self._message = self._message, None
+        return message
+
+    def _offer(self, text):
+        self._message = text
+        self.waiting = False
+        self.messages_sent += 1
+        self._has_message.set()
+
+    def _close(self):
+        self.closed = True
+        self._has_message.set()
+
+
+class _Feed:
+    """The subscribers of one colony and the task that sends them updates."""
+
+    def __init__(self, hub, key):
+        self.hub = hub
+        self.key = key
+        self.subscribers = set()
+        self._wake = asyncio.Event()
+        self.task = asyncio.create_task(self._pump())
+
+    def wake(self):
+        self._wake.set()
+
+    def close(self):
+        for subscriber in self.subscribers:
+            subscriber._close()
+        self.subscribers.clear()
+        self.wake()
+
+    async def _pump(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            self._wake.clear()
+            if not self.subscribers:
+                del self.hub._feeds[self.key]
+                return
+            now = loop.time()
+            waiting = [subscriber for subscriber in self.subscribers if subscriber.waiting]
+            due = [subscriber for subscriber in waiting if subscriber.stale or subscriber.next_tick <= now]
+            if not due:
+                next_tick = min((subscriber.next_tick for subscriber in waiting), default=None)
+                try:
+                    await asyncio.wait_for(self._wake.wait(), None if next_tick is None else next_tick - now)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            try:
+                version, alert_ids, texts = await self.hub.run(self.key, lambda session: self._build(session, due))
+            except Exception: # E.g. the colony was deleted; the streams end
+                self.close()
+                continue
+            now = loop.time()
+            for subscriber, text in zip(due, texts):
+                if subscriber not in self.subscribers: # Left while the messages were built
+                    continue
+                subscriber.version = version
+                subscriber.alert_ids = alert_ids
+                subscriber.stale = False
+                subscriber.next_tick = now + subscriber.interval
+                if text is not None:
+                    subscriber._offer(text)
+
+    def _build(self, session, due):
+        """Runs with the colony locked. Returns its version, alert ids and one message (or None) per subscriber."""
+        colony = session.colony
+        version = colony.state_version()
+        entries = colony.pending_major_events.entries()
+        alert_ids = tuple(entry.event_id for entry in entries)
+        texts = {} # (base version, alerts changed) -> message text, shared by everyone at that version
+        result = []
+        for subscriber in due:
+            alerts_changed = subscriber.alert_ids != alert_ids
+            if subscriber.version == version and not alerts_changed:
+                result.append(None) # Nothing new since the last message
+                continue
+            text_key = (subscriber.version, alerts_changed)
+            text = texts.get(text_key)
+            if text is None:
+                patch = None if subscriber.version is None else colony.versions.patch_since(colony, subscriber.version)
+                if patch is None:
+                    message = {"type": "state", "version": version, "state": colony.to_dict()}
+                else:
+                    message = {"type": "patch", "version": version, "since": subscriber.version, "patch": patch}
+                if alerts_changed:
+                    message["alerts"] = [entry.to_dict(colony.elapsed_time) for entry in entries]
+                text = texts[text_key] = json.dumps(message)
+                self.hub.messages_built += 1
+            result.append(text)
+        return version, alert_ids, result
+
+
+class UpdateHub:
+    """
+    Feeds by colony key. `run(key, action)` is a coroutine function that
+    returns action(session) for that colony, locked and advanced to now;
+    the hub calls it once per round to build the messages. All other
+    methods must be called on the event loop.
+    """
+
+    def __init__(self, run):
+        self.run = run
+        self._feeds = {}
+        self._change_waiters = {} # Key -> futures the next notify() resolves
+        self.messages_built = 0
+
+    def subscribe(self, key, rate=DEFAULT_PUSH_RATE):
+        """Adds a subscriber to the colony's feed; see Subscriber.set_rate for the rate."""
+        subscriber = Subscriber(rate)
+        feed = self._feeds.get(key)
+        if feed is None:
+            feed = self._feeds[key] = _Feed(self, key)
+        subscriber._feed = feed
+        feed.subscribers.add(subscriber)
+        feed.wake()
+        return subscriber
+
+    def unsubscribe(self, key, subscriber):
+        feed = self._feeds.get(key)
+        if feed is not None:
+            feed.subscribers.discard(subscriber)
+            feed.wake()
+
+    def notify(self, key):
+        """Tells the colony's subscribers that it changed, so they get an update without waiting for a tick."""
+        for waiter in self._change_waiters.pop(key, ()):
+            if not waiter.done():
+                waiter.set_result(None)
+        feed = self._feeds.get(key)
+        if feed is not None:
+            for subscriber in feed.subscribers:
+                subscriber.stale = True
+            feed.wake()
+
+    async def wait_for_change(self, key, timeout):
+        """Waits until the colony is notified of a change or timeout seconds pass. Returns True on a change."""
+        waiter = asyncio.get_running_loop().create_future()
+        waiters = self._change_waiters.setdefault(key, set())
+        waiters.add(waiter)
+        try:
+            await asyncio.wait_for(waiter, timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            waiters.discard(waiter)
+            if not waiters and self._change_waiters.get(key) is waiters:
+                del self._change_waiters[key]
+
+    def close(self, key):
+        """Ends every stream of the colony, e.g. once it was deleted."""
+        feed = self._feeds.get(key)
+        if feed is not None:
+            feed.close()
+
+    def metrics(self):
+        return {
+            "feeds": len(self._feeds),
+            "subscribers": sum(len(feed.subscribers) for feed in self._feeds.values()),
+            "messages_built": self.messages_built,
+        }
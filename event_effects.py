@@ -0,0 +1,236 @@
+"""Declarative event effects.
+
+An event describes what it does as a list of effects (Add, Drain,
+DamageBuilding, Say, Chance, IfAffordable). compile_effects turns that list
+once into a flat tuple of operations, which apply_effects runs against one
+colony and apply_batch against many colonies at a time.
+
+Amounts are either constants, Param("attribute") (a value the event drew
+when it was created, see events.EffectEvent.PARAMS) or Roll(low, high), a
+float(rng.randint(low, high)) drawn from the colony's stream when the effect
+runs. Say templates are formatted with the event's attributes plus the
+amounts stored by earlier effects (store="name").
+"""
+
+# Operation codes of compiled programs
+OP_ADD = 0
+OP_DRAIN = 1
+OP_DAMAGE = 2
+OP_SAY = 3
+OP_CHANCE = 4
+OP_IF_AFFORDABLE = 5
+
+# Kinds of compiled values
+REF_CONST = 0
+REF_PARAM = 1
+REF_ROLL = 2
+
+
+class Roll:
+    """A whole number in [low, high] as a float, drawn per application."""
+    __slots__ = ("low", "high")
+
+    def __init__(self, low, high):
+        if low > high:
+            raise ValueError("Roll needs low <= high.")
+        self.low = low
+        self.high = high
+
+    def draw(self, rng):
+        return float(rng.randint(self.low, self.high))
+
+
+class Pick:
+    """One of a fixed list of options, e.g. the resource an event affects."""
+    __slots__ = ("options",)
+
+    def __init__(self, options):
+        if not options:
+            raise ValueError("Pick needs at least one option.")
+        self.options = list(options)
+
+    def draw(self, rng):
+        return rng.choice(self.options)
+
+
+class Param:
+    """An attribute of the event instance, drawn when the event was created."""
+    __slots__ = ("name",)
+
+    def __init__(self, name):
+        self.name = name
+
+
+class Add:
+    """Adds amount of resource."""
+    __slots__ = ("resource", "amount", "store")
+
+    def __init__(self, resource, amount, store=None):
+        self.resource = resource
+        self.amount = amount
+        self.store = store # Name the added amount is kept under for Say
+
+
+class Drain:
+    """Removes up to amount of resource, never taking it below zero."""
+    __slots__ = ("resource", "amount", "store")
+
+    def __init__(self, resource, amount, store=None):
+        self.resource = resource
+        self.amount = amount
+        self.store = store # Name the amount actually lost is kept under for Say
+
+
+class DamageBuilding:
+    """Damages a random building (see Colony.damage_random_building) and reports it."""
+    __slots__ = ()
+
+
+class Say:
+    """Appends a message fragment."""
+    __slots__ = ("template",)
+
+    def __init__(self, template):
+        self.template = template
+
+
+class Chance:
+    """Runs `then` with the given probability, `otherwise` the rest of the time."""
+    __slots__ = ("probability", "then", "otherwise")
+
+    def __init__(self, probability, then, otherwise=()):
+        if not 0.0 <= probability <= 1.0:
+            raise ValueError("Chance probability must be between 0 and 1.")
+        self.probability = probability
+        self.then = then
+        self.otherwise = otherwise
+
+
+class IfAffordable:
+    """Spends cost and runs `then` if the colony can afford it, else runs `otherwise`."""
+    __slots__ = ("cost", "then", "otherwise")
+
+    def __init__(self, cost, then, otherwise=()):
+        self.cost = dict(cost)
+        self.then = then
+        self.otherwise = otherwise
+
+
+def _compile_value(value):
+    if isinstance(value, Param):
+        return (REF_PARAM, value.name)
+    if isinstance(value, Roll):
+        return (REF_ROLL, value.low, value.high)
+    return (REF_CONST, value)
+
+
+def compile_effects(effects):
+    """Compiles a list of effects into a tuple of operations."""
+    program = []
+    for effect in effects:
+        if isinstance(effect, (Add, Drain)):
+            program.append((
+                OP_ADD if isinstance(effect, Add) else OP_DRAIN,
+                _compile_value(effect.resource), _compile_value(effect.amount), effect.store,
+            ))
+        elif isinstance(effect, DamageBuilding):
+            program.append((OP_DAMAGE,))
+        elif isinstance(effect, Say):
+            # Templates without fields are appended as they are
+            has_fields = "{" in effect.template
+            program.append((OP_SAY, effect.template, has_fields))
+        elif isinstance(effect, Chance):
+            program.append((
+                OP_CHANCE, effect.probability,
+                compile_effects(effect.then), compile_effects(effect.otherwise),
+            ))
+        elif isinstance(effect, IfAffordable):
+            program.append((
+                OP_IF_AFFORDABLE, effect.cost,
+                compile_effects(effect.then), compile_effects(effect.otherwise),
+            ))
+        else:
+            raise TypeError(f"Unknown event effect: {effect!r}")
+    return tuple(program)
+
+
+def _value(ref, colony, params):
+    kind = ref[0]
+    if kind == REF_CONST:
+        return ref[1]
+    if kind == REF_PARAM:
+        return params[ref[1]]
+    return float(colony.rng.randint(ref[1], ref[2]))
+
+
+def _run(program, states, quiet=False):
+    """
+    Runs program over states, one operation at a time across all of them.
+    Each colony draws from its own stream in program order, so the outcome
+    for a colony is the same as running the program on it alone. Say
+    templates are not formatted when quiet.
+    """
+    for op in program:
+        code = op[0]
+        if code == OP_ADD or code == OP_DRAIN:
+            _, resource_ref, amount_ref, store = op
+            for colony, params, values, _ in states:
+                resource = _value(resource_ref, colony, params)
+                amount = _value(amount_ref, colony, params)
+                if code == OP_ADD:
+                    colony.add_resource(resource, amount)
+                    amount = float(amount)
+                else:
+                    current = colony.resources.get(resource, 0.0)
+                    amount = min(amount, current)
+                    if amount > 0:
+                        colony.resources[resource] = max(0.0, current - amount)
+                if store is not None:
+                    values[store] = amount
+        elif code == OP_DAMAGE:
+            for colony, _, _, parts in states:
+                parts.append(colony.damage_random_building())
+        elif code == OP_SAY:
+            if quiet:
+                continue
+            _, template, has_fields = op
+            for _, params, values, parts in states:
+                parts.append(template.format_map({**params, **values}) if has_fields else template)
+        elif code == OP_CHANCE:
+            _, probability, then, otherwise = op
+            taken, not_taken = [], []
+            for state in states:
+                (taken if state[0].rng.random() < probability else not_taken).append(state)
+            _run(then, taken, quiet)
+            _run(otherwise, not_taken, quiet)
+        elif code == OP_IF_AFFORDABLE:
+            _, cost, then, otherwise = op
+            taken, not_taken = [], []
+            for state in states:
+                (taken if state[0].spend_resources(cost) else not_taken).append(state)
+            _run(then, taken, quiet)
+            _run(otherwise, not_taken, quiet)
+
+
+def apply_batch(program, colonies, params_list):
+    """
+    Applies a compiled program to many colonies, each with the parameters
+    of its own event instance. Returns the message for each colony.
+    """
+    states = [(colony, params, {}, []) for colony, params in zip(colonies, params_list)]
+    _run(program, states)
+    return ["".join(parts) for _, _, _, parts in states]
+
+
+def apply_effects(program, colony, params):
+    """Applies a compiled program to one colony and returns its message."""
+    return apply_batch(program, (colony,), (params,))[0]
+
+
+def apply_quietly(program, colony, params):
+    """
+    Applies a compiled program to one colony without building its message,
+    for callers that only keep the outcome. Draws the same values as
+    apply_effects.
+    """
+    _run(program, ((colony, params, {}, []),), quiet=True)
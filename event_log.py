@@ -0,0 +1,140 @@
+from collections import deque
+import json
+import time
+
+SEVERITY_INFO = "info"
+SEVERITY_WARNING = "warning" # Shown in yellow by the CLI
+SEVERITY_ERROR = "error"     # Shown in red by the CLI
+
+DEFAULT_HISTORY_CAPACITY = 100
+
+
+class EventRecord:
+    """One entry of a colony's event history."""
+    __slots__ = ("turn", "timestamp", "event_type", "severity", "message", "deltas")
+
+    def __init__(self, message, turn=1, event_type="info", severity=SEVERITY_INFO, deltas=None, timestamp=None):
+        self.turn = turn
+        self.timestamp = time.time() if timestamp is None else timestamp
+        self.event_type = event_type
+        self.severity = severity
+        self.message = message
+        self.deltas = deltas or {} # Resource name -> change caused by this event
+
+    def __str__(self):
+        return self.message
+
+    def __repr__(self):
+        return f"EventRecord({self.message!r}, turn={self.turn}, event_type={self.event_type!r}, severity={self.severity!r})"
+
+    def to_dict(self):
+        return {
+            "turn": self.turn,
+            "timestamp": self.timestamp,
+            "event_type": self.event_type,
+            "severity": self.severity,
+            "message": self.message,
+            "deltas": self.deltas,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        if isinstance(data, str): # Saves from before structured history stored bare messages
+            return cls(data, event_type="legacy", timestamp=0.0)
+        return cls(
+            data.get("message", ""),
+            turn=data.get("turn", 1),
+            event_type=data.get("event_type", "info"),
+            severity=data.get("severity", SEVERITY_INFO),
+            deltas=data.get("deltas"),
+            timestamp=data.get("timestamp", 0.0),
+        )
+
+
+class JsonLinesSink:
+    """Appends every event record to a JSON-lines file.
+
+    Lets a colony keep its complete history on disk while only the most
+    recent records stay in memory.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "a", encoding="utf-8", buffering=1) # Line buffered
+
+    def write(self, record):
+        self._file.write(json.dumps(record.to_dict()) + "\n")
+
+    def close(self):
+        self._file.close()
+
+    @staticmethod
+    def read(path):
+        """Yields the records stored in a JSON-lines history file, oldest first."""
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield EventRecord.from_dict(json.loads(line))
+
+
+class EventHistory:
+    """Bounded ring buffer of EventRecords.
+
+    Appending is O(1); once the buffer is full the oldest record is dropped.
+    Every record is also written to the optional sink as it is appended, so
+    the full history can live on disk. Indexing and iteration are newest
+    first, matching the order the CLI displays.
+    """
+
+    def __init__(self, capacity=DEFAULT_HISTORY_CAPACITY, sink=None):
+        self._records = deque(maxlen=capacity)
+        self.sink = sink
+        self.appended_count = 0 # Records ever appended, including dropped ones
+
+    @property
+    def capacity(self):
+        return self._records.maxlen
+
+    def append(self, record):
+        self._records.append(record)
+        self.appended_count += 1
+        if self.sink is not None:
+            self.sink.write(record)
+
+    def __len__(self):
+        return len(self._records)
+
+    def __iter__(self):
+        return reversed(self._records)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(self)[index]
+        if index < 0:
+            index += len(self._records)
+        if not 0 <= index < len(self._records):
+            raise IndexError("event history index out of range")
+        return self._records[-index - 1]
+
+    def records_since(self, appended_count):
+        """Records appended after appended_count was read, oldest first.
+        Records already dropped from the buffer are not returned."""
+        new_count = min(self.appended_count - appended_count, len(self._records))
+        if new_count <= 0:
+            return []
+        return list(self._records)[-new_count:]
+
+    def clear(self):
+        self._records.clear()
+
+    def query(self, event_type=None, severity=None, since_turn=None):
+        """Returns matching records, newest first."""
+        return [
+            record for record in self
+            if (event_type is None or record.event_type == event_type)
+            and (severity is None or record.severity == severity)
+            and (since_turn is None or record.turn >= since_turn)
+        ]
+
+    def to_list(self):
+        return [record.to_dict() for record in self]
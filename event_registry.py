@@ -0,0 +1,182 @@
+class AliasTable:
+    """
+    Walker/Vose alias table: after O(n) setup, draws an index with
+    probability proportional to its weight in O(1) using one random number.
+    """
+    __slots__ = ("probabilities", "aliases")
+
+    def __init__(self, weights):
+        count = len(weights)
+        total = float(sum(weights))
+        if count == 0 or total <= 0:
+            raise ValueError("AliasTable needs at least one positive weight.")
+        scaled = [weight * count / total for weight in weights]
+        self.probabilities = [1.0] * count
+        self.aliases = list(range(count))
+        small = [index for index, value in enumerate(scaled) if value < 1.0]
+        large = [index for index, value in enumerate(scaled) if value >= 1.0]
+        while small and large:
+            low, high = small.pop(), large.pop()
+            self.probabilities[low] = scaled[low]
+            self.aliases[low] = high
+            scaled[high] -= 1.0 - scaled[low]
+            (small if scaled[high] < 1.0 else large).append(high)
+        # Leftovers are 1.0 up to float rounding and keep their defaults.
+
+    def __len__(self):
+        return len(self.probabilities)
+
+    def sample(self, rng):
+        position = rng.random() * len(self.probabilities)
+        index = int(position)
+        return index if position - index < self.probabilities[index] else self.aliases[index]
+
+
+class EventSpec:
+    """How often and when one event class may fire."""
+    __slots__ = ("event_class", "name", "weight", "cooldown", "predicate")
+
+    def __init__(self, event_class, weight=1.0, cooldown=0.0, predicate=None):
+        if weight <= 0:
+            raise ValueError("Event weight must be positive.")
+        self.event_class = event_class
+        self.name = event_class.__name__
+        self.weight = float(weight)
+        self.cooldown = float(cooldown) # Seconds of colony time before it may fire again
+        self.predicate = predicate      # colony -> bool, None if always eligible
+
+    @property
+    def conditional(self):
+        return self.cooldown > 0 or self.predicate is not None
+
+
+class EventRegistry:
+    """
+    The events a colony can roll, each with a weight, a cooldown and an
+    eligibility predicate.
+
+    choose() draws from one alias table over every registered event and
+    redraws when it lands on an event that is on cooldown or fails its
+    predicate, which yields exactly the weighted distribution over the
+    eligible events in O(1) expected time. Only if MAX_REJECTIONS draws in a
+    row are ineligible (most of the weight is blocked) does it fall back to
+    an alias table for the current eligible set; those are cached per set,
+    so one is built only when that set changes. Cooldowns are per colony,
+    measured in colony time (Colony.elapsed_time) and kept in
+    colony.event_cooldowns.
+    """
+
+    MAX_REJECTIONS = 8
+    MAX_CACHED_TABLES = 64
+
+    def __init__(self):
+        self.specs = []
+        self._always_eligible = ()
+        self._conditional = ()
+        self._full_table = None
+        self._tables = {}
+        self.table_builds = 0 # Alias tables built so far, for tests and benchmarks
+
+    def _reindex(self):
+        self._always_eligible = tuple(index for index, spec in enumerate(self.specs) if not spec.conditional)
+        self._conditional = tuple(index for index, spec in enumerate(self.specs) if spec.conditional)
+        self._full_table = None
+        self._tables.clear()
+
+    def register(self, event_class, weight=None, cooldown=None, predicate=None):
+        """
+        Adds event_class. Arguments left out default to the class's WEIGHT,
+        COOLDOWN and is_eligible (see events.EffectEvent), if it has them.
+        """
+        if weight is None:
+            weight = getattr(event_class, "WEIGHT", 1.0)
+        if cooldown is None:
+            cooldown = getattr(event_class, "COOLDOWN", 0.0)
+        if predicate is None:
+            predicate = getattr(event_class, "is_eligible", None)
+        self.specs.append(EventSpec(event_class, weight, cooldown, predicate))
+        self._reindex()
+        return event_class
+
+    def unregister(self, event_class):
+        self.specs = [spec for spec in self.specs if spec.event_class is not event_class]
+        self._reindex()
+
+    def __len__(self):
+        return len(self.specs)
+
+    def __iter__(self):
+        return iter(self.specs)
+
+    @staticmethod
+    def _is_eligible(spec, colony, now):
+        return (
+            (not spec.cooldown or colony.event_cooldowns.get(spec.name, 0.0) <= now)
+            and (spec.predicate is None or spec.predicate(colony))
+        )
+
+    def _eligible_conditional(self, colony, now):
+        specs = self.specs
+        return tuple(index for index in self._conditional if self._is_eligible(specs[index], colony, now))
+
+    def eligible_indices(self, colony, now=None):
+        """Spec indices that may fire for colony right now."""
+        now = colony.elapsed_time if now is None else now
+        return self._always_eligible + self._eligible_conditional(colony, now)
+
+    def _table(self, eligible_conditional):
+        entry = self._tables.get(eligible_conditional)
+        if entry is None:
+            indices = self._always_eligible + eligible_conditional
+            if not indices:
+                return None
+            if len(self._tables) >= self.MAX_CACHED_TABLES:
+                self._tables.clear()
+            entry = (AliasTable([self.specs[index].weight for index in indices]), indices)
+            self._tables[eligible_conditional] = entry
+            self.table_builds += 1
+        return entry
+
+    def choose(self, colony, rng, now=None):
+        """
+        Draws the event class that fires and starts its cooldown. Returns
+        None if no event is eligible. No event object is created here.
+        """
+        if not self.specs:
+            return None
+        now = colony.elapsed_time if now is None else now
+        if self._full_table is None:
+            self._full_table = AliasTable([spec.weight for spec in self.specs])
+            self.table_builds += 1
+        for _ in range(self.MAX_REJECTIONS):
+            spec = self.specs[self._full_table.sample(rng)]
+            if not spec.conditional or self._is_eligible(spec, colony, now):
+                break
+        else:
+            entry = self._table(self._eligible_conditional(colony, now))
+            if entry is None:
+                return None
+            table, indices = entry
+            spec = self.specs[indices[table.sample(rng)]]
+        if spec.cooldown:
+            colony.event_cooldowns[spec.name] = now + spec.cooldown
+        return spec.event_class
+
+
+_registries_by_classes = {}
+
+def as_registry(events):
+    """
+    Accepts an EventRegistry or a plain list of event classes (each equally
+    likely, as before registries existed) and returns a registry.
+    """
+    if isinstance(events, EventRegistry):
+        return events
+    key = tuple(events)
+    registry = _registries_by_classes.get(key)
+    if registry is None:
+        registry = EventRegistry()
+        for event_class in key:
+            registry.register(event_class)
+        _registries_by_classes[key] = registry
+    return registry
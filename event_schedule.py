@@ -0,0 +1,66 @@
+import heapq
+import itertools
+
+
+class EventSchedule:
+    """
+    Time-ordered schedule of when each of many colonies (or anything else
+    identified by a hashable key) next needs attention, e.g. the wall-clock
+    time its next random event is due.
+
+    A min-heap keyed by due time, so finding the next due entry is O(1) and
+    pushing or popping one is O(log n) whether it holds one colony or a
+    hundred thousand. Rescheduling a key pushes a new entry and leaves the old
+    one in the heap; stale entries are skipped when they reach the top and
+    the heap is rebuilt once they make up most of it.
+    """
+
+    def __init__(self):
+        self._heap = []
+        self._due = {}
+        self._counter = itertools.count() # Tie-breaker so keys are never compared
+
+    def __len__(self):
+        return len(self._due)
+
+    def __contains__(self, key):
+        return key in self._due
+
+    def due_time(self, key):
+        return self._due.get(key)
+
+    def push(self, key, due):
+        """Schedules key at `due`, replacing any earlier schedule for it."""
+        self._due[key] = due
+        heapq.heappush(self._heap, (due, next(self._counter), key))
+        if len(self._heap) > 2 * len(self._due) + 64:
+            self._rebuild()
+
+    def remove(self, key):
+        self._due.pop(key, None)
+
+    def _rebuild(self):
+        self._heap = [entry for entry in self._heap if self._due.get(entry[2]) == entry[0]]
+        heapq.heapify(self._heap)
+
+    def _drop_stale(self):
+        heap = self._heap
+        while heap and self._due.get(heap[0][2]) != heap[0][0]:
+            heapq.heappop(heap)
+
+    def next_due(self):
+        """The earliest due time, or None if nothing is scheduled."""
+        self._drop_stale()
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now):
+        """Removes and returns the keys due at or before `now`, earliest first."""
+        keys = []
+        heap = self._heap
+        while True:
+            self._drop_stale()
+            if not heap or heap[0][0] > now:
+                return keys
+            _, _, key = heapq.heappop(heap)
+            del self._due[key]
+            keys.append(key)
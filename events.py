@@ -1,5 +1,15 @@
 import random
 
+from event_effects import (
+    Add, Drain, DamageBuilding, Say, Chance, IfAffordable, Roll, Pick, Param,
+    compile_effects, apply_effects, apply_batch, apply_quietly,
+)
+from major_events import DEFAULT_DEADLINE
+
+# Event classes by class name, for restoring queued events from saves.
+# Every EffectEvent subclass registers itself here.
+EVENT_CLASSES_BY_NAME = {}
+
 class Event:
     def __init__(self, name, description):
         self.name = name
@@ -12,140 +22,175 @@ class Event:
         # For major events, this method will be overridden.
         return f"{self.name}: {self.description} (Effect applied)."
 
-class MinorResourceBoost(Event):
-    def __init__(self):
-        resource_types = ["Minerals", "Energy", "Food"] # Added Food
-        self.resource_type = random.choice(resource_types)
-        self.amount = float(random.randint(25, 75)) # Grant a float amount
-        super().__init__(
-            name="Minor Resource Boost",
-            description=f"Discovered a small cache of {self.resource_type}." # Description used if apply not specific
-        )
-
-    def apply(self, colony):
-        colony.add_resource(self.resource_type, self.amount)
-        # Return the description as the primary message for history
-        return f"{self.name}: Added {self.amount:.1f} {self.resource_type}."
-
-class SmallResourceDrain(Event):
-    def __init__(self):
-        resource_types = ["Minerals", "Energy"]
-        self.resource_type = random.choice(resource_types)
-        self.amount = float(random.randint(10, 30)) # Drain a float amount
-        super().__init__(
-            name="Small Resource Drain",
-            description=f"A minor equipment malfunction caused a small loss of {self.resource_type}."
-        )
-
-    def apply(self, colony):
-        current_amount = colony.get_resources().get(self.resource_type, 0.0)
-        actual_drain = min(self.amount, current_amount) # Don't go below zero
-        
-        # Use spend_resources for consistency. spend_resources expects a dict.
-        # It also checks for sufficient resources, which is good.
-        # If we want to ensure it drains even if this specific amount isn't "enough" for a build,
-        # we might need a more direct subtraction, but spend_resources is safer.
-        # Let's assume spend_resources handles this correctly or we adjust if not.
-        # The current spend_resources returns True/False and deducts if True.
-        # For a drain, we always want to deduct up to the available amount.
-        # Modifying spend_resources to handle this or adding a direct_spend method might be better.
-        # For now, let's try to make it work with current spend_resources.
-        # If we only want to drain if the colony has the full amount, spend_resources is fine.
-        # The requirement "Don't go below zero" implies we should drain what we can.
-
-        if actual_drain > 0: # Only proceed if there's something to drain
-             # We need to bypass the typical "cost" check of spend_resources for a drain.
-             # Let's directly modify resources for a drain, ensuring it doesn't go negative.
-             colony.resources[self.resource_type] = max(0.0, current_amount - actual_drain)
-
-        return f"{self.name}: Lost {actual_drain:.1f} {self.resource_type} due to a malfunction."
-
-class ProductionSpike(Event):
-    def __init__(self):
-        self.duration_equivalent_seconds = random.randint(20, 60) # Effect equivalent to X seconds of production
-        super().__init__(
-            name="Production Spike",
-            description=f"Temporary surge in production efficiency!"
-        )
-
-    def apply(self, colony):
-        # Calculate one-time bonus based on current production rates
-        # This requires knowing current production rates.
-        # For now, let's grant a fixed bonus to Minerals and Energy as a placeholder.
-        bonus_minerals = float(random.randint(10,30)) # Placeholder
-        bonus_energy = float(random.randint(5,20))   # Placeholder
-        
-        colony.add_resource("Minerals", bonus_minerals)
-        colony.add_resource("Energy", bonus_energy)
-        
-        return f"{self.name}: Systems surged, granting an instant bonus of {bonus_minerals:.1f} Minerals and {bonus_energy:.1f} Energy."
-
-class SolarFlare(Event):
-    def __init__(self):
-        super().__init__(
-            name="Solar Flare",
-            description="An intense solar flare disrupts colony systems."
-        )
-
-    def apply(self, colony):
-        lost_energy = float(random.randint(20, 40))
-        current = colony.get_resources().get("Energy", 0.0)
-        actual = min(lost_energy, current)
-        if actual > 0:
-            colony.resources["Energy"] = max(0.0, current - actual)
-        return f"{self.name}: Lost {actual:.1f} Energy due to radiation interference."
-
-class MeteorStrikeWarning(Event):
-    def __init__(self):
-        super().__init__(
-            name="Meteor Strike Warning!",
-            description="Scanners detect a meteor shower heading towards the colony!"
-        )
-        self.is_major = True
-        self.choices = [
-            {"text": "Attempt to shoot down meteors (Cost: 50 Energy, Risky)", "key": "shoot_down"},
-            {"text": "Brace for impact (Minimal cost, damage likely)", "key": "brace"}
-        ]
-
-    def apply(self, colony, choice_key): # apply now takes choice_key
-        outcome_message = f"{self.name} - "
-        if choice_key == "shoot_down":
-            cost = {"Energy": 50.0}
-            if colony.has_enough_resources(cost):
-                colony.spend_resources(cost)
-                if random.random() < 0.60: # 60% success
-                    bonus_minerals = float(random.randint(20, 50))
-                    colony.add_resource("Minerals", bonus_minerals)
-                    outcome_message += f"Successfully defended! Gained {bonus_minerals:.1f} Minerals from salvaged meteors."
-                else: # 40% failure
-                    lost_energy_amount = float(random.randint(30, 60))
-                    current_energy = colony.get_resources().get("Energy", 0.0)
-                    actual_energy_loss = min(lost_energy_amount, current_energy)
-                    if actual_energy_loss > 0:
-                        colony.resources["Energy"] = max(0.0, current_energy - actual_energy_loss)
-                    outcome_message += f"Defense failed! Lost {actual_energy_loss:.1f} additional Energy. "
-                    outcome_message += colony.damage_random_building()
-            else:
-                outcome_message += "Not enough Energy to attempt defense! Bracing for impact instead. "
-                # Fall through to brace logic
-                lost_minerals_amount = float(random.randint(50,100))
-                current_minerals = colony.get_resources().get("Minerals", 0.0)
-                actual_mineral_loss = min(lost_minerals_amount, current_minerals)
-                if actual_mineral_loss > 0:
-                    colony.resources["Minerals"] = max(0.0, current_minerals - actual_mineral_loss)
-                outcome_message += f"Lost {actual_mineral_loss:.1f} Minerals during impact. "
-                outcome_message += colony.damage_random_building()
-
-        elif choice_key == "brace":
-            if random.random() < 0.30: # 30% no damage
-                outcome_message += "Braced for impact. Thankfully, the colony sustained no significant damage."
-            else: # 70% moderate damage
-                lost_minerals_amount = float(random.randint(25, 75))
-                current_minerals = colony.get_resources().get("Minerals", 0.0)
-                actual_mineral_loss = min(lost_minerals_amount, current_minerals)
-                if actual_mineral_loss > 0:
-                    colony.resources["Minerals"] = max(0.0, current_minerals - actual_mineral_loss)
-                outcome_message += f"Braced for impact. Lost {actual_mineral_loss:.1f} Minerals. "
-                outcome_message += colony.damage_random_building()
-        
-        return outcome_message
+class EffectEvent(Event):
+    """
+    An event described as data (see event_effects.py).
+
+    PARAMS are drawn from the rng in order when the event is created and
+    become attributes. Background events run EFFECTS; major events offer
+    CHOICES as (key, text, effects) and run the effects of the chosen key
+    (EFFECTS for an unknown key). Each class compiles its effects once.
+    Major events wait in the colony's queue by PRIORITY and get
+    DEFAULT_CHOICE (None for the last choice) if not answered within
+    DEADLINE seconds of colony time. An EventRegistry draws the class with
+    its WEIGHT, not again within COOLDOWN seconds of colony time, and only
+    while is_eligible(colony) holds if the class defines it.
+    """
+    NAME = ""
+    DESCRIPTION = "" # Formatted with the drawn PARAMS
+    PARAMS = ()      # (attribute, Roll or Pick) pairs
+    EFFECTS = ()
+    CHOICES = ()
+    PRIORITY = 0
+    DEADLINE = DEFAULT_DEADLINE
+    DEFAULT_CHOICE = None
+    WEIGHT = 1.0
+    COOLDOWN = 0.0
+    is_eligible = None # A classmethod taking the colony, in classes that may not always fire
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        EVENT_CLASSES_BY_NAME[cls.__name__] = cls
+
+    def __init__(self, rng=None):
+        rng = rng if rng is not None else random # Normally the colony's own stream
+        self._set_params({attribute: source.draw(rng) for attribute, source in self.PARAMS})
+
+    def _set_params(self, params):
+        for attribute, _ in self.PARAMS:
+            setattr(self, attribute, params[attribute])
+        super().__init__(name=self.NAME, description=self.DESCRIPTION.format_map(vars(self)))
+        self.is_major = bool(self.CHOICES)
+        self.choices = [{"text": text, "key": key} for key, text, _ in self.CHOICES]
+
+    def params(self):
+        """The values drawn for PARAMS; from_params recreates the event from them."""
+        return {attribute: getattr(self, attribute) for attribute, _ in self.PARAMS}
+
+    @classmethod
+    def from_params(cls, params):
+        """Recreates an event, e.g. one restored from a save, without drawing anything."""
+        event = cls.__new__(cls)
+        event._set_params(params)
+        return event
+
+    @classmethod
+    def program(cls, choice_key=None):
+        """The compiled operations run for choice_key (None for background events)."""
+        programs = cls.__dict__.get("_programs") # Not inherited from a parent class
+        if programs is None:
+            programs = {None: compile_effects(cls.EFFECTS)}
+            for key, _, effects in cls.CHOICES:
+                programs[key] = compile_effects(effects)
+            cls._programs = programs
+        return programs.get(choice_key, programs[None])
+
+    def apply(self, colony, choice_key=None):
+        return apply_effects(self.program(choice_key), colony, vars(self))
+
+    @classmethod
+    def apply_drawn(cls, colony, rng):
+        """
+        Draws PARAMS and runs EFFECTS on colony without creating an instance
+        or a message, for catch-up where only the outcome matters. Consumes
+        rng exactly as cls(rng).apply(colony) would.
+        """
+        params = {attribute: source.draw(rng) for attribute, source in cls.PARAMS}
+        params["name"] = cls.NAME
+        apply_quietly(cls.program(), colony, params)
+
+    @classmethod
+    def apply_batch(cls, events, colonies, choice_key=None):
+        """
+        Applies one event instance of this class to each colony (events[i] to
+        colonies[i]) in a single pass over the compiled operations. Returns
+        the messages; nothing is added to the event history.
+        """
+        return apply_batch(cls.program(choice_key), colonies, [vars(event) for event in events])
+
+class MinorResourceBoost(EffectEvent):
+    NAME = "Minor Resource Boost"
+    DESCRIPTION = "Discovered a small cache of {resource_type}."
+    PARAMS = (
+        ("resource_type", Pick(["Minerals", "Energy", "Food"])),
+        ("amount", Roll(25, 75)),
+    )
+    EFFECTS = (
+        Add(Param("resource_type"), Param("amount")),
+        Say("{name}: Added {amount:.1f} {resource_type}."),
+    )
+
+class SmallResourceDrain(EffectEvent):
+    NAME = "Small Resource Drain"
+    DESCRIPTION = "A minor equipment malfunction caused a small loss of {resource_type}."
+    PARAMS = (
+        ("resource_type", Pick(["Minerals", "Energy"])),
+        ("amount", Roll(10, 30)),
+    )
+    EFFECTS = (
+        Drain(Param("resource_type"), Param("amount"), store="lost"),
+        Say("{name}: Lost {lost:.1f} {resource_type} due to a malfunction."),
+    )
+
+class ProductionSpike(EffectEvent):
+    NAME = "Production Spike"
+    DESCRIPTION = "Temporary surge in production efficiency!"
+    PARAMS = (
+        ("duration_equivalent_seconds", Roll(20, 60)), # Effect equivalent to X seconds of production
+    )
+    EFFECTS = (
+        # A fixed bonus to Minerals and Energy as a placeholder for scaling with production
+        Add("Minerals", Roll(10, 30), store="minerals"),
+        Add("Energy", Roll(5, 20), store="energy"),
+        Say("{name}: Systems surged, granting an instant bonus of {minerals:.1f} Minerals and {energy:.1f} Energy."),
+    )
+
+class SolarFlare(EffectEvent):
+    NAME = "Solar Flare"
+    DESCRIPTION = "An intense solar flare disrupts colony systems."
+    EFFECTS = (
+        Drain("Energy", Roll(20, 40), store="lost"),
+        Say("{name}: Lost {lost:.1f} Energy due to radiation interference."),
+    )
+
+class MeteorStrikeWarning(EffectEvent):
+    NAME = "Meteor Strike Warning!"
+    DESCRIPTION = "Scanners detect a meteor shower heading towards the colony!"
+    EFFECTS = (Say("{name} - "),) # Unknown choice
+    DEFAULT_CHOICE = "brace"
+
+    CHOICES = (
+        ("shoot_down", "Attempt to shoot down meteors (Cost: 50 Energy, Risky)", (
+            Say("{name} - "),
+            IfAffordable({"Energy": 50.0}, then=(
+                Chance(0.60, then=( # 60% success
+                    Add("Minerals", Roll(20, 50), store="salvaged"),
+                    Say("Successfully defended! Gained {salvaged:.1f} Minerals from salvaged meteors."),
+                ), otherwise=(
+                    Drain("Energy", Roll(30, 60), store="lost"),
+                    Say("Defense failed! Lost {lost:.1f} additional Energy. "),
+                    DamageBuilding(),
+                )),
+            ), otherwise=(
+                # Not enough Energy: brace for impact instead
+                Say("Not enough Energy to attempt defense! Bracing for impact instead. "),
+                Drain("Minerals", Roll(50, 100), store="lost"),
+                Say("Lost {lost:.1f} Minerals during impact. "),
+                DamageBuilding(),
+            )),
+        )),
+        ("brace", "Brace for impact (Minimal cost, damage likely)", (
+            Say("{name} - "),
+            Chance(0.30, then=( # 30% no damage
+                Say("Braced for impact. Thankfully, the colony sustained no significant damage."),
+            ), otherwise=(
+                Drain("Minerals", Roll(25, 75), store="lost"),
+                Say("Braced for impact. Lost {lost:.1f} Minerals. "),
+                DamageBuilding(),
+            )),
+        )),
+    )
+
+    @classmethod
+    def is_eligible(cls, colony):
+        return len(colony.buildings) > 0 # Its effects damage buildings
@@ -1,9 +1,15 @@
 import json
 import os # For checking file existence
-import random # For event triggering
+import time
 from colony import Colony
+from building_store import BUILDING_TYPE_TABLE, CompactBuildingStore
+from save_format import encode_colony, decode_save, is_binary_save, read_save, write_atomic, SaveFormatError
+from save_journal import journal_path, replay_journal
+from rng import rng_state_to_list, rng_state_from_list
+from event_log import EventRecord, SEVERITY_INFO, SEVERITY_WARNING, SEVERITY_ERROR
 from buildings import Mine, SolarPanel, HydroponicsFarm, ResearchLab, GeothermalPlant # Added GeothermalPlant
-from events import Event, MinorResourceBoost, SmallResourceDrain, ProductionSpike, MeteorStrikeWarning, SolarFlare
+from event_registry import EventRegistry, as_registry
+from events import EffectEvent, MinorResourceBoost, SmallResourceDrain, ProductionSpike, MeteorStrikeWarning, SolarFlare
 
 # Base per-second production rates
 BASE_MINERALS_PER_SECOND = 1.0
@@ -32,11 +38,8 @@ def build_structure(colony_instance, building_class):
     Returns:
         True if building was successful, False otherwise.
     """
-    # Create a temporary instance to get its cost and name
-    # This is because cost is defined on the instance in the current setup
-    temp_building = building_class()
-    cost = temp_building.cost
-    # building_name = temp_building.name # Not used in this function currently
+    # Cost and name are class attributes, so no throwaway instance is needed
+    cost = building_class.BASE_COST
 
     if colony_instance.has_enough_resources(cost):
         if colony_instance.spend_resources(cost):
@@ -50,7 +53,7 @@ def build_structure(colony_instance, building_class):
             print("Error: Spending resources failed even after check.")
             return False
     else:
-        print(f"Not enough resources to build {temp_building.name}.")
+        print(f"Not enough resources to build {building_class.NAME}.")
         missing_resources = []
         for resource, required_amount in cost.items():
             current_amount = colony_instance.resources.get(resource, 0)
@@ -59,6 +62,46 @@ def build_structure(colony_instance, building_class):
         print(f"Missing: {', '.join(missing_resources)}")
         return False
 
+def max_affordable_count(colony_instance, building_class):
+    """Returns how many buildings of building_class the colony can pay for right now."""
+    counts = [
+        int(colony_instance.resources.get(resource, 0.0) // amount)
+        for resource, amount in building_class.BASE_COST.items()
+        if amount > 0
+    ]
+    return max(0, min(counts)) if counts else 0
+
+def build_many(colony_instance, building_class, count):
+    """
+    Builds `count` structures of one type as a single all-or-nothing purchase.
+
+    Returns:
+        (success, affordable_count): whether the buildings were built, and the
+        largest count the colony could have paid for.
+    """
+    affordable_count = max_affordable_count(colony_instance, building_class)
+    if count < 1:
+        return False, affordable_count
+    if count > affordable_count:
+        colony_instance.add_event_to_history(
+            f"Not enough resources to build {count} x {building_class.NAME} (can afford {affordable_count}).",
+            "build", SEVERITY_ERROR
+        )
+        return False, affordable_count
+
+    total_cost = {resource: amount * count for resource, amount in building_class.BASE_COST.items()}
+    if not colony_instance.spend_resources(total_cost): # The count can round past the exact total
+        colony_instance.add_event_to_history(
+            f"Not enough resources to build {count} x {building_class.NAME}.", "build", SEVERITY_ERROR
+        )
+        return False, affordable_count
+    colony_instance.add_buildings(building_class, count)
+    colony_instance.add_event_to_history(
+        f"Constructed {count} x {building_class.NAME}.",
+        "build", deltas={resource: -float(amount) for resource, amount in total_cost.items()}
+    )
+    return True, affordable_count
+
 def generate_resources(colony_instance):
     """
     Generates resources for the colony, including base production and building bonuses.
@@ -114,57 +157,62 @@ def generate_resources(colony_instance):
 #             colony_instance.add_resource(resource_name, amount)
 
 
-def generate_resources(colony_instance, time_delta_seconds):
+def get_production_rates(colony_instance):
     """
-    Generates resources for the colony based on time passed, base rates, and building bonuses.
-    Bonuses are now interpreted as 'per second'.
+    Returns the colony's total per-second production (base rates plus building
+    bonuses) for every resource.
     """
     building_bonuses = colony_instance.calculate_production_bonuses()
 
     # Define base rates for all relevant resources
-    base_rates = {
+    rates = {
         "Minerals": BASE_MINERALS_PER_SECOND,
         "Energy": BASE_ENERGY_PER_SECOND,
         "Food": BASE_FOOD_PER_SECOND,
         "ResearchPoints": BASE_RESEARCH_PER_SECOND
     }
+    for resource_name, bonus_rate in building_bonuses.items():
+        rates[resource_name] = rates.get(resource_name, 0.0) + bonus_rate
+    return rates
 
-    # Get all unique resource types from base rates and bonuses
-    # Ensure all resources defined in base_rates are considered, even if no building produces them yet.
-    all_resource_names = set(base_rates.keys()) | set(building_bonuses.keys())
-
-    for resource_name in all_resource_names:
-        base_rate = base_rates.get(resource_name, 0.0)
-        # Ensure bonus_rate is 0.0 if resource_name not in building_bonuses (e.g. for Food/Research initially)
-        bonus_rate = building_bonuses.get(resource_name, 0.0) 
-        
-        total_rate = base_rate + bonus_rate
+def generate_resources(colony_instance, time_delta_seconds):
+    """
+    Generates resources for the colony based on time passed, base rates, and building bonuses.
+    Bonuses are now interpreted as 'per second'.
+    """
+    for resource_name, total_rate in get_production_rates(colony_instance).items():
         amount_to_add = total_rate * time_delta_seconds
-        
-        if amount_to_add > 0 or (resource_name in colony_instance.resources and colony_instance.resources[resource_name] > 0) :
-            # Add resource if it's being produced, or ensure it exists in colony.resources if it has a base rate
-            # The check for existing resources and positive amount is to ensure that even if a resource has 0 production,
-            # it's handled correctly by add_resource if it was already present (e.g. initial Food)
-            # The primary condition is `amount_to_add > 0`.
-            # The current add_resource in colony.py handles adding new resource types if they appear.
-            if amount_to_add != 0: # Avoid adding 0.0 constantly if no production and no initial amount
-                 colony_instance.add_resource(resource_name, amount_to_add)
+        if amount_to_add != 0: # Avoid adding 0.0 constantly if no production and no initial amount
+            colony_instance.add_resource(resource_name, amount_to_add)
+    colony_instance.elapsed_time += time_delta_seconds
 
-def save_game(colony_instance, filename="savegame.json"):
+def save_game(colony_instance, filename="savegame.json", binary=False):
     """
-    Saves the current state of the colony to a JSON file.
+    Saves the current state of the colony to a JSON file, or to the compact
+    binary format (see save_format.py) with binary=True. Either way the file
+    is replaced atomically.
     """
-    game_state = colony_instance.to_dict()
+    saved_at = time.time() # Lets load_game credit the time spent offline
     try:
-        with open(filename, 'w') as f:
-            json.dump(game_state, f, indent=4)
+        if binary:
+            data = encode_colony(colony_instance, saved_at)
+        else:
+            game_state = colony_instance.to_dict()
+            game_state["saved_at"] = saved_at
+            game_state["rng_state"] = rng_state_to_list(colony_instance.rng) # Resume the exact random stream
+            data = json.dumps(game_state, indent=4).encode("utf-8")
+        write_atomic(filename, data)
         print(f"Game saved successfully to {filename}.")
-    except IOError as e:
+    except (IOError, OSError) as e:
         print(f"Error saving game: {e}")
 
-def load_game(filename="savegame.json"):
+def load_game(filename="savegame.json", compact_buildings=False, catch_up=False):
     """
-    Loads the game state from a JSON file.
+    Loads the game state from a save file, detecting JSON and binary saves
+    and replaying any delta journal written by save_journal.SaveJournal.
+    Pass compact_buildings=True to load into array-backed building storage.
+    With catch_up=True the colony is fast-forwarded by the wall-clock time
+    elapsed since the save was written.
     Returns a Colony instance or None if loading fails.
     """
     if not os.path.exists(filename):
@@ -172,56 +220,21 @@ def load_game(filename="savegame.json"):
         return None
 
     try:
-        with open(filename, 'r') as f:
-            data = json.load(f)
-
-        # Create a new Colony instance, now passing the turn number
-        loaded_turn_number = data.get("turn_number", 1) # Default to 1 if not found
-        new_colony = Colony(initial_turn_number=loaded_turn_number) # This will set default resources
-        
-        # Overwrite with saved resources, ensuring all types are handled and default if missing
-        saved_resources = data.get("resources", {})
-        new_colony.resources["Minerals"] = float(saved_resources.get("Minerals", 0.0))
-        new_colony.resources["Energy"] = float(saved_resources.get("Energy", 0.0))
-        new_colony.resources["Food"] = float(saved_resources.get("Food", 0.0))
-        new_colony.resources["ResearchPoints"] = float(saved_resources.get("ResearchPoints", 0.0))
-        
-        # Reconstruct buildings
-        buildings_data = data.get("buildings", []) # Expects a list of dicts
-        for building_data in buildings_data:
-            if isinstance(building_data, dict): # New format: {"name": "Mine", "level": 1}
-                name = building_data.get("name")
-                level = building_data.get("level", 1)
-            else: # Old format: "Mine" (string) - for backward compatibility if needed
-                name = building_data 
-                level = 1 # Default level for old save format
-
-            building_class = BUILDING_CLASSES.get(name)
-            if not building_class:
-                # Support loading buildings saved with display names that don't
-                # match the dictionary keys (e.g. "Geothermal Plant" vs
-                # "GeothermalPlant").
-                normalized_name = name.replace(" ", "") if isinstance(name, str) else name
-                building_class = BUILDING_CLASSES.get(normalized_name)
-
-            if building_class:
-                building_instance = building_class()
-                building_instance.level = level  # Set the loaded level
-                new_colony.add_building(building_instance)
-            else:
-                # Silently skip unknown building types. In a full game we might
-                # want to log this for debugging.
-                pass
-        
-        # Load research data
-        new_colony.completed_research = set(data.get("completed_research", []))
-        # Default for unlocked_buildings should match Colony.__init__ if key is missing
-        default_unlocked_buildings = {"Mine", "Solar Panel", "Hydroponics Farm", "Research Lab"}
-        new_colony.unlocked_buildings = set(data.get("unlocked_buildings", list(default_unlocked_buildings)))
-        
-        # Load event history
-        new_colony.event_history = data.get("event_history", [])
+        if is_binary_save(filename):
+            fields = read_save(filename)
+            new_colony, saved_at = _colony_from_binary(fields, compact_buildings)
+            # Snapshots written by SaveJournal may have deltas appended since
+            generation = fields["trailer"].get("journal_generation")
+            if generation is not None and os.path.exists(journal_path(filename)):
+                saved_at = replay_journal(new_colony, journal_path(filename), generation) or saved_at
+        else:
+            with open(filename, 'r') as f:
+                data = json.load(f)
+            new_colony, saved_at = _colony_from_dict(data, compact_buildings)
 
+        new_colony.saved_at = saved_at
+        if catch_up and saved_at:
+            fast_forward(new_colony, max(0.0, time.time() - saved_at))
 
         # print(f"Game loaded successfully from {filename}.") # CLI
         return new_colony
@@ -231,12 +244,133 @@ def load_game(filename="savegame.json"):
     except json.JSONDecodeError as e:
         print(f"Error loading game (JSONDecodeError): {e}. Save file might be corrupted.")
         return None
+    except SaveFormatError as e:
+        print(f"Error loading game: {e}")
+        return None
     except Exception as e: # Catch any other potential errors during reconstruction
         # print(f"An unexpected error occurred while loading the game: {e}") # CLI print
         return None
 
+def colony_from_bytes(data, compact_buildings=False):
+    """
+    Rebuilds a colony from binary save bytes (see save_format.encode_colony),
+    e.g. a blob kept in a database. Raises SaveFormatError for bad data.
+    """
+    new_colony, saved_at = _colony_from_binary(decode_save(data), compact_buildings)
+    new_colony.saved_at = saved_at
+    return new_colony
+
+def _colony_from_dict(data, compact_buildings=False):
+    """Rebuilds a colony from a JSON save. Returns (colony, saved_at)."""
+    # Create a new Colony instance, now passing the turn number
+    loaded_turn_number = data.get("turn_number", 1) # Default to 1 if not found
+    new_colony = Colony(
+        initial_turn_number=loaded_turn_number,
+        compact_buildings=compact_buildings,
+        seed=data.get("rng_seed"),
+    ) # This will set default resources
+    if "rng_state" in data:
+        rng_state_from_list(new_colony.rng, data["rng_state"])
+
+    # Overwrite with saved resources, ensuring all types are handled and default if missing
+    saved_resources = data.get("resources", {})
+    new_colony.resources["Minerals"] = float(saved_resources.get("Minerals", 0.0))
+    new_colony.resources["Energy"] = float(saved_resources.get("Energy", 0.0))
+    new_colony.resources["Food"] = float(saved_resources.get("Food", 0.0))
+    new_colony.resources["ResearchPoints"] = float(saved_resources.get("ResearchPoints", 0.0))
+
+    # Reconstruct buildings
+    buildings_data = data.get("buildings", []) # Expects a list of dicts
+    for building_data in buildings_data:
+        if isinstance(building_data, dict): # New format: {"name": "Mine", "level": 1}
+            name = building_data.get("name")
+            level = building_data.get("level", 1)
+        else: # Old format: "Mine" (string) - for backward compatibility if needed
+            name = building_data
+            level = 1 # Default level for old save format
+
+        building_class = BUILDING_CLASSES.get(name)
+        if not building_class:
+            # Support loading buildings saved with display names that don't
+            # match the dictionary keys (e.g. "Geothermal Plant" vs
+            # "GeothermalPlant").
+            normalized_name = name.replace(" ", "") if isinstance(name, str) else name
+            building_class = BUILDING_CLASSES.get(normalized_name)
+
+        if building_class:
+            building_instance = building_class()
+            building_instance.level = level  # Set the loaded level
+            new_colony.add_building(building_instance)
+        else:
+            # Silently skip unknown building types. In a full game we might
+            # want to log this for debugging.
+            pass
+
+    new_colony.elapsed_time = float(data.get("elapsed_time", 0.0))
+
+    # Load research data
+    new_colony.completed_research = set(data.get("completed_research", []))
+    # Default for unlocked_buildings should match Colony.__init__ if key is missing
+    default_unlocked_buildings = {"Mine", "Solar Panel", "Hydroponics Farm", "Research Lab"}
+    new_colony.unlocked_buildings = set(data.get("unlocked_buildings", list(default_unlocked_buildings)))
+
+    # Load event history (stored newest first)
+    for entry in reversed(data.get("event_history", [])):
+        new_colony.event_history.append(EventRecord.from_dict(entry))
+    new_colony.building_changes = [] # Loading is not a change to save
+    if "version" in data:
+        new_colony.restore_version(data["version"])
+    return new_colony, data.get("saved_at")
+
+def _colony_from_binary(fields, compact_buildings=False):
+    """Rebuilds a colony from decoded binary save fields. Returns (colony, saved_at)."""
+    trailer = fields["trailer"]
+    new_colony = Colony(
+        initial_turn_number=fields["turn_number"],
+        compact_buildings=compact_buildings,
+        seed=trailer.get("rng_seed"),
+    )
+    new_colony.rng.setstate(fields["rng_state"])
+    new_colony.resources.update(fields["resources"])
+
+    type_ids, levels = fields["type_ids"], fields["levels"]
+    if compact_buildings:
+        new_colony.buildings = CompactBuildingStore(type_ids, levels) # Arrays are used as decoded
+    else:
+        building_classes = [building_type.building_class for building_type in BUILDING_TYPE_TABLE]
+        for type_id, level in zip(type_ids, levels):
+            building_instance = building_classes[type_id]()
+            building_instance.level = level
+            new_colony.buildings.append(building_instance)
+    new_colony.rebuild_production_rates()
+
+    new_colony.elapsed_time = fields["elapsed_time"]
+    new_colony.completed_research = fields["completed_research"]
+    new_colony.unlocked_buildings = fields["unlocked_buildings"]
+    for entry in reversed(trailer.get("event_history", [])):
+        new_colony.event_history.append(EventRecord.from_dict(entry))
+    new_colony.restore_event_state(trailer.get("event_state", {}))
+    if "state_version" in trailer:
+        new_colony.restore_version(trailer["state_version"])
+    return new_colony, fields["saved_at"]
+
 AVAILABLE_EVENT_CLASSES = [MinorResourceBoost, SmallResourceDrain, ProductionSpike, SolarFlare, MeteorStrikeWarning]
 
+# The default events, with the weight, cooldown and eligibility each one
+# declares; anywhere that accepts AVAILABLE_EVENT_CLASSES also accepts an
+# EventRegistry.
+EVENT_REGISTRY = EventRegistry()
+for _event_class in AVAILABLE_EVENT_CLASSES:
+    EVENT_REGISTRY.register(_event_class)
+
+# Events arrive as a Poisson process of EVENT_RATE per second of colony
+# time, the same average as the old roll with EVENT_CHANCE every
+# EVENT_CHECK_INTERVAL seconds. trigger_random_event still rolls EVENT_CHANCE
+# per call for callers that poll.
+EVENT_CHECK_INTERVAL = 10.0
+EVENT_CHANCE = 0.15
+EVENT_RATE = EVENT_CHANCE / EVENT_CHECK_INTERVAL
+
 def trigger_random_event(colony_instance, available_event_classes):
     """
     Attempts to trigger a random event based on a chance.
@@ -244,6 +378,7 @@ def trigger_random_event(colony_instance, available_event_classes):
     """
     if not available_event_classes:
         return None # No event classes defined to trigger
+    registry = as_registry(available_event_classes)
 
     # Example: 10% chance to trigger an event per call
     # This chance mechanism might be tied to the event_trigger_interval in main.py
@@ -251,25 +386,333 @@ def trigger_random_event(colony_instance, available_event_classes):
     
     # Self-correction: Adjusting event trigger chance for testing major events more easily
     # For actual gameplay, this might be lower or vary per event type
-    if random.random() < 0.15: # Adjusted chance to 15%
-        # Randomly select an event *class*
-        SelectedEventClass = random.choice(available_event_classes)
-        
-        # Instantiate the selected event class
-        event_instance = SelectedEventClass() # Event-specific __init__ is called here
-
-        if event_instance.is_major:
-            return event_instance # Return the event instance itself for major events
-        else:
-            # For background events, apply immediately and add to history
-            message = event_instance.apply(colony_instance) # Pass None for choice_key
-            colony_instance.add_event_to_history(message)
-            return None # Indicate no major event popup needed
-    
+    rng = colony_instance.rng
+    if rng.random() < EVENT_CHANCE:
+        return fire_event(colony_instance, registry)
     return None # No event triggered
 
+def fire_event(colony_instance, registry, now=None):
+    """
+    Draws an event from the registry and fires it at colony time `now`.
+    Background events are applied and logged right away; a major event is
+    returned for the player to resolve. Returns None otherwise.
+    """
+    rng = colony_instance.rng
+    # Draw an event *class* by weight among the eligible ones
+    SelectedEventClass = registry.choose(colony_instance, rng, now)
+    if SelectedEventClass is None:
+        return None # Everything is on cooldown or ineligible
+
+    # Instantiate the selected event class
+    event_instance = SelectedEventClass(rng) # Event-specific __init__ is called here
+
+    if event_instance.is_major:
+        return event_instance # Return the event instance itself for major events
+    # For background events, apply immediately and add to history
+    _apply_and_record(colony_instance, lambda: event_instance.apply(colony_instance))
+    return None # Indicate no major event popup needed
+
+def schedule_next_event(colony_instance, after=None):
+    """
+    Draws the colony time of the colony's next event: `after` (default its
+    current time) plus an exponential gap with mean 1 / EVENT_RATE.
+    """
+    start = colony_instance.elapsed_time if after is None else after
+    colony_instance.next_event_time = start + colony_instance.rng.expovariate(EVENT_RATE)
+    return colony_instance.next_event_time
+
+def seconds_until_event(colony_instance):
+    """Colony seconds until the next scheduled event (0.0 if it is overdue)."""
+    if colony_instance.next_event_time is None:
+        schedule_next_event(colony_instance)
+    return max(0.0, colony_instance.next_event_time - colony_instance.elapsed_time)
+
+def run_due_events(colony_instance, available_event_classes=None):
+    """
+    Fires every scheduled event whose time the colony has reached, each at
+    its own scheduled time, and schedules the one after it. Major events are
+    queued on colony_instance.pending_major_events. Returns how many events
+    were due.
+    """
+    registry = as_registry(EVENT_REGISTRY if available_event_classes is None else available_event_classes)
+    if colony_instance.next_event_time is None:
+        schedule_next_event(colony_instance)
+    due = 0
+    while colony_instance.next_event_time <= colony_instance.elapsed_time:
+        event_time = colony_instance.next_event_time
+        if registry:
+            major_event = fire_event(colony_instance, registry, event_time)
+            if major_event:
+                colony_instance.pending_major_events.push(major_event, event_time)
+        schedule_next_event(colony_instance, event_time)
+        due += 1
+    return due
+
 def resolve_major_event(colony, event_instance, choice_key):
     if not event_instance or not event_instance.is_major:
         return
-    outcome_message = event_instance.apply(colony, choice_key)
-    colony.add_event_to_history(outcome_message)
+    _apply_and_record(colony, lambda: event_instance.apply(colony, choice_key))
+
+def resolve_pending_event(colony, event_id, choice_key):
+    """
+    Resolves the queued major event with id event_id (see
+    colony.pending_major_events) with choice_key and returns its history
+    record. Raises KeyError for an unknown id and ValueError for a choice
+    the event does not offer; the event stays queued in that case.
+    """
+    entry = colony.pending_major_events.get(event_id)
+    if entry is None:
+        raise KeyError(event_id)
+    if choice_key not in [choice["key"] for choice in entry.event.choices]:
+        raise ValueError(f"Unknown choice {choice_key!r} for {entry.event.name}.")
+    colony.pending_major_events.remove(event_id)
+    return _apply_and_record(colony, lambda: entry.event.apply(colony, choice_key))
+
+def expire_major_events(colony, now=None):
+    """
+    Applies the default choice of every queued major event whose deadline
+    has passed (colony time `now`, default the colony's current time), so an
+    unanswered alert never holds the colony up. Returns how many expired.
+    """
+    now = colony.elapsed_time if now is None else now
+    expired = colony.pending_major_events.pop_expired(now)
+    for entry in expired:
+        _apply_and_record(
+            colony, lambda: f"No decision in time, defaulted: {entry.event.apply(colony, entry.default_choice)}"
+        )
+    return len(expired)
+
+def _apply_and_record(colony_instance, apply_event):
+    """
+    Runs an event effect and logs its message together with the resource
+    deltas it caused. The entry is marked as an error (shown in red) when the
+    colony lost production through building damage, or only lost resources.
+    """
+    resources_before = dict(colony_instance.resources)
+    rates_before = dict(colony_instance.production_rates)
+    message = apply_event()
+
+    deltas = {}
+    for resource_name, amount in colony_instance.resources.items():
+        change = amount - resources_before.get(resource_name, 0.0)
+        if change:
+            deltas[resource_name] = change
+    lost_production = any(
+        colony_instance.production_rates.get(resource_name, 0.0) < rate - 1e-9
+        for resource_name, rate in rates_before.items()
+    )
+    only_losses = any(change < 0 for change in deltas.values()) and not any(change > 0 for change in deltas.values())
+    severity = SEVERITY_ERROR if lost_production or only_losses else SEVERITY_INFO
+    return colony_instance.add_event_to_history(message, "event", severity, deltas)
+
+def fast_forward(colony_instance, seconds, available_event_classes=None):
+    """
+    Advances a colony by `seconds` of idle time in a single call.
+
+    Production is linear between events, so it is added in closed form per
+    segment instead of tick by tick. Events fire at the colony's scheduled
+    event times (see schedule_next_event), jumping from one to the next, so
+    the cost grows with the number of events, not with the length of the
+    interval. Background events are applied at their point in time and
+    summarised in a single history entry; major events are queued on
+    colony_instance.pending_major_events for the player to resolve.
+
+    Each event still costs a few microseconds (a simulated week, about 9k
+    events, takes about 60 ms): cooldowns, eligibility and drains depend
+    on the state at that event's time, and the draws must stay in stream
+    order. Background events skip building an instance and a message,
+    which is most of what could be batched.
+
+    Returns a summary dict with the counts of applied and queued events.
+    """
+    registry = as_registry(EVENT_REGISTRY if available_event_classes is None else available_event_classes)
+    if seconds <= 0:
+        return {"seconds": 0.0, "background_events": 0, "queued_major_events": 0}
+
+    # Background events never touch buildings and major ones are only queued,
+    # so the production rates stay fixed for the whole interval.
+    rates = get_production_rates(colony_instance)
+    resources = colony_instance.resources
+    resources_before = dict(resources)
+    producing = [(resource_name, rate) for resource_name, rate in rates.items() if rate]
+    for resource_name, _ in producing:
+        resources.setdefault(resource_name, 0.0)
+
+    background_events = 0
+    queued_major_events = 0
+    rng = colony_instance.rng
+    start_time = colony_instance.elapsed_time
+    end_time = start_time + seconds
+    elapsed_until = start_time
+    if colony_instance.next_event_time is None:
+        schedule_next_event(colony_instance)
+    while colony_instance.next_event_time <= end_time:
+        event_time = colony_instance.next_event_time
+        gap = event_time - elapsed_until
+        for resource_name, rate in producing:
+            resources[resource_name] += rate * gap
+        elapsed_until = event_time
+
+        # Draws happen in the same order as in run_due_events, so live play
+        # and fast_forward consume the colony's random stream identically.
+        event_class = registry.choose(colony_instance, rng, event_time) if registry else None
+        if event_class is not None and issubclass(event_class, EffectEvent) and not event_class.CHOICES:
+            # Only the outcome of a background event is kept, so skip its instance and message
+            event_class.apply_drawn(colony_instance, rng)
+            background_events += 1
+        elif event_class is not None:
+            event_instance = event_class(rng)
+            if event_instance.is_major:
+                colony_instance.pending_major_events.push(event_instance, event_time)
+                queued_major_events += 1
+            else:
+                event_instance.apply(colony_instance)
+                background_events += 1
+        schedule_next_event(colony_instance, event_time)
+
+    for resource_name, rate in rates.items():
+        resources[resource_name] = resources.get(resource_name, 0.0) + rate * (end_time - elapsed_until)
+    colony_instance.elapsed_time = end_time
+
+    deltas = {name: amount - resources_before.get(name, 0.0) for name, amount in resources.items()}
+    colony_instance.add_event_to_history(
+        f"{_format_duration(seconds)} passed: {background_events} events, "
+        f"{queued_major_events} alerts awaiting a decision.",
+        "fast_forward", SEVERITY_WARNING if queued_major_events else SEVERITY_INFO, deltas
+    )
+    return {
+        "seconds": float(seconds),
+        "background_events": background_events,
+        "queued_major_events": queued_major_events,
+    }
+
+def accrue(colony_instance, seconds, available_event_classes=None):
+    """
+    Brings a colony forward by `seconds` in closed form, for colonies that
+    are only looked at now and then (the API). Production is linear between
+    events, so resources grow by the cached production rates times each gap.
+    Events fire, and unanswered alerts get their default choice, at their
+    own times and are logged one by one, as in SimulationClock.advance. The
+    cost grows with the number of events in the interval, not its length.
+
+    Returns the number of events fired.
+    """
+    if seconds <= 0:
+        return 0
+    end_time = colony_instance.elapsed_time + seconds
+    if colony_instance.next_event_time is None:
+        schedule_next_event(colony_instance)
+    major_events = colony_instance.pending_major_events
+    fired = 0
+    while True:
+        stop = min(colony_instance.next_event_time, end_time)
+        deadline = major_events.next_deadline()
+        if deadline is not None:
+            stop = min(stop, deadline)
+        if stop > colony_instance.elapsed_time:
+            # Current rates: an expired alert may have damaged a building
+            generate_resources(colony_instance, stop - colony_instance.elapsed_time)
+            colony_instance.elapsed_time = stop # Exact, without rounding drift
+        if colony_instance.elapsed_time >= colony_instance.next_event_time:
+            fired += run_due_events(colony_instance, available_event_classes)
+        elif deadline is not None and colony_instance.elapsed_time >= deadline:
+            expire_major_events(colony_instance)
+        else:
+            return fired
+
+def _format_duration(seconds):
+    hours, remainder = divmod(int(seconds), 3600)
+    minutes, secs = divmod(remainder, 60)
+    if hours:
+        return f"{hours}h {minutes}m"
+    if minutes:
+        return f"{minutes}m {secs}s"
+    return f"{secs}s"
+
+# Length of one simulation step.
+TICK_SECONDS = 0.1
+# Ticks simulated one by one per advance() call; any backlog beyond that is
+# settled analytically by fast_forward so a stalled caller cannot spiral.
+MAX_CATCH_UP_TICKS = 600
+
+class SimulationClock:
+    """
+    Fixed-step simulation clock shared by the curses loop and the API.
+
+    Callers feed in real elapsed time; it is scaled by `speed` (e.g. 100 or
+    10000 for testing) and collected in an accumulator that is drained in
+    whole ticks of `tick_seconds`. Production and event checks therefore run
+    with the same step and cadence no matter how often or irregularly the
+    caller advances the clock, and a run can be replayed from the colony's
+    seed. A tick only does event work when the colony's scheduled event time
+    has come (see run_due_events); major events are queued on
+    colony.pending_major_events and get their default choice once their
+    deadline passes unanswered.
+    """
+
+    def __init__(self, tick_seconds=TICK_SECONDS, speed=1.0, max_catch_up_ticks=MAX_CATCH_UP_TICKS,
+                 available_event_classes=None):
+        self.tick_seconds = tick_seconds
+        self.speed = speed
+        self.max_catch_up_ticks = max_catch_up_ticks
+        self.available_event_classes = (
+            EVENT_REGISTRY if available_event_classes is None else available_event_classes
+        )
+        self.accumulator = 0.0
+        self.total_ticks = 0
+        self.fast_forwarded_seconds = 0.0
+
+    def advance(self, colony_instance, real_elapsed_seconds):
+        """
+        Advances the colony by the simulated time corresponding to
+        real_elapsed_seconds. Returns the number of ticks simulated step by step.
+        """
+        self.accumulator += max(0.0, real_elapsed_seconds) * self.speed
+        # The epsilon keeps e.g. 3600 / 0.1 from flooring to 35999 ticks
+        ticks = int(self.accumulator / self.tick_seconds + 1e-9)
+        if ticks <= 0:
+            return 0
+        self.accumulator = max(0.0, self.accumulator - ticks * self.tick_seconds)
+
+        stepped_ticks = min(ticks, self.max_catch_up_ticks)
+        if colony_instance.next_event_time is None:
+            schedule_next_event(colony_instance)
+        major_events = colony_instance.pending_major_events
+        next_deadline = major_events.next_deadline()
+        for _ in range(stepped_ticks):
+            generate_resources(colony_instance, self.tick_seconds)
+            if colony_instance.elapsed_time >= colony_instance.next_event_time:
+                run_due_events(colony_instance, self.available_event_classes)
+                next_deadline = major_events.next_deadline()
+            if next_deadline is not None and colony_instance.elapsed_time >= next_deadline:
+                expire_major_events(colony_instance)
+                next_deadline = major_events.next_deadline()
+        self.total_ticks += stepped_ticks
+
+        backlog_seconds = (ticks - stepped_ticks) * self.tick_seconds
+        if backlog_seconds > 0:
+            fast_forward(colony_instance, backlog_seconds, self.available_event_classes)
+            # Deadlines that passed during the backlog are settled at its end
+            expire_major_events(colony_instance)
+            self.fast_forwarded_seconds += backlog_seconds
+            self.total_ticks += ticks - stepped_ticks
+        return stepped_ticks
+
+
+class AccrualClock:
+    """
+    Clock for colonies that are only advanced when read or changed, such as
+    API sessions. Each advance settles the elapsed time at once with accrue,
+    so responses see exact resources and an idle colony costs nothing
+    between requests. Has the speed and advance() of SimulationClock.
+    """
+
+    def __init__(self, speed=1.0, available_event_classes=None):
+        self.speed = speed
+        self.available_event_classes = (
+            EVENT_REGISTRY if available_event_classes is None else available_event_classes
+        )
+
+    def advance(self, colony_instance, real_elapsed_seconds):
+        """Advances the colony by real_elapsed_seconds scaled by speed. Returns the number of events fired."""
+        return accrue(colony_instance, max(0.0, real_elapsed_seconds) * self.speed, self.available_event_classes)
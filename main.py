@@ -1,12 +1,22 @@
 import curses
 import time
+LAUNCH_TIME = time.perf_counter() # Startup is measured from here to the first rendered frame
 from colony import Colony
-from game import generate_resources, build_structure, save_game, load_game, trigger_random_event, AVAILABLE_EVENT_CLASSES, resolve_major_event, BUILDING_CLASSES
+from game import build_structure, save_game, load_game, resolve_pending_event, BUILDING_CLASSES, SimulationClock
 from buildings import Mine, SolarPanel, HydroponicsFarm, ResearchLab, GeothermalPlant # Import new buildings, including GeothermalPlant
 from research import RESEARCH_PROJECTS # Import RESEARCH_PROJECTS
+from event_log import SEVERITY_WARNING, SEVERITY_ERROR
+from planner import plan_route
+from affordability import AffordabilityScheduler
+from building_store import BUILDING_TYPE_TABLE, CompactBuildingStore
+from save_journal import SaveJournal, BackgroundSaver
 import os
 
-def draw_major_event_popup(stdscr, event_instance):
+# The CLI session is resumed from here at startup and autosaved while playing.
+SAVE_PATH = os.environ.get("COLONY_SAVE_PATH", "colony_cli.sav")
+AUTOSAVE_INTERVAL = 30.0 # Seconds; written on a background thread so frames never wait for the disk
+
+def draw_major_event_popup(stdscr, event_instance, seconds_left=None):
     """Draws a popup window for a major event with choices."""
     if not event_instance:
         return
@@ -53,10 +63,44 @@ def draw_major_event_popup(stdscr, event_instance):
         popup.addstr(choice_start_y + i, 2, choice_text, curses.color_pair(1))
         if i >= 1: 
             break 
+    if seconds_left is not None and popup_height >= 10:
+        popup.addstr(popup_height - 2, 2, f"Defaults in {seconds_left:.0f}s. q: Decide later"[:max_line_width], curses.color_pair(1))
     popup.refresh()
     return popup
 
-def draw_build_menu(stdscr, colony_instance):
+def alert_indicator(colony_instance, speed=1.0):
+    """One line about queued major events for the main screen, or None if there are none."""
+    entry = colony_instance.pending_major_events.peek()
+    if entry is None:
+        return None
+    seconds_left = max(0.0, entry.deadline - colony_instance.elapsed_time) / speed
+    count = len(colony_instance.pending_major_events)
+    return (
+        f"ALERTS: {count} pending - {entry.event.name} "
+        f"(defaults to '{entry.default_choice}' in {seconds_left:.0f}s) - press 'a' to respond"
+    )
+
+def affordability_suffix(scheduler, key):
+    """Short "(in 12s)" hint for options that are not affordable yet."""
+    seconds = scheduler.seconds_until(key)
+    if seconds is None:
+        return " (not at current rates)"
+    if seconds > 0:
+        return f" (in {seconds:.0f}s)"
+    return ""
+
+def describe_option(key):
+    action, target = key
+    if action == "upgrade":
+        if isinstance(target, tuple): # An upgrade group: every building of this type and level
+            name, level = target
+            return f"Upgrade a {name} (Lvl {level})"
+        return f"Upgrade building #{target + 1}"
+    if action == "research":
+        return f"Research {RESEARCH_PROJECTS[target]['name']}"
+    return f"Build {target}"
+
+def draw_build_menu(stdscr, colony_instance, scheduler):
     """Draws the build menu."""
     rows, cols = stdscr.getmaxyx()
     menu_height = 10 + len(BUILDING_CLASSES) # Dynamic height
@@ -88,9 +132,7 @@ def draw_build_menu(stdscr, colony_instance):
         if idx >= menu_height - 4: # Ensure it fits in the window
             break
         
-        # Create a temporary instance to get its cost
-        temp_building = building_class()
-        cost = temp_building.cost
+        cost = building_class.BASE_COST
         
         cost_parts = []
         for resource, amount in cost.items():
@@ -100,12 +142,12 @@ def draw_build_menu(stdscr, colony_instance):
             cost_parts.append(f"{int(amount)}{abbreviation}")
         cost_string = ", ".join(cost_parts)
         
-        # Check if player can afford it
-        can_afford = colony_instance.has_enough_resources(cost)
+        # Check if player can afford it (the scheduler only recomputes after a discontinuous change)
+        can_afford = scheduler.is_affordable(("build", name))
         display_color = curses.color_pair(2) if can_afford else curses.color_pair(3) # Green if can afford, Red if not
         if not curses.has_colors(): display_color = curses.color_pair(1) # Fallback for no colors
 
-        menu_item_text = f"{idx+1}. {name} (Cost: {cost_string})"
+        menu_item_text = f"{idx+1}. {name} (Cost: {cost_string}){affordability_suffix(scheduler, ('build', name))}"
         if len(menu_item_text) > menu_width -4:
             menu_item_text = menu_item_text[:menu_width-7] + "..."
 
@@ -114,7 +156,7 @@ def draw_build_menu(stdscr, colony_instance):
     build_win.refresh()
     return build_win
 
-def draw_upgrade_menu(stdscr, colony_instance):
+def draw_upgrade_menu(stdscr, colony_instance, scheduler):
     """Draws the upgrade menu for existing buildings."""
     rows, cols = stdscr.getmaxyx()
     
@@ -164,11 +206,11 @@ def draw_upgrade_menu(stdscr, colony_instance):
         if not cost_parts: # Handle cases like max level where cost might be empty or very high
             cost_string = "N/A (Max Level?)" # Or display the very high cost if applicable
 
-        can_afford = colony_instance.has_enough_resources(cost)
+        can_afford = scheduler.is_affordable(("upgrade", idx))
         display_color = curses.color_pair(2) if can_afford else curses.color_pair(3)
         if not curses.has_colors(): display_color = curses.color_pair(1)
 
-        afford_text = "Affordable" if can_afford else "Too Expensive"
+        afford_text = "Affordable" if can_afford else "Too Expensive" + affordability_suffix(scheduler, ("upgrade", idx))
         menu_item_text = f"{idx+1}. {building.name} (Lvl {building.level}) - Cost: {cost_string} ({afford_text})"
         
         if len(menu_item_text) > menu_width - 4:
@@ -179,7 +221,7 @@ def draw_upgrade_menu(stdscr, colony_instance):
     upgrade_win.refresh()
     return upgrade_win
 
-def draw_research_menu(stdscr, colony_instance):
+def draw_research_menu(stdscr, colony_instance, scheduler):
     """Draws the research menu."""
     rows, cols = stdscr.getmaxyx()
     
@@ -189,11 +231,11 @@ def draw_research_menu(stdscr, colony_instance):
         can_research_now = False
         if project_id in colony_instance.completed_research:
             status = "Completed"
-        elif colony_instance.resources.get("ResearchPoints", 0.0) >= project_details["cost"]:
+        elif scheduler.is_affordable(("research", project_id)):
             status = "Affordable"
             can_research_now = True
         else:
-            status = "Too Expensive"
+            status = "Too Expensive" + affordability_suffix(scheduler, ("research", project_id))
         
         researchable_projects_info.append({
             "id": project_id,
@@ -229,7 +271,7 @@ def draw_research_menu(stdscr, colony_instance):
             status_color = curses.color_pair(2) # Green
         elif project_info["status"] == "Affordable":
             status_color = curses.color_pair(2) # Green
-        elif project_info["status"] == "Too Expensive":
+        elif project_info["status"].startswith("Too Expensive"):
             status_color = curses.color_pair(3) # Red
 
         prefix = "   " # For completed or too expensive
@@ -248,12 +290,101 @@ def draw_research_menu(stdscr, colony_instance):
     research_win.refresh()
     return research_win, researchable_projects_info # Return info for input handling
 
+def plan_goal_options(colony_instance):
+    """Goals offered by the plan menu: every unfinished research project."""
+    return [
+        ({"research": project_id}, project_details["name"])
+        for project_id, project_details in RESEARCH_PROJECTS.items()
+        if project_id not in colony_instance.completed_research
+    ][:9] # Single-key selection
+
+def draw_plan_menu(stdscr, colony_instance, plan=None, goal_label=None):
+    """Draws the planner: a list of goals, or the computed plan for one of them."""
+    rows, cols = stdscr.getmaxyx()
+    goal_options = plan_goal_options(colony_instance)
+    line_count = len(plan["steps"]) + 1 if plan else len(goal_options)
+
+    menu_height = 5 + line_count
+    menu_width = cols - 10
+    if menu_width < 70: menu_width = 70
+    if menu_height > rows - 2: menu_height = rows - 2
+    if menu_height < 5: menu_height = 5
+
+    menu_y = (rows - menu_height) // 2
+    menu_x = (cols - menu_width) // 2
+
+    plan_win = curses.newwin(menu_height, menu_width, menu_y, menu_x)
+    plan_win.border()
+    plan_win.bkgd(' ', curses.color_pair(1))
+
+    if plan is None:
+        plan_win.addstr(1, 2, "PLAN ROUTE TO... (Press 'q' to close)", curses.A_BOLD | curses.color_pair(1))
+        lines = [f"{idx+1}. {label}" for idx, (_, label) in enumerate(goal_options)]
+        if not lines:
+            lines = ["All research completed."]
+    else:
+        plan_win.addstr(1, 2, f"PLAN: {goal_label} (Press 'q' to close)", curses.A_BOLD | curses.color_pair(1))
+        if plan["eta"] is None:
+            lines = ["No route found with current production."]
+        else:
+            lines = []
+            for step in plan["steps"]:
+                detail = f" to level {step['level']}" if step["action"] == "upgrade" else ""
+                lines.append(f"{step['eta']:7.0f}s  {step['action']} {step['target']}{detail}")
+            lines.append(f"Done in about {plan['eta']:.0f}s.")
+
+    for idx, line in enumerate(lines):
+        if idx >= menu_height - 4: # Ensure it fits
+            break
+        if len(line) > menu_width - 4:
+            line = line[:menu_width-7] + "..."
+        plan_win.addstr(3 + idx, 2, line, curses.color_pair(1))
+
+    plan_win.refresh()
+    return plan_win, goal_options
+
+
+def resume_session(save_path=SAVE_PATH):
+    """
+    Loads the last CLI session, or starts a new colony if there is none.
+    Returns (colony, offline_seconds); the offline production is credited
+    later by a single fast_forward so it does not delay the first frame.
+    """
+    colony = load_game(save_path, compact_buildings=True)
+    if colony is None:
+        return Colony(compact_buildings=True), 0.0
+    offline_seconds = max(0.0, time.time() - colony.saved_at) if colony.saved_at else 0.0
+    return colony, offline_seconds
+
+
+def autosave(journal, colony_instance):
+    """Saves through the journal (usually a small delta); never raises."""
+    try:
+        journal.save(colony_instance)
+        return True
+    except OSError as e:
+        colony_instance.add_event_to_history(f"Autosave failed: {e}", "system", SEVERITY_ERROR)
+        return False
+
+
+def building_lines(buildings, max_lines):
+    """One line per building, or per-type counts once they no longer fit."""
+    if len(buildings) <= max_lines:
+        return [f"{building.name} (Level {building.level})" for building in buildings]
+    if isinstance(buildings, CompactBuildingStore):
+        counts = {building_type.name: buildings.type_ids.count(building_type.type_id) for building_type in BUILDING_TYPE_TABLE}
+    else:
+        counts = {}
+        for building in buildings:
+            counts[building.name] = counts.get(building.name, 0) + 1
+    return [f"{name} x{count}" for name, count in counts.items() if count][:max(max_lines, 1)]
+
 
 def main_curses(stdscr):
     # Initialize curses settings
     curses.curs_set(0)  
     stdscr.nodelay(True) 
-    stdscr.timeout(1000) 
+    stdscr.timeout(0) # Don't wait for input before the first frame; see below
 
     # Initialize colors
     if curses.has_colors():
@@ -267,19 +398,25 @@ def main_curses(stdscr):
         curses.init_pair(4, curses.COLOR_WHITE, curses.COLOR_BLACK)
 
 
-    # Initialize Colony (using updated initial resources from colony.py)
-    my_colony = Colony() 
+    # Resume the last session (compact storage keeps large saves quick to load)
+    my_colony, offline_seconds = resume_session()
+    scheduler = AffordabilityScheduler(my_colony)
+    journal = SaveJournal(SAVE_PATH)
+    saver = BackgroundSaver(journal)
+    frames_rendered = 0
 
     # Time and Event management
     last_update_time = time.time()
-    event_trigger_interval = 10.0  
-    time_since_last_event_check = 0.0
+    # COLONY_SIM_SPEED (e.g. 100) runs the colony faster than real time for testing
+    clock = SimulationClock(speed=float(os.environ.get("COLONY_SIM_SPEED", "1")))
+    last_autosave_time = last_update_time
 
     # Game State
     current_game_state = "running" 
     active_major_event = None
     active_popup_window = None 
     research_menu_items_info = [] # To store info from draw_research_menu
+    plan_goal_options_info = [] # Goals listed by draw_plan_menu
 
     # Main game loop
     while True:
@@ -287,33 +424,48 @@ def main_curses(stdscr):
         time_delta = current_time - last_update_time
         last_update_time = current_time
         
-        generate_resources(my_colony, time_delta)
+        clock.advance(my_colony, time_delta) # Production and event checks in fixed ticks
+        if current_time - last_autosave_time >= AUTOSAVE_INTERVAL:
+            saver.save(my_colony) # Only the quick copy happens here
+            last_autosave_time = current_time
+        autosave_error = saver.take_error()
+        if autosave_error:
+            my_colony.add_event_to_history(f"Autosave failed: {autosave_error}", "system", SEVERITY_ERROR)
 
         key = stdscr.getch()
 
         if key == ord('q') and current_game_state == "running": 
+            saver.stop() # Let queued writes finish before the final save
+            autosave(journal, my_colony)
             break
         
         # State-specific input handling first
         if current_game_state == "major_event_popup":
+            if active_major_event and my_colony.pending_major_events.get(active_major_event.event_id) is None:
+                active_major_event = None # Expired (default applied) while the popup was open
             if active_major_event and active_popup_window: # Check if popup is active
                 if key != -1:
+                    choices = active_major_event.event.choices
                     chosen_option_idx = -1
                     if key == ord('1'): chosen_option_idx = 0
-                    elif key == ord('2') and len(active_major_event.choices) > 1: chosen_option_idx = 1
+                    elif key == ord('2') and len(choices) > 1: chosen_option_idx = 1
                     
-                    if chosen_option_idx != -1 and chosen_option_idx < len(active_major_event.choices):
-                        choice_key_from_event = active_major_event.choices[chosen_option_idx]['key']
-                        resolve_major_event(my_colony, active_major_event, choice_key_from_event)
-                        
+                    if chosen_option_idx != -1 and chosen_option_idx < len(choices):
+                        choice_key_from_event = choices[chosen_option_idx]['key']
+                        resolve_pending_event(my_colony, active_major_event.event_id, choice_key_from_event)
+                    if chosen_option_idx != -1 or key == ord('q') or key == curses.KEY_BACKSPACE:
+                        # Answered, or put off until later; the alert stays queued
                         current_game_state = "running"
                         active_major_event = None
                         active_popup_window.clear()
                         active_popup_window = None
                         stdscr.clear() # Force redraw of main screen
                         stdscr.refresh()
-            else: # Fallback if popup isn't active but state is set
+            else: # Popup not shown or its event is gone
                 current_game_state = "running"
+                if active_popup_window:
+                    active_popup_window.clear()
+                    active_popup_window = None
 
         elif current_game_state == "build_menu":
             if active_popup_window: # Check if build menu is active
@@ -338,15 +490,14 @@ def main_curses(stdscr):
                         building_name_to_build = list(BUILDING_CLASSES.keys())[selected_idx]
 
                         # Check affordability before attempting to build
-                        temp_b = selected_building_class()
-                        if my_colony.has_enough_resources(temp_b.cost):
+                        if my_colony.has_enough_resources(selected_building_class.BASE_COST):
                             build_success = build_structure(my_colony, selected_building_class)
                             if build_success:
-                                my_colony.add_event_to_history(f"Construction started: {building_name_to_build}.")
+                                my_colony.add_event_to_history(f"Construction started: {building_name_to_build}.", "build")
                             else: # Should not happen if has_enough_resources was true, but as a fallback
-                                my_colony.add_event_to_history(f"Failed to start construction: {building_name_to_build} (unexpected error).")
+                                my_colony.add_event_to_history(f"Failed to start construction: {building_name_to_build} (unexpected error).", "build", SEVERITY_ERROR)
                         else:
-                            my_colony.add_event_to_history(f"Not enough resources to build {building_name_to_build}.")
+                            my_colony.add_event_to_history(f"Not enough resources to build {building_name_to_build}.", "build", SEVERITY_ERROR)
 
                         current_game_state = "running" # Return to running after attempting to build
                         active_popup_window.clear()
@@ -365,16 +516,13 @@ def main_curses(stdscr):
             elif key == ord('r'): # Add 'r' for research menu
                 current_game_state = "research_menu"
                 research_menu_items_info = [] # Reset when entering menu
-            else: 
-                time_since_last_event_check += time_delta
-                if time_since_last_event_check >= event_trigger_interval:
-                    potentially_major_event = trigger_random_event(my_colony, AVAILABLE_EVENT_CLASSES)
-                    if potentially_major_event and potentially_major_event.is_major:
-                        active_major_event = potentially_major_event
-                        current_game_state = "major_event_popup"
-                        my_colony.add_event_to_history(f"ALERT: {active_major_event.name[:30]}...")
-                        # active_popup_window will be drawn in the display section
-                    time_since_last_event_check = 0.0
+            elif key == ord('p'):
+                current_game_state = "plan_menu"
+            elif key == ord('a') and my_colony.pending_major_events:
+                # Alerts wait in the queue (see the indicator) until the player opens them
+                active_major_event = my_colony.pending_major_events.peek()
+                current_game_state = "major_event_popup"
+                # active_popup_window will be drawn in the display section
 
         # Screen Drawing Logic (based on state)
         if current_game_state == "running":
@@ -384,58 +532,68 @@ def main_curses(stdscr):
             
             stdscr.clear()
             stdscr.addstr(0, 0, "Space Colony Idle - Real Time", curses.color_pair(2))
+            alert_line = alert_indicator(my_colony, clock.speed)
+            if alert_line:
+                stdscr.addstr(1, 0, alert_line[:stdscr.getmaxyx()[1] - 1], curses.color_pair(4))
             stdscr.addstr(2, 0, "RESOURCES:", curses.color_pair(2))
             resources = my_colony.get_resources()
             stdscr.addstr(3, 2, f"Minerals: {resources.get('Minerals', 0.0):.1f}", curses.color_pair(2))
             stdscr.addstr(4, 2, f"Energy:   {resources.get('Energy', 0.0):.1f}", curses.color_pair(2))
             stdscr.addstr(5, 2, f"Food:     {resources.get('Food', 0.0):.1f}", curses.color_pair(2))
             stdscr.addstr(6, 2, f"Research: {resources.get('ResearchPoints', 0.0):.1f}", curses.color_pair(4)) # Yellow for RP
+            next_unlock = scheduler.next_unlock()
+            if next_unlock:
+                seconds, option_key = next_unlock
+                stdscr.addstr(7, 2, f"Next unlock: {describe_option(option_key)} in {seconds:.0f}s", curses.color_pair(4))
 
 
             building_y_start = 8
             stdscr.addstr(building_y_start, 0, "BUILDINGS:", curses.color_pair(2))
             buildings = my_colony.get_buildings()
             current_y_offset = building_y_start + 1
+            screen_height, screen_width = stdscr.getmaxyx()
             if not buildings:
                 stdscr.addstr(current_y_offset, 2, "None", curses.color_pair(2))
                 current_y_offset += 1
             else:
-                for i, building in enumerate(buildings):
-                    stdscr.addstr(current_y_offset + i, 2, f"{building.name} (Level {building.level})", curses.color_pair(2))
-                current_y_offset += len(buildings)
+                lines = building_lines(buildings, (screen_height - building_y_start) // 3)
+                for i, line in enumerate(lines):
+                    stdscr.addstr(current_y_offset + i, 2, line, curses.color_pair(2))
+                current_y_offset += len(lines)
 
             event_history_y_start = current_y_offset + 1
             stdscr.addstr(event_history_y_start, 0, "EVENT HISTORY:", curses.color_pair(2))
             screen_height, screen_width = stdscr.getmaxyx()
             max_events_to_show = screen_height - (event_history_y_start + 1) - 3 # Reserve space for commands
-            for i, event_msg in enumerate(my_colony.event_history[:max_events_to_show]):
-                display_msg = event_msg[:screen_width - 4] 
+            for i, record in enumerate(my_colony.event_history[:max_events_to_show]):
+                display_msg = record.message[:screen_width - 4] 
                 msg_color = curses.color_pair(2) # Default
-                if "Lost" in event_msg or "failed" in event_msg or "Not enough" in event_msg:
+                if record.severity == SEVERITY_ERROR:
                     msg_color = curses.color_pair(3) # Red
-                elif "ALERT" in event_msg:
+                elif record.severity == SEVERITY_WARNING:
                     msg_color = curses.color_pair(4) # Yellow
                 stdscr.addstr(event_history_y_start + 1 + i, 2, display_msg, msg_color)
 
             commands_y_start = screen_height - 2 
             stdscr.addstr(commands_y_start, 0, "COMMANDS:", curses.color_pair(2))
-            stdscr.addstr(commands_y_start + 1, 2, "b: Build, u: Upgrade, r: Research, q: Quit", curses.color_pair(2)) # Added Research
+            stdscr.addstr(commands_y_start + 1, 2, "b: Build, u: Upgrade, r: Research, p: Plan, a: Alerts, q: Quit", curses.color_pair(2)) # Added Research
             
             stdscr.refresh()
 
         elif current_game_state == "major_event_popup" and active_major_event:
             if not active_popup_window: # If popup wasn't created yet or was cleared
-                 active_popup_window = draw_major_event_popup(stdscr, active_major_event)
+                seconds_left = max(0.0, active_major_event.deadline - my_colony.elapsed_time) / clock.speed
+                active_popup_window = draw_major_event_popup(stdscr, active_major_event.event, seconds_left)
             active_popup_window.refresh() # Keep popup visible
 
         elif current_game_state == "build_menu":
             if not active_popup_window: # If popup wasn't created yet or was cleared
-                active_popup_window = draw_build_menu(stdscr, my_colony)
+                active_popup_window = draw_build_menu(stdscr, my_colony, scheduler)
             active_popup_window.refresh() # Keep popup visible
         
         elif current_game_state == "upgrade_menu":
             if not active_popup_window:
-                active_popup_window = draw_upgrade_menu(stdscr, my_colony)
+                active_popup_window = draw_upgrade_menu(stdscr, my_colony, scheduler)
             
             if active_popup_window: # Ensure it was created (e.g. if no buildings, it still creates a window)
                 active_popup_window.refresh()
@@ -469,7 +627,7 @@ def main_curses(stdscr):
         elif current_game_state == "research_menu":
             if not active_popup_window or not research_menu_items_info: # Redraw if needed or items changed
                 if active_popup_window: active_popup_window.clear() # Clear previous instance if any
-                active_popup_window, research_menu_items_info = draw_research_menu(stdscr, my_colony)
+                active_popup_window, research_menu_items_info = draw_research_menu(stdscr, my_colony, scheduler)
 
             if active_popup_window: # Ensure it was created
                 active_popup_window.refresh()
@@ -495,17 +653,46 @@ def main_curses(stdscr):
                         
                         # Force redraw of the research menu to reflect updated status
                         active_popup_window.clear() 
-                        active_popup_window, research_menu_items_info = draw_research_menu(stdscr, my_colony)
+                        active_popup_window, research_menu_items_info = draw_research_menu(stdscr, my_colony, scheduler)
                         active_popup_window.refresh()
                     else:
                         # Invalid selection (e.g. number too high for 'can_research_now' items)
                         # Optionally add a beep or error message to event_history
-                        my_colony.add_event_to_history("Invalid research selection.")
+                        my_colony.add_event_to_history("Invalid research selection.", "research", SEVERITY_WARNING)
                         # Redraw menu to clear input
                         active_popup_window.clear()
-                        active_popup_window, research_menu_items_info = draw_research_menu(stdscr, my_colony)
+                        active_popup_window, research_menu_items_info = draw_research_menu(stdscr, my_colony, scheduler)
                         active_popup_window.refresh()
 
+        elif current_game_state in ("plan_menu", "plan_result"):
+            if not active_popup_window:
+                active_popup_window, plan_goal_options_info = draw_plan_menu(stdscr, my_colony)
+            active_popup_window.refresh()
+
+            if key == ord('q') or key == curses.KEY_BACKSPACE:
+                current_game_state = "running"
+                active_popup_window.clear()
+                active_popup_window = None
+                stdscr.clear()
+                stdscr.refresh()
+            elif current_game_state == "plan_menu" and ord('1') <= key <= ord('9'):
+                selected_idx = int(chr(key)) - 1
+                if selected_idx < len(plan_goal_options_info):
+                    goal, goal_label = plan_goal_options_info[selected_idx]
+                    plan = plan_route(my_colony, goal)
+                    active_popup_window.clear()
+                    active_popup_window, _ = draw_plan_menu(stdscr, my_colony, plan, goal_label)
+                    current_game_state = "plan_result"
+
+        frames_rendered += 1
+        if frames_rendered == 1:
+            startup_ms = (time.perf_counter() - LAUNCH_TIME) * 1000
+            if offline_seconds > 0:
+                my_colony.fast_forward(offline_seconds) # Credits the time away in one step
+            my_colony.add_event_to_history(f"Session started in {startup_ms:.0f} ms.", "system")
+        elif frames_rendered == 2:
+            stdscr.timeout(1000) # Caught up and redrawn; back to one frame per second
+
 
 if __name__ == "__main__":
     curses.wrapper(main_curses)
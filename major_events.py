@@ -0,0 +1,170 @@
+import heapq
+
+# Seconds of colony time a player has to answer a major event before its
+# default choice is applied, unless the event class sets its own DEADLINE.
+DEFAULT_DEADLINE = 300.0
+
+
+class PendingMajorEvent:
+    """A queued major event with its id, deadline and default choice."""
+    __slots__ = ("event_id", "event", "raised_at", "deadline", "priority")
+
+    def __init__(self, event_id, event, raised_at, deadline, priority):
+        self.event_id = event_id
+        self.event = event
+        self.raised_at = raised_at # Colony time it was queued
+        self.deadline = deadline   # Colony time the default choice is applied
+        self.priority = priority   # Higher is shown first
+
+    @property
+    def default_choice(self):
+        """The choice applied on timeout: the event's DEFAULT_CHOICE, else its last (most cautious) choice."""
+        choice = getattr(self.event, "DEFAULT_CHOICE", None)
+        return choice if choice is not None else self.event.choices[-1]["key"]
+
+    def sort_key(self):
+        return (-self.priority, self.deadline, self.event_id)
+
+    def to_dict(self, now=None):
+        data = {
+            "id": self.event_id,
+            "name": self.event.name,
+            "description": self.event.description,
+            "choices": self.event.choices,
+            "default_choice": self.default_choice,
+            "priority": self.priority,
+            "raised_at": self.raised_at,
+            "deadline": self.deadline,
+        }
+        if now is not None:
+            data["expires_in"] = max(0.0, self.deadline - now)
+        return data
+
+
+class MajorEventQueue:
+    """
+    A colony's major events waiting for a decision, highest priority first
+    and, within a priority, the one expiring soonest.
+
+    Entries are found by id for resolving, by priority for showing to the
+    player and by deadline for expiry; the two heaps drop entries lazily
+    once they have been removed by id.
+    """
+
+    def __init__(self):
+        self._entries = {}
+        self._by_priority = []
+        self._by_deadline = []
+        self._next_id = 1
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __iter__(self):
+        """Iterates over the events (not the entries) in priority order."""
+        return (entry.event for entry in self.entries())
+
+    def fingerprint(self):
+        """Changes whenever an event is queued or leaves the queue; ids are never reused."""
+        return self._next_id, len(self._entries)
+
+    def entries(self):
+        return sorted(self._entries.values(), key=PendingMajorEvent.sort_key)
+
+    def push(self, event, now, deadline=None, priority=None):
+        """Queues event raised at colony time `now` and returns its entry."""
+        if deadline is None:
+            deadline = now + getattr(event, "DEADLINE", DEFAULT_DEADLINE)
+        if priority is None:
+            priority = getattr(event, "PRIORITY", 0)
+        entry = PendingMajorEvent(self._next_id, event, now, deadline, priority)
+        self._next_id += 1
+        self._entries[entry.event_id] = entry
+        heapq.heappush(self._by_priority, (entry.sort_key(), entry.event_id))
+        heapq.heappush(self._by_deadline, (entry.deadline, entry.event_id))
+        if len(self._by_priority) > 2 * len(self._entries) + 64: # Mostly entries removed by id
+            self._rebuild()
+        return entry
+
+    def _rebuild(self):
+        self._by_priority = [item for item in self._by_priority if item[1] in self._entries]
+        self._by_deadline = [item for item in self._by_deadline if item[1] in self._entries]
+        heapq.heapify(self._by_priority)
+        heapq.heapify(self._by_deadline)
+
+    def get(self, event_id):
+        return self._entries.get(event_id)
+
+    def remove(self, event_id):
+        """Removes and returns the entry with event_id, or None if there is none."""
+        return self._entries.pop(event_id, None)
+
+    def _top(self, heap):
+        while heap and heap[0][1] not in self._entries:
+            heapq.heappop(heap)
+        return self._entries[heap[0][1]] if heap else None
+
+    def peek(self):
+        """The entry to show next, or None if the queue is empty."""
+        return self._top(self._by_priority)
+
+    def pop(self):
+        entry = self.peek()
+        if entry is not None:
+            del self._entries[entry.event_id]
+        return entry
+
+    def next_deadline(self):
+        entry = self._top(self._by_deadline)
+        return entry.deadline if entry is not None else None
+
+    def pop_expired(self, now):
+        """Removes and returns the entries whose deadline is at or before `now`, earliest first."""
+        expired = []
+        while True:
+            entry = self._top(self._by_deadline)
+            if entry is None or entry.deadline > now:
+                return expired
+            del self._entries[entry.event_id]
+            expired.append(entry)
+
+    def to_dict(self):
+        """
+        JSON-ready state for saves. Only events that can be recreated from
+        their parameters (see events.EffectEvent.params) are kept.
+        """
+        return {
+            "next_id": self._next_id,
+            "entries": [
+                {
+                    "id": entry.event_id,
+                    "event": type(entry.event).__name__,
+                    "params": entry.event.params(),
+                    "raised_at": entry.raised_at,
+                    "deadline": entry.deadline,
+                    "priority": entry.priority,
+                }
+                for entry in self.entries() if hasattr(entry.event, "params")
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, data, event_classes):
+        """Rebuilds a queue saved by to_dict; event_classes maps class names to classes."""
+        queue = cls()
+        for item in data.get("entries", []):
+            event_class = event_classes.get(item["event"])
+            if event_class is None: # Event type no longer exists
+                continue
+            queue._next_id = item["id"]
+            queue.push(event_class.from_params(item["params"]), item["raised_at"], item["deadline"], item["priority"])
+        queue._next_id = max(queue._next_id, data.get("next_id", 1))
+        return queue
+
+    def copy(self):
+        clone = MajorEventQueue()
+        clone._entries = dict(self._entries) # Entries are not mutated, so sharing is safe
+        clone._by_priority = list(self._by_priority)
+        clone._by_deadline = list(self._by_deadline)
+        clone._next_id = self._next_id
+        return clone
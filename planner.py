@@ -0,0 +1,264 @@
+import heapq
+import itertools
+import math
+import time
+from functools import lru_cache
+
+from building_store import BUILDING_TYPE_TABLE, TYPE_IDS_BY_NAME
+from game import get_production_rates
+from research import RESEARCH_PROJECTS
+
+RESOURCE_NAMES = ("Minerals", "Energy", "Food", "ResearchPoints")
+RESOURCE_INDEX = {name: index for index, name in enumerate(RESOURCE_NAMES)}
+
+DEFAULT_TIME_BUDGET = 0.25 # Seconds of wall-clock search time
+MAX_PLAN_STEPS = 40
+
+# Stand-in for "cannot finish from here without further actions" so such
+# states still get ordered (by elapsed time) instead of never being expanded.
+UNREACHABLE_PENALTY = 1e9
+
+
+def parse_goal(goal):
+    """
+    Normalizes a goal description into (kind, target, amount).
+
+    Accepted forms: {"resource": "Energy", "amount": 1000},
+    {"building": "Geothermal Plant"} and {"research": "fusion_power"}.
+    Raises ValueError for anything else, including a name that is not a
+    string or an amount that is not a finite number.
+    """
+    for kind, known, label in (
+        ("resource", RESOURCE_INDEX, "resource"),
+        ("building", TYPE_IDS_BY_NAME, "building"),
+        ("research", RESEARCH_PROJECTS, "research project"),
+    ):
+        if kind not in goal:
+            continue
+        target = goal[kind]
+        if not isinstance(target, str) or target not in known:
+            raise ValueError(f"Unknown {label} {target!r}.")
+        if kind != "resource":
+            return (kind, target, 1)
+        amount = goal.get("amount", 0.0)
+        # bool is an int subclass, and NaN or infinity could not be sent back as JSON
+        if isinstance(amount, bool) or not isinstance(amount, (int, float)) or not math.isfinite(amount):
+            raise ValueError("Goal amount must be a finite number.")
+        return ("resource", target, float(amount))
+    raise ValueError("Goal must name a resource, building or research project.")
+
+
+def _vector(resource_dict):
+    return tuple(float(resource_dict.get(name, 0.0)) for name in RESOURCE_NAMES)
+
+
+@lru_cache(maxsize=65536)
+def time_to_afford(cost, resources, rates):
+    """Seconds until `resources` growing at `rates` cover `cost` (all vectors).
+    Returns None if some missing resource is not being produced."""
+    wait = 0.0
+    for needed, have, rate in zip(cost, resources, rates):
+        if needed > have:
+            if rate <= 0:
+                return None
+            wait = max(wait, (needed - have) / rate)
+    return wait
+
+
+class _Node:
+    __slots__ = ("time", "resources", "rates", "levels", "research", "unlocked", "parent", "step", "depth")
+
+    def __init__(self, time_, resources, rates, levels, research, unlocked, parent=None, step=None):
+        self.time = time_
+        self.resources = resources
+        self.rates = rates
+        self.levels = levels       # Per building type: sorted tuple of (level, count)
+        self.research = research   # frozenset of completed project ids
+        self.unlocked = unlocked   # frozenset of buildable names
+        self.parent = parent
+        self.step = step
+        self.depth = 0 if parent is None else parent.depth + 1
+
+    def key(self):
+        return (self.levels, self.research)
+
+
+def _initial_node(colony):
+    level_counts = [dict() for _ in BUILDING_TYPE_TABLE]
+    for building in colony.buildings:
+        type_id = TYPE_IDS_BY_NAME.get(building.name)
+        if type_id is not None:
+            counts = level_counts[type_id]
+            counts[building.level] = counts.get(building.level, 0) + 1
+    levels = tuple(tuple(sorted(counts.items())) for counts in level_counts)
+    return _Node(
+        0.0,
+        _vector(colony.resources),
+        _vector(get_production_rates(colony)),
+        levels,
+        frozenset(colony.completed_research),
+        frozenset(colony.unlocked_buildings),
+    )
+
+
+def _add_vectors(a, b, scale=1.0):
+    return tuple(x + scale * y for x, y in zip(a, b))
+
+
+def _with_level_change(levels, type_id, old_level, new_level):
+    counts = dict(levels[type_id])
+    if old_level is not None:
+        counts[old_level] -= 1
+        if not counts[old_level]:
+            del counts[old_level]
+    counts[new_level] = counts.get(new_level, 0) + 1
+    return levels[:type_id] + (tuple(sorted(counts.items())),) + levels[type_id + 1:]
+
+
+def _successors(node):
+    """Yields (cost_vector, step, apply) for every action available from node."""
+    for building_type in BUILDING_TYPE_TABLE:
+        if building_type.name in node.unlocked:
+            yield (
+                _vector(building_type.cost),
+                {"action": "build", "target": building_type.name},
+                (building_type.type_id, None, 1),
+            )
+        if node.levels[building_type.type_id] and building_type.upgrade_cost_table is not None:
+            lowest_level = node.levels[building_type.type_id][0][0]
+            yield (
+                _vector(building_type.upgrade_cost(lowest_level)),
+                {"action": "upgrade", "target": building_type.name, "level": lowest_level + 1},
+                (building_type.type_id, lowest_level, lowest_level + 1),
+            )
+    for project_id, project in RESEARCH_PROJECTS.items():
+        if project_id not in node.research:
+            yield (
+                _vector({"ResearchPoints": project["cost"]}),
+                {"action": "research", "target": project_id},
+                project_id,
+            )
+
+
+def _expand(node, cost, step, change):
+    wait = time_to_afford(cost, node.resources, node.rates)
+    if wait is None:
+        return None
+    resources = tuple(
+        max(0.0, value) for value in _add_vectors(_add_vectors(node.resources, node.rates, wait), cost, -1.0)
+    )
+    levels, research, unlocked, rates = node.levels, node.research, node.unlocked, node.rates
+    if isinstance(change, str): # Research project id
+        research = research | {change}
+        unlocked = unlocked | set(RESEARCH_PROJECTS[change].get("unlocks_buildings", []))
+    else:
+        type_id, old_level, new_level = change
+        levels = _with_level_change(levels, type_id, old_level, new_level)
+        gained = BUILDING_TYPE_TABLE[type_id].production_bonus(new_level - (old_level or 0))
+        rates = _add_vectors(rates, _vector(gained))
+    step = dict(step, eta=node.time + wait)
+    return _Node(node.time + wait, resources, rates, levels, research, unlocked, node, step)
+
+
+def _goal_met(node, goal):
+    kind, target, amount = goal
+    if kind == "resource":
+        return node.resources[RESOURCE_INDEX[target]] >= amount
+    if kind == "research":
+        return target in node.research
+    return bool(node.levels[TYPE_IDS_BY_NAME[target]])
+
+
+def _finish_time(node, goal):
+    """Seconds from node until the goal can be completed without any other
+    action (reaching the amount, or affording the final build or research);
+    None if that never happens at the node's production rates."""
+    kind, target, amount = goal
+    if _goal_met(node, goal):
+        return 0.0
+    if kind == "resource":
+        cost = [0.0] * len(RESOURCE_NAMES)
+        cost[RESOURCE_INDEX[target]] = amount
+        return time_to_afford(tuple(cost), node.resources, node.rates)
+    if kind == "research":
+        return time_to_afford(_vector({"ResearchPoints": RESEARCH_PROJECTS[target]["cost"]}), node.resources, node.rates)
+    if target not in node.unlocked:
+        return None
+    return time_to_afford(_vector(BUILDING_TYPE_TABLE[TYPE_IDS_BY_NAME[target]].cost), node.resources, node.rates)
+
+
+def _final_step(goal, eta):
+    kind, target, amount = goal
+    if kind == "resource":
+        return {"action": "wait", "target": target, "amount": amount, "eta": eta}
+    return {"action": "build" if kind == "building" else "research", "target": target, "eta": eta}
+
+
+def plan_route(colony, goal, time_budget=DEFAULT_TIME_BUDGET, max_steps=MAX_PLAN_STEPS):
+    """
+    Searches for a fast sequence of builds, upgrades and research that
+    reaches `goal` (see parse_goal) from the colony's current state.
+
+    Best-first search over (building levels, research) states ordered by
+    elapsed time plus the time needed to finish from that state; it keeps the
+    best complete plan found and stops when the search space or the
+    time_budget (seconds) is exhausted. Random events are not modelled.
+
+    Returns a dict with "steps" (each with an "eta" in seconds from now),
+    the total "eta" (None if no plan was found), and search statistics.
+    """
+    if not math.isfinite(time_budget) or time_budget < 0:
+        raise ValueError("time_budget must be a finite number of seconds, at least 0.")
+    goal = parse_goal(goal) if isinstance(goal, dict) else goal
+    deadline = time.perf_counter() + time_budget
+    start = _initial_node(colony)
+
+    best_node, best_finish = None, None
+    counter = itertools.count() # Tie breaker so nodes are never compared
+    frontier = [(0.0, next(counter), start)]
+    best_time_by_key = {start.key(): 0.0}
+    expanded = 0
+    exhausted = True
+
+    while frontier:
+        if time.perf_counter() > deadline:
+            exhausted = False
+            break
+        _, _, node = heapq.heappop(frontier)
+        if best_finish is not None and node.time >= best_finish:
+            continue
+        expanded += 1
+
+        finish = _finish_time(node, goal)
+        if finish is not None and (best_finish is None or node.time + finish < best_finish):
+            best_node, best_finish = node, node.time + finish
+        if node.depth >= max_steps or _goal_met(node, goal):
+            continue
+
+        for cost, step, change in _successors(node):
+            child = _expand(node, cost, step, change)
+            if child is None or (best_finish is not None and child.time >= best_finish):
+                continue
+            key = child.key()
+            if best_time_by_key.get(key, float("inf")) <= child.time:
+                continue
+            best_time_by_key[key] = child.time
+            child_finish = _finish_time(child, goal)
+            priority = child.time + (child_finish if child_finish is not None else UNREACHABLE_PENALTY)
+            heapq.heappush(frontier, (priority, next(counter), child))
+
+    steps = []
+    node = best_node
+    while node is not None and node.step is not None:
+        steps.append(node.step)
+        node = node.parent
+    steps.reverse()
+    if best_node is not None and not _goal_met(best_node, goal):
+        steps.append(_final_step(goal, best_finish))
+    return {
+        "goal": {"kind": goal[0], "target": goal[1], "amount": goal[2]},
+        "steps": steps,
+        "eta": best_finish,
+        "expanded": expanded,
+        "complete_search": exhausted,
+    }
@@ -0,0 +1,33 @@
+import hashlib
+import random
+
+# Helpers for the per-colony random streams. Every Colony owns a
+# random.Random seeded from its rng_seed, and all event and damage code
+# draws from it, so a colony can be replayed exactly from its seed no matter
+# how many other colonies run in the same process.
+
+
+def new_seed():
+    """Returns a fresh 64-bit seed drawn from the global random module."""
+    return random.getrandbits(64)
+
+
+def derive_seed(parent_seed, *path):
+    """
+    Deterministically derives an independent child seed, e.g. one per worker
+    process or per simulation run: derive_seed(batch_seed, run_index).
+    """
+    key = ":".join(str(part) for part in (parent_seed,) + path).encode()
+    return int.from_bytes(hashlib.sha256(key).digest()[:8], "big")
+
+
+def rng_state_to_list(rng):
+    """Converts a random.Random state into JSON-friendly lists."""
+    version, internal_state, gauss_next = rng.getstate()
+    return [version, list(internal_state), gauss_next]
+
+
+def rng_state_from_list(rng, state):
+    """Restores a state produced by rng_state_to_list."""
+    version, internal_state, gauss_next = state
+    rng.setstate((version, tuple(internal_state), gauss_next))
@@ -0,0 +1,225 @@
+from array import array
+import json
+import math
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import zlib
+
+from building_store import BUILDING_TYPE_TABLE, CompactBuildingStore
+from research import RESEARCH_PROJECTS
+
+# Binary save layout (all little-endian):
+#
+#   header    magic, format version, reserved, payload length, crc32 of payload
+#   fixed     4 resources, elapsed_time, saved_at, turn_number, building count
+#   rng       Mersenne Twister state: version, 625 words, gauss_next (NaN if None)
+#   buildings one byte type id per building, padding to 4 bytes, one uint32 level each
+#   bitsets   completed research, unlocked buildings (length-prefixed)
+#   trailer   length-prefixed JSON for small variable data (seed, event history, ...)
+#
+# Bump FORMAT_VERSION whenever the layout changes; decode_save rejects
+# versions it does not know.
+MAGIC = b"SCLY"
+FORMAT_VERSION = 1
+
+HEADER = struct.Struct("<4sHHQI")
+FIXED = struct.Struct("<4dddIQ")
+RNG_STATE = struct.Struct("<I625Id")
+BITSET_LENGTH = struct.Struct("<H")
+TRAILER_LENGTH = struct.Struct("<I")
+
+RESOURCE_NAMES = ("Minerals", "Energy", "Food", "ResearchPoints")
+
+# Research ids and unlockable building names are stored as bit positions, so
+# like BUILDING_TYPES these orders must only ever be appended to.
+RESEARCH_IDS = tuple(RESEARCH_PROJECTS)
+UNLOCKABLE_NAMES = tuple(dict.fromkeys(
+    [building_type.name for building_type in BUILDING_TYPE_TABLE]
+    + [name for project in RESEARCH_PROJECTS.values() for name in project.get("unlocks_buildings", [])]
+))
+
+_LITTLE_ENDIAN = sys.byteorder == "little"
+
+
+class SaveFormatError(ValueError):
+    """Raised for binary saves that are truncated, corrupted or too new."""
+
+
+def is_binary_save(path):
+    with open(path, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def _bitset(names, order):
+    bits = bytearray((len(order) + 7) // 8)
+    for position, name in enumerate(order):
+        if name in names:
+            bits[position // 8] |= 1 << (position % 8)
+    return BITSET_LENGTH.pack(len(bits)) + bytes(bits)
+
+
+def _names_from_bitset(bits, order):
+    return {
+        name for position, name in enumerate(order)
+        if position // 8 < len(bits) and bits[position // 8] & (1 << (position % 8))
+    }
+
+
+def _packed(values):
+    """Little-endian bytes of an array, whatever the host byte order."""
+    if not _LITTLE_ENDIAN:
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def encode_colony(colony, saved_at=0.0, extra=None):
+    """
+    Serializes a colony into the binary save format and returns the bytes.
+    `extra` is merged into the JSON trailer.
+    """
+    if isinstance(colony.buildings, CompactBuildingStore):
+        type_ids, levels = colony.buildings.type_ids, colony.buildings.levels
+    else:
+        type_ids, levels = array("B"), array("I")
+        ids_by_name = {building_type.name: building_type.type_id for building_type in BUILDING_TYPE_TABLE}
+        for building in colony.buildings:
+            type_id = ids_by_name.get(building.name)
+            if type_id is not None: # Unknown types are skipped, as load_game does
+                type_ids.append(type_id)
+                levels.append(building.level)
+
+    rng_version, rng_words, gauss_next = colony.rng.getstate()
+    parts = [
+        FIXED.pack(
+            *(float(colony.resources.get(name, 0.0)) for name in RESOURCE_NAMES),
+            float(colony.elapsed_time), float(saved_at), colony.turn_number, len(type_ids),
+        ),
+        RNG_STATE.pack(rng_version, *rng_words, math.nan if gauss_next is None else gauss_next),
+        _packed(type_ids),
+        b"\0" * (-len(type_ids) % 4), # Keeps the level array 4-byte aligned
+        _packed(levels),
+        _bitset(colony.completed_research, RESEARCH_IDS),
+        _bitset(colony.unlocked_buildings, UNLOCKABLE_NAMES),
+    ]
+    trailer = {
+        "rng_seed": colony.rng_seed,
+        "event_history": colony.event_history.to_list(),
+        "extra_unlocked_buildings": sorted(set(colony.unlocked_buildings) - set(UNLOCKABLE_NAMES)),
+        "event_state": colony.event_state(),
+        "state_version": colony.state_version(),
+    }
+    trailer.update(extra or {})
+    trailer_bytes = json.dumps(trailer).encode("utf-8")
+    parts.append(TRAILER_LENGTH.pack(len(trailer_bytes)) + trailer_bytes)
+
+    payload = b"".join(parts)
+    return HEADER.pack(MAGIC, FORMAT_VERSION, 0, len(payload), zlib.crc32(payload)) + payload
+
+
+def _array_from(buffer, typecode):
+    values = array(typecode)
+    values.frombytes(buffer) # One bulk copy, no per-building objects
+    if not _LITTLE_ENDIAN:
+        values.byteswap()
+    return values
+
+
+def decode_save(buffer):
+    """
+    Parses a binary save held in any buffer (bytes, memoryview, mmap) and
+    returns a dict with the raw fields; building arrays come back as
+    array('B') type ids and array('I') levels. Raises SaveFormatError.
+    """
+    view = memoryview(buffer)
+    payload = view[:0]
+    try:
+        if len(view) < HEADER.size:
+            raise SaveFormatError("Save file is truncated.")
+        magic, version, _, payload_length, checksum = HEADER.unpack_from(view)
+        if magic != MAGIC:
+            raise SaveFormatError("Not a binary save file.")
+        if version > FORMAT_VERSION:
+            raise SaveFormatError(f"Save format version {version} is newer than supported ({FORMAT_VERSION}).")
+        payload = view[HEADER.size:HEADER.size + payload_length]
+        if len(payload) != payload_length:
+            raise SaveFormatError("Save file is truncated.")
+        if zlib.crc32(payload) != checksum:
+            raise SaveFormatError("Save file checksum mismatch.")
+
+        fixed = FIXED.unpack_from(payload)
+        offset = FIXED.size
+        building_count = fixed[7]
+        rng_fields = RNG_STATE.unpack_from(payload, offset)
+        offset += RNG_STATE.size
+
+        type_ids = _array_from(payload[offset:offset + building_count], "B")
+        offset += building_count + (-building_count % 4)
+        levels = _array_from(payload[offset:offset + 4 * building_count], "I")
+        offset += 4 * building_count
+        if len(levels) != building_count:
+            raise SaveFormatError("Save file is truncated.")
+        if type_ids and max(type_ids) >= len(BUILDING_TYPE_TABLE):
+            raise SaveFormatError("Save file references an unknown building type.")
+
+        bitsets = []
+        for _ in range(2):
+            (length,) = BITSET_LENGTH.unpack_from(payload, offset)
+            offset += BITSET_LENGTH.size
+            bitsets.append(bytes(payload[offset:offset + length]))
+            offset += length
+        (trailer_length,) = TRAILER_LENGTH.unpack_from(payload, offset)
+        offset += TRAILER_LENGTH.size
+        trailer = json.loads(bytes(payload[offset:offset + trailer_length]).decode("utf-8"))
+    except struct.error as e:
+        raise SaveFormatError(f"Save file is truncated: {e}")
+    finally:
+        # Views must be released before an mmap'd buffer can be closed
+        payload.release()
+        view.release()
+
+    gauss_next = rng_fields[-1]
+    return {
+        "resources": dict(zip(RESOURCE_NAMES, fixed[:4])),
+        "elapsed_time": fixed[4],
+        "saved_at": fixed[5],
+        "turn_number": fixed[6],
+        "rng_state": (rng_fields[0], tuple(rng_fields[1:-1]), None if math.isnan(gauss_next) else gauss_next),
+        "type_ids": type_ids,
+        "levels": levels,
+        "completed_research": _names_from_bitset(bitsets[0], RESEARCH_IDS),
+        "unlocked_buildings": _names_from_bitset(bitsets[1], UNLOCKABLE_NAMES)
+                              | set(trailer.get("extra_unlocked_buildings", [])),
+        "trailer": trailer,
+    }
+
+
+def read_save(path):
+    """Memory-maps a binary save file and decodes it (see decode_save)."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            raise SaveFormatError("Save file is empty.")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return decode_save(mapped)
+
+
+def write_atomic(path, data):
+    """
+    Writes data to path via a temporary file in the same directory and an
+    atomic rename, so a crash mid-write never leaves a half-written save.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(prefix=".tmp-", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
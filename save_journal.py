@@ -0,0 +1,233 @@
+import json
+import os
+import queue
+import threading
+import time
+
+from event_log import EventRecord
+from rng import rng_state_to_list, rng_state_from_list
+from save_format import encode_colony, write_atomic
+
+# Delta saves: a binary base snapshot plus a JSON-lines journal next to it
+# ("<save>.journal"). Each journal line holds what changed since the
+# previous save. Every base snapshot gets a random generation number and
+# every delta carries it, so deltas left over from an older base (e.g. after
+# a crash between rewriting the base and truncating the journal) are ignored.
+JOURNAL_SUFFIX = ".journal"
+DEFAULT_COMPACT_THRESHOLD = 256 * 1024 # Journal bytes before the next save compacts
+
+
+def journal_path(path):
+    return path + JOURNAL_SUFFIX
+
+
+class SaveJournal:
+    """
+    Saves one colony to `path` incrementally.
+
+    The first save (and any save after the journal grows past
+    compact_threshold bytes) writes a full binary snapshot and empties the
+    journal; every other save appends a single delta line. load_game replays
+    base plus journal automatically. save() is prepare() plus write(); the
+    two halves can be split across threads, see BackgroundSaver.
+    """
+
+    def __init__(self, path, compact_threshold=DEFAULT_COMPACT_THRESHOLD):
+        self.path = path
+        self.journal_path = journal_path(path)
+        self.compact_threshold = compact_threshold
+        self._checkpoint = None
+        self._written_generation = None # Base the journal on disk extends
+        self.full_saves = 0
+        self.delta_saves = 0
+
+    def _journal_size(self):
+        try:
+            return os.path.getsize(self.journal_path)
+        except OSError:
+            return 0
+
+    def save(self, colony):
+        """Saves colony and returns "delta" or "full" depending on what was written."""
+        pending = self.prepare(colony)
+        self.write(pending)
+        return pending[0]
+
+    def compact(self, colony):
+        """Writes a full snapshot of colony and starts an empty journal."""
+        self.write(self._prepare_full(colony))
+
+    def prepare(self, colony):
+        """
+        Takes what the next save needs from colony and moves the checkpoint
+        on. Returns the pending save for write(), which does the slow part
+        (encoding, writing, fsync) and may run on another thread while the
+        colony keeps changing, as long as writes happen in prepare order.
+        """
+        checkpoint = self._checkpoint
+        if (
+            checkpoint is None
+            or checkpoint["colony"] is not colony
+            or colony.building_changes is None # Too many changes were tracked
+            or self._journal_size() >= self.compact_threshold
+        ):
+            return self._prepare_full(colony)
+        line = json.dumps(self._delta(colony, checkpoint)) + "\n"
+        self._take_checkpoint(colony, checkpoint["generation"])
+        return ("delta", checkpoint["generation"], line)
+
+    def _prepare_full(self, colony):
+        generation = int.from_bytes(os.urandom(8), "big")
+        pending = ("full", generation, (colony.snapshot(), time.time()))
+        self._take_checkpoint(colony, generation)
+        return pending
+
+    def write(self, pending):
+        """
+        Writes a save from prepare(). If a write fails, the next prepared
+        save is a full one, and deltas prepared before then are skipped
+        since the journal would be missing the changes before them.
+        """
+        kind, generation, data = pending
+        if kind == "delta" and generation != self._written_generation:
+            return
+        try:
+            if kind == "full":
+                copy, saved_at = data
+                write_atomic(self.path, encode_colony(copy, saved_at, {"journal_generation": generation}))
+                # Deltas still in the journal belong to the previous generation now
+                with open(self.journal_path, "w", encoding="utf-8"):
+                    pass
+                self._written_generation = generation
+                self.full_saves += 1
+            else:
+                with open(self.journal_path, "a", encoding="utf-8") as f:
+                    f.write(data)
+                    f.flush()
+                    os.fsync(f.fileno())
+                self.delta_saves += 1
+        except OSError:
+            self._checkpoint = None
+            self._written_generation = None
+            raise
+
+    def _take_checkpoint(self, colony, generation):
+        colony.building_changes = []
+        self._checkpoint = {
+            "colony": colony,
+            "generation": generation,
+            "completed_research": set(colony.completed_research),
+            "unlocked_buildings": set(colony.unlocked_buildings),
+            "events_appended": colony.event_history.appended_count,
+            "rng_state": colony.rng.getstate(),
+        }
+
+    def _delta(self, colony, checkpoint):
+        delta = {
+            "generation": checkpoint["generation"],
+            "saved_at": time.time(),
+            "resources": colony.resources,
+            "elapsed_time": colony.elapsed_time,
+            "turn_number": colony.turn_number,
+            "buildings": colony.building_changes,
+            "research": sorted(colony.completed_research - checkpoint["completed_research"]),
+            "unlocked": sorted(colony.unlocked_buildings - checkpoint["unlocked_buildings"]),
+            "events": [record.to_dict() for record in colony.event_history.records_since(checkpoint["events_appended"])],
+            "event_state": colony.event_state(), # Small; queued alerts change in place, so it is sent whole
+            "state_version": colony.state_version(),
+        }
+        rng_state = colony.rng.getstate()
+        if rng_state != checkpoint["rng_state"]: # 625 words; skipped while no event drew from it
+            delta["rng_state"] = rng_state_to_list(colony.rng)
+        return delta
+
+
+class BackgroundSaver:
+    """
+    Saves through a SaveJournal without blocking the thread that plays.
+
+    save() prepares the save on the calling thread, which is quick (a small
+    delta, or Colony.snapshot() for a full save), and queues the write; one
+    background thread writes them in order. A failed write is kept for
+    take_error() and makes the next save a full one.
+    """
+
+    def __init__(self, journal):
+        self.journal = journal
+        self.last_write_seconds = None
+        self._error = None
+        self._queue = queue.Queue()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="colony-autosaver", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Waits for the queued writes, then stops the background thread."""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def save(self, colony):
+        """Queues a save of colony and returns "delta" or "full"."""
+        self.start()
+        pending = self.journal.prepare(colony)
+        self._queue.put(pending)
+        return pending[0]
+
+    def take_error(self):
+        """The message of a write that failed since the last call, or None."""
+        error, self._error = self._error, None
+        return error
+
+    def _run(self):
+        while True:
+            pending = self._queue.get()
+            if pending is None:
+                return
+            start = time.perf_counter()
+            try:
+                self.journal.write(pending)
+            except OSError as e:
+                self._error = str(e)
+            self.last_write_seconds = time.perf_counter() - start
+
+
+def replay_journal(colony, path, generation):
+    """
+    Applies the deltas of generation `generation` from the journal at path
+    to a colony freshly loaded from the matching base snapshot. Returns the
+    saved_at time of the last applied delta, or None if there was none.
+    """
+    saved_at = None
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                delta = json.loads(line)
+            except ValueError: # Torn final write; everything before it is intact
+                break
+            if delta.get("generation") != generation:
+                continue
+            for change in delta["buildings"]:
+                colony.apply_building_change(change)
+            colony.resources.update(delta["resources"])
+            colony.elapsed_time = delta["elapsed_time"]
+            colony.turn_number = delta["turn_number"]
+            colony.completed_research.update(delta["research"])
+            colony.unlocked_buildings.update(delta["unlocked"])
+            for entry in delta["events"]:
+                colony.event_history.append(EventRecord.from_dict(entry))
+            if "rng_state" in delta:
+                rng_state_from_list(colony.rng, delta["rng_state"])
+            if "event_state" in delta:
+                colony.restore_event_state(delta["event_state"])
+            if "state_version" in delta:
+                colony.restore_version(delta["state_version"])
+            saved_at = delta["saved_at"]
+    colony.building_changes = []
+    return saved_at
@@ -0,0 +1,7 @@
+"""Headless batch simulator for balance testing.
+
+Runs many seeded colonies without curses or FastAPI, driven by pluggable
+strategy policies. See ``python -m sim --help``.
+"""
+from sim.runner import simulate_colony, run_batch
+from sim.strategies import Strategy, BuildOrderStrategy, STRATEGIES
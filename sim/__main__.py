@@ -0,0 +1,38 @@
+"""Command line entry point: python -m sim"""
+import argparse
+
+from sim.runner import run_batch, write_results
+from sim.strategies import STRATEGIES
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m sim", description="Run headless colony simulations.")
+    parser.add_argument("--runs", type=int, default=100, help="seeded runs per strategy")
+    parser.add_argument("--seed", type=int, default=0, help="first seed; runs use seed, seed+1, ...")
+    parser.add_argument("--strategy", action="append", choices=sorted(STRATEGIES),
+                        help="strategy to evaluate (repeatable, default: all)")
+    parser.add_argument("--duration", type=float, default=3600.0, help="simulated seconds per run")
+    parser.add_argument("--step", type=float, default=1.0, help="simulation step in seconds")
+    parser.add_argument("--sample-interval", type=float, default=60.0, help="seconds between curve samples")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--out", default="sim_output", help="directory for runs.csv and curves.csv")
+    args = parser.parse_args(argv)
+
+    strategy_names = args.strategy or sorted(STRATEGIES)
+    seeds = range(args.seed, args.seed + args.runs)
+    results, stats = run_batch(seeds, strategy_names, args.duration, args.step, args.sample_interval, args.workers)
+    write_results(results, args.out)
+
+    for name in strategy_names:
+        times = [r["first_geothermal_time"] for r in results if r["strategy"] == name and r["first_geothermal_time"] is not None]
+        runs = sum(1 for r in results if r["strategy"] == name)
+        mean = f"{sum(times) / len(times):.0f}s" if times else "never"
+        print(f"{name:>14}: first Geothermal Plant in {len(times)}/{runs} runs, mean {mean}")
+    print(
+        f"{stats['runs']} runs in {stats['wall_time']:.2f}s wall, "
+        f"{stats['throughput']:,.0f} simulated-seconds per wall-second. Results in {args.out}/"
+    )
+
+
+if __name__ == "__main__":
+    main()
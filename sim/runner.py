@@ -0,0 +1,122 @@
+import csv
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from colony import Colony
+from game import (
+    generate_resources,
+    run_due_events,
+    schedule_next_event,
+    resolve_major_event,
+    EVENT_REGISTRY,
+)
+from sim.strategies import STRATEGIES
+
+RESOURCE_NAMES = ("Minerals", "Energy", "Food", "ResearchPoints")
+
+
+def simulate_colony(seed, strategy_name="balanced", duration=3600.0, step=1.0, sample_interval=60.0):
+    """
+    Runs one colony for `duration` simulated seconds with a fixed step.
+
+    Returns a dict of per-run metrics plus a "curve" list of
+    (time, Minerals, Energy, Food, ResearchPoints) samples.
+    """
+    colony = Colony(seed=seed)
+    schedule_next_event(colony)
+    strategy = STRATEGIES[strategy_name]()
+
+    sim_time = 0.0
+    next_sample = 0.0
+    first_geothermal_time = None
+    background_events = 0
+    major_events = 0
+    curve = []
+
+    while sim_time < duration:
+        if sim_time >= next_sample:
+            curve.append((sim_time,) + tuple(colony.resources.get(name, 0.0) for name in RESOURCE_NAMES))
+            next_sample += sample_interval
+
+        generate_resources(colony, step)
+        sim_time += step
+
+        if colony.elapsed_time >= colony.next_event_time:
+            logged = colony.event_history.appended_count
+            run_due_events(colony, EVENT_REGISTRY)
+            background_events += colony.event_history.appended_count - logged # One record per background event
+            while colony.pending_major_events:
+                major_event = colony.pending_major_events.pop().event
+                resolve_major_event(colony, major_event, strategy.choose_event_option(colony, major_event))
+                major_events += 1
+
+        strategy.act(colony)
+        if first_geothermal_time is None and colony.buildings and colony.buildings[-1].name == "Geothermal Plant":
+            first_geothermal_time = sim_time
+
+    curve.append((sim_time,) + tuple(colony.resources.get(name, 0.0) for name in RESOURCE_NAMES))
+    result = {
+        "seed": seed,
+        "strategy": strategy_name,
+        "duration": duration,
+        "first_geothermal_time": first_geothermal_time,
+        "building_count": len(colony.buildings),
+        "building_levels": sum(b.level for b in colony.buildings),
+        "research_count": len(colony.completed_research),
+        "background_events": background_events,
+        "major_events": major_events,
+        "curve": curve,
+    }
+    for name in RESOURCE_NAMES:
+        result[f"final_{name}"] = colony.resources.get(name, 0.0)
+    return result
+
+
+def _simulate_job(job):
+    return simulate_colony(*job)
+
+
+def run_batch(seeds, strategy_names, duration=3600.0, step=1.0, sample_interval=60.0, workers=None):
+    """
+    Simulates every (seed, strategy) combination across a process pool.
+
+    Returns (results, stats), where stats reports the wall time and the
+    throughput in simulated seconds per wall-clock second.
+    """
+    jobs = [(seed, name, duration, step, sample_interval) for name in strategy_names for seed in seeds]
+    start = time.perf_counter()
+    if workers == 1:
+        results = [_simulate_job(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_simulate_job, jobs, chunksize=max(1, len(jobs) // (4 * (workers or os.cpu_count() or 1)))))
+    wall_time = time.perf_counter() - start
+    simulated = duration * len(jobs)
+    stats = {
+        "runs": len(jobs),
+        "wall_time": wall_time,
+        "simulated_seconds": simulated,
+        "throughput": simulated / wall_time if wall_time > 0 else float("inf"),
+    }
+    return results, stats
+
+
+def write_results(results, out_dir):
+    """
+    Writes runs.csv (one row per run) and curves.csv (one row per sample,
+    long format keyed by run id) into out_dir.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    run_columns = [key for key in results[0] if key != "curve"] if results else []
+    with open(os.path.join(out_dir, "runs.csv"), "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["run_id"] + run_columns)
+        for run_id, result in enumerate(results):
+            writer.writerow([run_id] + [result[column] for column in run_columns])
+    with open(os.path.join(out_dir, "curves.csv"), "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(("run_id", "time") + RESOURCE_NAMES)
+        for run_id, result in enumerate(results):
+            for sample in result["curve"]:
+                writer.writerow((run_id,) + sample)
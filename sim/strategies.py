@@ -0,0 +1,56 @@
+from game import BUILDING_CLASSES, build_many
+from research import RESEARCH_PROJECTS
+
+# Every strategy researches this as soon as it can and then prefers the
+# building it unlocks.
+GEOTHERMAL_PROJECT = "geothermal_power"
+
+
+class Strategy:
+    """Policy deciding what a simulated colony does.
+
+    act() is called once per simulation step and may perform at most one
+    action on the colony. choose_event_option() picks the answer to a major
+    event and defaults to the last (usually most cautious) choice.
+    """
+    name = "idle"
+
+    def act(self, colony):
+        pass
+
+    def choose_event_option(self, colony, event):
+        return event.choices[-1]["key"]
+
+
+class BuildOrderStrategy(Strategy):
+    """Cycles through a fixed build order, researching geothermal power when affordable."""
+
+    def __init__(self, name, build_order):
+        self.name = name
+        self.build_order = build_order
+        self.next_index = 0
+
+    def act(self, colony):
+        if GEOTHERMAL_PROJECT not in colony.completed_research:
+            if colony.resources.get("ResearchPoints", 0.0) >= RESEARCH_PROJECTS[GEOTHERMAL_PROJECT]["cost"]:
+                colony.research_project(GEOTHERMAL_PROJECT)
+                return
+        elif "Geothermal Plant" in colony.unlocked_buildings:
+            geothermal = BUILDING_CLASSES["Geothermal Plant"]
+            if colony.has_enough_resources(geothermal.BASE_COST):
+                build_many(colony, geothermal, 1)
+                return
+
+        building_class = BUILDING_CLASSES[self.build_order[self.next_index]]
+        if colony.has_enough_resources(building_class.BASE_COST):
+            build_many(colony, building_class, 1)
+            self.next_index = (self.next_index + 1) % len(self.build_order)
+
+
+# Factories rather than instances: strategies keep per-run state.
+STRATEGIES = {
+    "idle": Strategy,
+    "miner": lambda: BuildOrderStrategy("miner", ["Mine", "Mine", "Solar Panel"]),
+    "balanced": lambda: BuildOrderStrategy("balanced", ["Mine", "Solar Panel", "Research Lab", "Hydroponics Farm"]),
+    "research_rush": lambda: BuildOrderStrategy("research_rush", ["Research Lab", "Solar Panel", "Research Lab", "Mine"]),
+}
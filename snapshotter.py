@@ -0,0 +1,88 @@
+import threading
+import time
+
+from save_format import encode_colony, write_atomic
+
+DEFAULT_SNAPSHOT_INTERVAL = 30.0 # Seconds between periodic snapshots
+
+
+class Snapshotter:
+    """
+    Periodically saves a colony without blocking the code that mutates it.
+
+    Every `interval` seconds it holds `lock` just long enough to take
+    Colony.snapshot(), then encodes the copy in the binary save format and
+    writes it atomically to `path` on its own thread. The same lock must be
+    held by everything that mutates the colony. Timings of the last snapshot
+    are kept in stats().
+
+    A snapshot is stamped with the wall-clock time the colony was advanced
+    to, so loading it credits the time since. That is `last_update()`,
+    read under the lock, for a colony that is only advanced when used, and
+    the time of the copy otherwise.
+    """
+
+    def __init__(self, colony, path, lock, interval=DEFAULT_SNAPSHOT_INTERVAL, last_update=None):
+        self.colony = colony
+        self.path = path
+        self.last_update = last_update
+        self.lock = lock
+        self.interval = interval
+        self.snapshots_written = 0
+        self.last_pause_seconds = None # Time the lock was held for the copy
+        self.last_write_seconds = None # Encoding plus writing, off the lock
+        self.last_saved_at = None
+        self.last_error = None
+        self._stop = threading.Event()
+        self._thread = None
+        self._write_lock = threading.Lock() # One writer at a time
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="colony-snapshotter", daemon=True)
+            self._thread.start()
+
+    def stop(self, final_snapshot=True):
+        """Stops the background thread, optionally writing one last snapshot."""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        if final_snapshot:
+            self.snapshot_now()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.snapshot_now()
+
+    def snapshot_now(self):
+        """Takes and writes one snapshot on the calling thread. Returns True on success."""
+        with self._write_lock:
+            start = time.perf_counter()
+            with self.lock:
+                copy = self.colony.snapshot()
+                saved_at = self.last_update() if self.last_update is not None else time.time()
+            copied = time.perf_counter()
+            try:
+                write_atomic(self.path, encode_colony(copy, saved_at))
+            except OSError as e:
+                self.last_error = str(e)
+                return False
+            self.last_pause_seconds = copied - start
+            self.last_write_seconds = time.perf_counter() - copied
+            self.last_saved_at = saved_at
+            self.last_error = None
+            self.snapshots_written += 1
+            return True
+
+    def stats(self):
+        return {
+            "path": self.path,
+            "interval": self.interval,
+            "snapshots_written": self.snapshots_written,
+            "last_pause_seconds": self.last_pause_seconds,
+            "last_write_seconds": self.last_write_seconds,
+            "last_saved_at": self.last_saved_at,
+            "last_error": self.last_error,
+        }
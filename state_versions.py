@@ -0,0 +1,150 @@
+"""
+Versions of a colony's state as the API shows it (Colony.to_dict), and
+JSON Patch (RFC 6902) deltas between them.
+
+A version is assigned when the state is read: if anything changed since the
+last read, the version goes up by one. The log keeps a small summary of the
+last few versions (resources, counters and the building changes made since),
+which is enough to describe what changed without keeping old states around.
+
+Resources accrue and elapsed time grows continuously, so the version of an
+advancing colony changes on nearly every read. The discrete version leaves
+those two out: it is the version at which something last happened to the
+colony (a build, research, an event, an alert), and stays put while the
+colony merely produces.
+"""
+from collections import deque, namedtuple
+
+# Versions a client can ask for a delta from; older ones get the full state.
+DEFAULT_VERSION_LOG_CAPACITY = 256
+# Building changes kept for deltas, oldest dropped first.
+MAX_RECENT_BUILDING_CHANGES = 4096
+# A delta with more operations than this is sent as the full state instead.
+MAX_PATCH_OPERATIONS = 1000
+
+_Entry = namedtuple("_Entry", [
+    "version", "resources", "elapsed_time", "turn_number", "building_changes",
+    "events_appended", "history_length", "completed_research", "unlocked_buildings", "alerts",
+])
+
+
+class VersionLog:
+    """
+    The state version of one colony and what changed between recent
+    versions. Colony records its building changes here; observe() assigns
+    versions and patch_since() builds deltas. Versions continue from
+    `version`, e.g. one past the version a save was taken at.
+    """
+
+    def __init__(self, version=0, capacity=DEFAULT_VERSION_LOG_CAPACITY):
+        self.version = version
+        self.discrete_version = version
+        self._entries = deque(maxlen=capacity)
+        self._building_changes = deque(maxlen=MAX_RECENT_BUILDING_CHANGES)
+        self.building_change_count = 0 # Changes ever recorded, including dropped ones
+
+    def record_building_change(self, change):
+        self._building_changes.append(change)
+        self.building_change_count += 1
+
+    def observe(self, colony):
+        """
+        Returns the version of the colony's current state, starting a new one
+        if it changed. Also brings discrete_version up to date.
+        """
+        history = colony.event_history
+        alerts = colony.pending_major_events.fingerprint()
+        if self._entries:
+            last = self._entries[-1]
+            discrete_changed = not (
+                last.events_appended == history.appended_count
+                and last.building_changes == self.building_change_count
+                and last.turn_number == colony.turn_number
+                and last.history_length == len(history)
+                and last.completed_research == colony.completed_research
+                and last.unlocked_buildings == colony.unlocked_buildings
+                and last.alerts == alerts
+            )
+            if (
+                not discrete_changed
+                and last.elapsed_time == colony.elapsed_time
+                and last.resources == colony.resources
+            ):
+                return self.version
+            self.version += 1
+            if discrete_changed:
+                self.discrete_version = self.version
+        self._entries.append(_Entry(
+            self.version, dict(colony.resources), colony.elapsed_time, colony.turn_number,
+            self.building_change_count, history.appended_count, len(history),
+            frozenset(colony.completed_research), frozenset(colony.unlocked_buildings), alerts,
+        ))
+        return self.version
+
+    def patch_since(self, colony, version):
+        """
+        JSON Patch operations that turn the to_dict() state at `version` into
+        the current one, or None if that version is no longer (or was never)
+        in the log or the patch would be too long.
+        """
+        current = self.observe(colony)
+        if not self._entries or not self._entries[0].version <= version <= current:
+            return None
+        base = self._entries[version - self._entries[0].version]
+        patch = []
+        for name, amount in colony.resources.items():
+            if base.resources.get(name) != amount:
+                patch.append({"op": "replace" if name in base.resources else "add",
+                              "path": f"/resources/{name}", "value": amount})
+        for name in base.resources.keys() - colony.resources.keys():
+            patch.append({"op": "remove", "path": f"/resources/{name}"})
+        if not self._building_patch(base, patch) or not self._event_patch(colony, base, patch):
+            return None
+        for field in ("elapsed_time", "turn_number"):
+            if getattr(base, field) != getattr(colony, field):
+                patch.append({"op": "replace", "path": f"/{field}", "value": getattr(colony, field)})
+        for field in ("completed_research", "unlocked_buildings"):
+            if getattr(base, field) != getattr(colony, field):
+                patch.append({"op": "replace", "path": f"/{field}", "value": list(getattr(colony, field))})
+        if base.version != current:
+            patch.append({"op": "replace", "path": "/version", "value": current})
+        return patch if len(patch) <= MAX_PATCH_OPERATIONS else None
+
+    def _building_patch(self, base, patch):
+        new_changes = self.building_change_count - base.building_changes
+        if new_changes > len(self._building_changes):
+            return False # Some were already dropped
+        operations = 0
+        for change in list(self._building_changes)[len(self._building_changes) - new_changes:]:
+            kind = change[0]
+            if kind == "add":
+                _, name, level, count = change
+                operations += count
+                if operations > MAX_PATCH_OPERATIONS:
+                    return False
+                patch.extend({"op": "add", "path": "/buildings/-", "value": {"name": name, "level": level}}
+                             for _ in range(count))
+            elif kind == "level":
+                patch.append({"op": "replace", "path": f"/buildings/{change[1]}/level", "value": change[2]})
+            elif kind == "remove":
+                patch.append({"op": "remove", "path": f"/buildings/{change[1]}"})
+        return True
+
+    def _event_patch(self, colony, base, patch):
+        # The history is newest first and bounded, so each new record is
+        # inserted at the front and, once full, pushes the oldest off the end.
+        history = colony.event_history
+        new_records = history.records_since(base.events_appended)
+        length = base.history_length
+        if history.appended_count - base.events_appended != len(new_records) or len(new_records) >= history.capacity:
+            patch.append({"op": "replace", "path": "/event_history", "value": history.to_list()})
+            return True
+        for record in new_records:
+            patch.append({"op": "add", "path": "/event_history/0", "value": record.to_dict()})
+            if length == history.capacity:
+                patch.append({"op": "remove", "path": f"/event_history/{length}"})
+            else:
+                length += 1
+        if length != len(history): # Cleared in between
+            return False
+        return True
@@ -0,0 +1,67 @@
+import unittest
+
+from colony import Colony
+from buildings import Mine, SolarPanel
+from game import generate_resources
+from affordability import AffordabilityScheduler, seconds_to_afford
+
+class TestAffordabilityScheduler(unittest.TestCase):
+    def setUp(self):
+        self.colony = Colony()
+        self.colony.resources.update({"Minerals": 0.0, "Energy": 0.0, "Food": 0.0, "ResearchPoints": 0.0})
+        self.scheduler = AffordabilityScheduler(self.colony)
+
+    def test_predicts_affordable_time(self):
+        # Base production is 1 Mineral/s, a Mine costs 50 Minerals
+        self.assertAlmostEqual(self.scheduler.seconds_until(("build", "Mine")), 50.0)
+        self.assertFalse(self.scheduler.is_affordable(("build", "Mine")))
+        generate_resources(self.colony, 50.0)
+        self.assertTrue(self.scheduler.is_affordable(("build", "Mine")))
+
+    def test_no_rebuild_while_production_is_linear(self):
+        self.scheduler.refresh()
+        for _ in range(10):
+            generate_resources(self.colony, 1.0)
+            self.scheduler.next_unlock()
+        self.assertEqual(self.scheduler.rebuild_count, 1)
+
+    def test_rebuild_after_discontinuous_change(self):
+        self.scheduler.refresh()
+        self.colony.add_resource("Minerals", 40.0)
+        self.assertAlmostEqual(self.scheduler.seconds_until(("build", "Mine")), 10.0)
+        self.colony.add_building(Mine())
+        self.scheduler.refresh()
+        self.assertEqual(self.scheduler.rebuild_count, 3)
+        self.assertIn(("upgrade", ("Mine", 1)), self.scheduler.affordable_at)
+        self.assertEqual(self.scheduler.seconds_until(("upgrade", 0)),
+                         self.scheduler.seconds_until(("upgrade", ("Mine", 1))))
+
+    def test_upgrades_are_grouped_by_type_and_level(self):
+        for compact in (False, True):
+            colony = Colony(compact_buildings=compact)
+            colony.add_buildings(Mine, 1000)
+            colony.add_buildings(SolarPanel, 1000)
+            colony.resources.update({"Minerals": 1000, "Energy": 1000})
+            colony.upgrade_building(1500)
+            scheduler = AffordabilityScheduler(colony)
+            scheduler.refresh()
+            upgrades = {key for key in scheduler.affordable_at if key[0] == "upgrade"}
+            self.assertEqual(upgrades, {("upgrade", ("Mine", 1)), ("upgrade", ("Solar Panel", 1)),
+                                        ("upgrade", ("Solar Panel", 2))})
+            self.assertEqual(scheduler.resolve(("upgrade", ("Solar Panel", 1))), ("upgrade", 1000))
+            self.assertEqual(scheduler.resolve(("upgrade", ("Solar Panel", 2))), ("upgrade", 1500))
+            self.assertIsNone(scheduler.resolve(("upgrade", ("Mine", 7))))
+            self.assertIsNone(scheduler.seconds_until(("upgrade", 2000))) # No such building
+
+    def test_next_unlock_is_earliest(self):
+        seconds, key = self.scheduler.next_unlock()
+        # Solar Panel (30M, 20E) is the cheapest at 1M/s and 1E/s
+        self.assertEqual(key, ("build", "Solar Panel"))
+        self.assertAlmostEqual(seconds, 30.0)
+
+    def test_research_without_production_never_unlocks(self):
+        self.assertIsNone(self.scheduler.seconds_until(("research", "geothermal_power")))
+        self.assertIsNone(seconds_to_afford({"ResearchPoints": 10}, {}, {}))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import unittest
+import random
+
+from colony import Colony
+from buildings import Mine, SolarPanel, GeothermalPlant
+from building_store import CompactBuildingStore, BuildingView
+
+class TestCompactBuildingStore(unittest.TestCase):
+    def setUp(self):
+        self.colony = Colony(compact_buildings=True)
+        self.colony.resources["Minerals"] = 10000
+        self.colony.resources["Energy"] = 10000
+
+    def test_views_behave_like_buildings(self):
+        self.colony.add_building(Mine())
+        self.colony.add_building(SolarPanel())
+        self.assertIsInstance(self.colony.buildings, CompactBuildingStore)
+        self.assertIsInstance(self.colony.buildings[0], BuildingView)
+        self.assertEqual(self.colony.buildings[1].name, "Solar Panel")
+        self.assertEqual(self.colony.buildings[0].upgrade_cost(), Mine().upgrade_cost())
+        self.assertEqual(self.colony.buildings[0].cost, Mine().cost)
+
+    def test_upgrade_and_production(self):
+        self.colony.add_building(GeothermalPlant())
+        self.assertTrue(self.colony.upgrade_building(0))
+        self.assertEqual(self.colony.buildings[0].level, 2)
+        self.assertEqual(self.colony.calculate_production_bonuses()["Energy"], 20)
+        self.assertTrue(self.colony.verify_production_rates())
+
+    def test_damage_removes_from_arrays(self):
+        self.colony.add_building(Mine())
+        random.seed(1)
+        msg = self.colony.damage_random_building()
+        self.assertIn("destroyed", msg)
+        self.assertEqual(len(self.colony.buildings), 0)
+        self.assertEqual(len(self.colony.buildings.levels), 0)
+
+    def test_to_dict_matches_object_colony(self):
+        object_colony = Colony()
+        for colony in (self.colony, object_colony):
+            colony.add_building(Mine())
+            colony.add_building(SolarPanel())
+            colony.buildings[1].level = 3
+        self.assertEqual(self.colony.to_dict()["buildings"], object_colony.to_dict()["buildings"])
+
+if __name__ == '__main__':
+    unittest.main()
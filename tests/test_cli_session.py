@@ -0,0 +1,61 @@
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from colony import Colony
+from buildings import Mine, SolarPanel
+from save_journal import SaveJournal
+from main import resume_session, autosave, building_lines
+
+
+class TestCliSession(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "session.sav")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_missing_save_starts_fresh_colony(self):
+        colony, offline_seconds = resume_session(self.path)
+        self.assertEqual(len(colony.buildings), 0)
+        self.assertEqual(offline_seconds, 0.0)
+
+    def test_autosave_then_resume(self):
+        colony = Colony(seed=9)
+        colony.add_buildings(Mine, 3)
+        journal = SaveJournal(self.path)
+        self.assertTrue(autosave(journal, colony))
+        colony.add_building(SolarPanel())
+        self.assertTrue(autosave(journal, colony))
+        time.sleep(0.01)
+        resumed, offline_seconds = resume_session(self.path)
+        self.assertEqual([b.name for b in resumed.buildings], [b.name for b in colony.buildings])
+        self.assertGreater(offline_seconds, 0.0)
+        self.assertLess(offline_seconds, 60.0)
+
+    def test_autosave_failure_is_logged(self):
+        journal = SaveJournal(os.path.join(self.directory, "missing", "session.sav"))
+        colony = Colony(seed=9)
+        self.assertFalse(autosave(journal, colony))
+        self.assertIn("Autosave failed", colony.event_history[0].message)
+
+
+class TestBuildingLines(unittest.TestCase):
+    def test_lists_buildings_that_fit(self):
+        colony = Colony()
+        colony.add_buildings(Mine, 2)
+        self.assertEqual(building_lines(colony.buildings, 5), ["Mine (Level 1)", "Mine (Level 1)"])
+
+    def test_summarizes_large_colonies(self):
+        for compact in (False, True):
+            colony = Colony(compact_buildings=compact)
+            colony.add_buildings(Mine, 1000)
+            colony.add_buildings(SolarPanel, 10)
+            self.assertEqual(building_lines(colony.buildings, 5), ["Mine x1000", "Solar Panel x10"])
+
+
+if __name__ == '__main__':
+    unittest.main()
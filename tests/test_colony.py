@@ -1,4 +1,5 @@
 import unittest
+from unittest import mock
 from colony import Colony
 from buildings import Mine, SolarPanel, ResearchLab # Assuming ResearchLab is a default building
 from research import RESEARCH_PROJECTS
@@ -27,7 +28,7 @@ class TestBuildingUpgrades(unittest.TestCase):
         self.assertEqual(self.colony.buildings[0].level, 2)
         self.assertEqual(self.colony.resources["Minerals"], initial_minerals - upgrade_cost["Minerals"])
         self.assertEqual(self.colony.resources["Energy"], initial_energy - upgrade_cost["Energy"])
-        self.assertIn(f"{mine.name} upgraded to level 2", self.colony.event_history[0])
+        self.assertIn(f"{mine.name} upgraded to level 2", self.colony.event_history[0].message)
 
     def test_upgrade_building_insufficient_resources(self):
         mine = Mine()
@@ -43,7 +44,7 @@ class TestBuildingUpgrades(unittest.TestCase):
         self.assertEqual(self.colony.buildings[0].level, 1)
         self.assertEqual(self.colony.resources["Minerals"], original_minerals)
         self.assertEqual(self.colony.resources["Energy"], original_energy)
-        self.assertIn(f"Not enough resources to upgrade {mine.name}", self.colony.event_history[0])
+        self.assertIn(f"Not enough resources to upgrade {mine.name}", self.colony.event_history[0].message)
 
     def test_production_bonus_increases_with_level(self):
         mine = Mine()
@@ -82,12 +83,114 @@ class TestBuildingUpgrades(unittest.TestCase):
         success_negative = self.colony.upgrade_building(-1)
         self.assertFalse(success_negative)
         self.assertEqual(self.colony.buildings[0].level, 1)
-        self.assertIn("Invalid building index", self.colony.event_history[0])
+        self.assertIn("Invalid building index", self.colony.event_history[0].message)
 
         self.colony.event_history.clear()
         success_oob = self.colony.upgrade_building(5)
         self.assertFalse(success_oob)
-        self.assertIn("Invalid building index", self.colony.event_history[0])
+        self.assertIn("Invalid building index", self.colony.event_history[0].message)
+
+
+class TestMultiLevelUpgrade(unittest.TestCase):
+    def setUp(self):
+        self.colony = Colony()
+        self.colony.add_building(Mine())
+
+    def test_upgrade_to_matches_repeated_single_upgrades(self):
+        reference = Colony()
+        reference.add_building(Mine())
+        for colony in (self.colony, reference):
+            colony.resources["Minerals"] = 5000
+            colony.resources["Energy"] = 5000
+        for _ in range(5):
+            reference.upgrade_building(0)
+
+        success, _ = self.colony.upgrade_to(0, 6)
+        self.assertTrue(success)
+        self.assertEqual(self.colony.buildings[0].level, 6)
+        self.assertEqual(self.colony.resources, reference.resources)
+        self.assertEqual(self.colony.calculate_production_bonuses(), reference.calculate_production_bonuses())
+
+    def test_upgrade_to_reports_max_affordable_level(self):
+        # Level 1->2 costs 25M/10E, 2->3 costs 70M/28E
+        self.colony.resources["Minerals"] = 100
+        self.colony.resources["Energy"] = 100
+        success, max_level = self.colony.upgrade_to(0, 10)
+        self.assertFalse(success)
+        self.assertEqual(max_level, 3)
+        self.assertEqual(self.colony.buildings[0].level, 1)
+        self.assertEqual(self.colony.resources["Minerals"], 100)
+
+        success, _ = self.colony.upgrade_to(0, max_level)
+        self.assertTrue(success)
+        self.assertEqual(self.colony.resources["Minerals"], 5)
+
+    def test_upgrade_to_stops_if_spending_fails(self):
+        self.colony.resources["Minerals"] = 5000
+        self.colony.resources["Energy"] = 5000
+        with mock.patch.object(self.colony, "spend_resources", return_value=False):
+            success, _ = self.colony.upgrade_to(0, 4)
+        self.assertFalse(success)
+        self.assertEqual(self.colony.buildings[0].level, 1)
+        self.assertEqual(self.colony.calculate_production_bonuses()["Minerals"], 5)
+        self.assertIn("Not enough resources", self.colony.event_history[0].message)
+
+    def test_upgrade_to_rejects_lower_level(self):
+        success, _ = self.colony.upgrade_to(0, 1)
+        self.assertFalse(success)
+        self.assertIn("already at level 1", self.colony.event_history[0].message)
+
+
+class TestProductionRateCache(unittest.TestCase):
+    def setUp(self):
+        self.colony = Colony()
+        self.colony.resources["Minerals"] = 10000
+        self.colony.resources["Energy"] = 10000
+
+    def test_cache_tracks_add_and_upgrade(self):
+        self.colony.add_building(Mine())
+        self.colony.add_building(SolarPanel())
+        self.colony.add_building(ResearchLab())
+        self.colony.upgrade_building(0)
+        self.colony.upgrade_building(2)
+
+        bonuses = self.colony.calculate_production_bonuses()
+        self.assertEqual(bonuses["Minerals"], 10)
+        self.assertEqual(bonuses["Energy"], 3)
+        self.assertAlmostEqual(bonuses["ResearchPoints"], 1.0)
+        self.assertTrue(self.colony.verify_production_rates())
+
+    def test_cache_tracks_damage(self):
+        mine = Mine()
+        mine.level = 3
+        self.colony.add_building(mine)
+        self.colony.damage_random_building()
+        self.assertEqual(self.colony.calculate_production_bonuses()["Minerals"], 10)
+        self.colony.damage_random_building()
+        self.colony.damage_random_building()
+        self.assertEqual(len(self.colony.buildings), 0)
+        self.assertEqual(self.colony.calculate_production_bonuses().get("Minerals", 0), 0)
+        self.assertTrue(self.colony.verify_production_rates())
+
+    def test_rebuild_after_direct_level_edit(self):
+        self.colony.add_building(Mine())
+        self.colony.buildings[0].level = 4
+        self.assertFalse(self.colony.verify_production_rates())
+        self.colony.rebuild_production_rates()
+        self.assertEqual(self.colony.calculate_production_bonuses()["Minerals"], 20)
+
+    def test_replayed_changes_match_the_original(self):
+        self.colony.add_buildings(Mine, 3)
+        self.colony.upgrade_building(1)
+        self.colony.damage_random_building()
+        replica = Colony(compact_buildings=True)
+        for change in self.colony.building_changes:
+            replica.apply_building_change(change)
+        self.assertEqual([(b.name, b.level) for b in replica.buildings],
+                         [(b.name, b.level) for b in self.colony.buildings])
+        self.assertEqual(replica.calculate_production_bonuses(), self.colony.calculate_production_bonuses())
+        self.assertTrue(replica.verify_production_rates())
+        self.assertEqual(replica.building_changes, [])
 
 
 class TestResearchSystem(unittest.TestCase):
@@ -114,7 +217,7 @@ class TestResearchSystem(unittest.TestCase):
         self.assertIn(project_id, self.colony.completed_research)
         self.assertIn("Geothermal Plant", self.colony.unlocked_buildings)
         self.assertEqual(self.colony.resources["ResearchPoints"], initial_rp - project_details["cost"])
-        self.assertIn(f"Research complete: {project_details['name']}", self.colony.event_history[0])
+        self.assertIn(f"Research complete: {project_details['name']}", self.colony.event_history[0].message)
 
     def test_research_project_insufficient_research_points(self):
         self.colony.resources["ResearchPoints"] = 50 # Insufficient for geothermal_power (cost 250)
@@ -127,7 +230,7 @@ class TestResearchSystem(unittest.TestCase):
         self.assertNotIn(project_id, self.colony.completed_research)
         self.assertNotIn("Geothermal Plant", self.colony.unlocked_buildings)
         self.assertEqual(self.colony.resources["ResearchPoints"], initial_rp)
-        self.assertIn(f"Not enough Research Points for '{project_details['name']}'", self.colony.event_history[0])
+        self.assertIn(f"Not enough Research Points for '{project_details['name']}'", self.colony.event_history[0].message)
 
     def test_research_project_already_completed(self):
         self.colony.resources["ResearchPoints"] = 300
@@ -142,13 +245,13 @@ class TestResearchSystem(unittest.TestCase):
         success = self.colony.research_project(project_id) # Second time
         self.assertFalse(success) # Should indicate not "successful" in terms of new research
         self.assertEqual(self.colony.resources["ResearchPoints"], current_rp_after_first_research)
-        self.assertIn(f"Project '{project_name}' already researched", self.colony.event_history[0])
+        self.assertIn(f"Project '{project_name}' already researched", self.colony.event_history[0].message)
 
     def test_research_invalid_project_id(self):
         project_id = "non_existent_project"
         success = self.colony.research_project(project_id)
         self.assertFalse(success)
-        self.assertIn(f"Error: Research project '{project_id}' not found", self.colony.event_history[0])
+        self.assertIn(f"Error: Research project '{project_id}' not found", self.colony.event_history[0].message)
 
 if __name__ == '__main__':
     unittest.main()
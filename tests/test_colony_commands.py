@@ -0,0 +1,66 @@
+import unittest
+
+from colony import Colony
+from events import MeteorStrikeWarning
+from colony_commands import run_batch, run_command, CommandError, ATOMIC, BEST_EFFORT, MAX_BATCH_COMMANDS
+
+
+class TestCommandBatches(unittest.TestCase):
+    def make_colony(self):
+        colony = Colony(seed=4)
+        colony.resources["Minerals"] = 120.0 # Two mines at 50 each
+        return colony
+
+    def test_atomic_batch_leaves_colony_untouched_on_failure(self):
+        colony = self.make_colony()
+        before = (dict(colony.resources), len(colony.event_history), colony.state_version())
+        committed, results = run_batch(colony, [{"action": "build", "building": "Mine"}] * 3, ATOMIC)
+        self.assertFalse(committed)
+        self.assertEqual([result["success"] for result in results], [True, True, False])
+        self.assertEqual(len(colony.buildings), 0)
+        self.assertEqual((dict(colony.resources), len(colony.event_history), colony.state_version()), before)
+
+    def test_atomic_batch_applies_everything_on_success(self):
+        colony = self.make_colony()
+        entry = colony.pending_major_events.push(MeteorStrikeWarning(colony.rng), colony.elapsed_time)
+        trial = colony.snapshot()
+        committed, results = run_batch(colony, [
+            {"action": "build", "building": "Mine"},
+            {"action": "upgrade", "index": 0},
+            {"action": "resolve", "event_id": entry.event_id, "choice": "brace"},
+        ], ATOMIC)
+        self.assertTrue(committed)
+        self.assertTrue(all(result["success"] for result in results))
+        self.assertEqual(len(colony.pending_major_events), 0)
+        # The colony ended where the trial run did
+        run_batch(trial, [{"action": "build", "building": "Mine"}, {"action": "upgrade", "index": 0},
+                          {"action": "resolve", "event_id": entry.event_id, "choice": "brace"}], BEST_EFFORT)
+        self.assertEqual(colony.resources, trial.resources)
+        self.assertEqual(results[2]["message"], trial.event_history[0].message)
+
+    def test_best_effort_batch_reports_failures_and_continues(self):
+        colony = self.make_colony()
+        committed, results = run_batch(colony, [
+            {"action": "build", "building": "Mine"},
+            {"action": "launch", "target": "moon"},
+            {"action": "resolve", "event_id": 99, "choice": "brace"},
+            "build",
+            {"action": "build", "building": "Mine"},
+        ], BEST_EFFORT)
+        self.assertTrue(committed)
+        self.assertEqual([result["success"] for result in results], [True, False, False, False, True])
+        self.assertEqual(results[2]["status"], 404)
+        self.assertEqual(len(colony.buildings), 2)
+
+    def test_malformed_batches_are_rejected(self):
+        colony = self.make_colony()
+        for commands, mode in (([], ATOMIC), (None, ATOMIC), ([{"action": "build"}], "eventually"),
+                               ([{"action": "build"}] * (MAX_BATCH_COMMANDS + 1), BEST_EFFORT)):
+            with self.assertRaises(CommandError):
+                run_batch(colony, commands, mode)
+        self.assertEqual(run_command(colony, {"action": "upgrade", "index": "first"})["error"],
+                         "index must be an integer")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,156 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+from buildings import Mine
+from events import MeteorStrikeWarning
+from colony_store import ColonyStore
+from colony_sessions import SessionCache, UnknownColonyError, SESSION_OVERHEAD_BYTES
+
+
+class TestSessionCache(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.store = ColonyStore(os.path.join(self.directory, "colonies.db"))
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.directory)
+
+    def test_least_recently_used_is_evicted_and_reloaded(self):
+        sessions = SessionCache(self.store, max_colonies=2)
+        for colony_id in ("a", "b"):
+            sessions.create(colony_id, seed=1)
+        with sessions.use("a") as session:
+            session.colony.add_buildings(Mine, 3)
+        sessions.create("c")
+        self.assertIsNone(sessions.resident("b"))
+        self.assertIsNotNone(sessions.resident("a"))
+        self.assertEqual(sessions.evictions, 1)
+
+        with sessions.use("b") as session: # Miss: loaded from the store, evicting "a"
+            self.assertEqual(session.colony.rng_seed, 1)
+        with sessions.use("a") as session:
+            self.assertEqual(len(session.colony.buildings), 3)
+        metrics = sessions.metrics()
+        self.assertEqual((metrics["hits"], metrics["misses"], metrics["resident"]), (1, 2, 2))
+
+    def test_byte_budget(self):
+        sessions = SessionCache(self.store, max_colonies=100, max_bytes=3 * SESSION_OVERHEAD_BYTES)
+        sessions.create("big")
+        with sessions.use("big") as session:
+            session.colony.add_buildings(Mine, 10000)
+        sessions.create("small")
+        self.assertIsNone(sessions.resident("big"))
+        self.assertLessEqual(sessions.resident_bytes, sessions.max_bytes)
+
+    def test_reload_credits_idle_time(self):
+        sessions = SessionCache(self.store, max_colonies=1, speed=10000.0)
+        sessions.create("idle")
+        with sessions.use("idle") as session:
+            session.colony.pending_major_events.push(MeteorStrikeWarning(), session.colony.elapsed_time, deadline=1e9)
+            elapsed_before = session.colony.elapsed_time
+        sessions.evict("idle")
+        time.sleep(0.05)
+        with sessions.use("idle") as session:
+            # At least 0.05 s * 10000 of colony time passed on disk
+            self.assertGreaterEqual(session.colony.elapsed_time - elapsed_before, 450.0)
+            deadlines = [entry.deadline for entry in session.colony.pending_major_events.entries()]
+            self.assertIn(1e9, deadlines) # Queued alerts survive eviction
+
+    def test_idle_time_before_eviction_is_credited(self):
+        sessions = SessionCache(self.store, max_colonies=10, speed=10000.0)
+        for colony_id in ("evicted", "flushed"):
+            sessions.create(colony_id)
+        elapsed_before = {}
+        for colony_id in ("evicted", "flushed"):
+            with sessions.use(colony_id) as session:
+                elapsed_before[colony_id] = session.colony.elapsed_time
+        time.sleep(0.05) # Idle while resident, before it is written out
+        sessions.flush()
+        sessions.evict("flushed")
+        sessions.evict("evicted")
+        for colony_id in ("evicted", "flushed"):
+            with sessions.use(colony_id) as session:
+                # At least 0.05 s * 10000 of colony time, though it was written out right away
+                self.assertGreaterEqual(session.colony.elapsed_time - elapsed_before[colony_id], 450.0)
+
+    def test_unknown_and_duplicate_ids(self):
+        sessions = SessionCache(self.store)
+        with self.assertRaises(UnknownColonyError):
+            with sessions.use("nobody"):
+                pass
+        sessions.create("taken")
+        sessions.evict("taken")
+        with self.assertRaises(ValueError):
+            sessions.create("taken")
+        self.assertTrue(sessions.delete("taken"))
+        self.assertFalse(sessions.delete("taken"))
+
+    def test_busy_session_is_not_evicted(self):
+        sessions = SessionCache(self.store, max_colonies=1)
+        sessions.create("busy")
+        entered, release = threading.Event(), threading.Event()
+
+        def hold():
+            with sessions.use("busy"):
+                entered.set()
+                release.wait(5)
+
+        worker = threading.Thread(target=hold)
+        worker.start()
+        entered.wait(5)
+        sessions.create("other")
+        self.assertIsNotNone(sessions.resident("busy"))
+        release.set()
+        worker.join()
+        # Back within budget once the busy colony is released
+        self.assertEqual(len(sessions), 1)
+        self.assertEqual(sessions.flush(), 1)
+
+    def test_busy_colony_does_not_hold_up_the_others(self):
+        sessions = SessionCache(self.store, max_colonies=2)
+        for colony_id in ("stored", "other"):
+            sessions.create(colony_id)
+        sessions.evict("stored")
+        sessions.create("busy")
+        entered, release = threading.Event(), threading.Event()
+
+        def hold():
+            with sessions.use("busy"):
+                entered.set()
+                release.wait(5)
+
+        worker = threading.Thread(target=hold)
+        worker.start()
+        entered.wait(5)
+        try:
+            start = time.perf_counter()
+            self.assertEqual(sessions.flush(), 1) # "other"; the busy colony is left for the next flush
+            with sessions.use("stored") as session: # Loaded from the store, evicting "other"
+                self.assertEqual(session.colony_id, "stored")
+            self.assertLess(time.perf_counter() - start, 1.0)
+            self.assertIsNone(sessions.resident("other"))
+            self.assertIsNotNone(sessions.resident("busy"))
+        finally:
+            release.set()
+            worker.join()
+        self.assertEqual(sessions.flush(), 1) # "busy"; "stored" was only read
+
+    def test_reads_do_not_make_a_colony_dirty(self):
+        sessions = SessionCache(self.store)
+        sessions.create("quiet")
+        self.assertEqual(sessions.flush(), 1)
+        with sessions.use("quiet") as session:
+            session.colony.to_dict() # Resources accrued, nothing happened
+        self.assertEqual(sessions.flush(), 0)
+        with sessions.use("quiet") as session:
+            session.colony.add_buildings(Mine, 1)
+        self.assertEqual(sessions.flush(), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+from colony import Colony
+from buildings import Mine
+from game import save_game
+from colony_store import ColonyStore, import_save_files, main
+
+
+class TestColonyStore(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.store = ColonyStore(os.path.join(self.directory, "colonies.db"))
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.directory)
+
+    def test_save_and_load_round_trip(self):
+        colony = Colony(seed=11)
+        colony.add_buildings(Mine, 4)
+        colony.resources["Minerals"] = 123.0
+        self.store.save("alpha", colony, owner="ada")
+        loaded = self.store.load("alpha")
+        self.assertEqual(loaded.resources, colony.resources)
+        self.assertEqual(len(loaded.buildings), 4)
+        self.assertEqual(loaded.rng.random(), colony.rng.random())
+        summary = self.store.summary("alpha")
+        self.assertEqual(summary["owner"], "ada")
+        self.assertEqual(summary["minerals"], 123.0)
+        self.assertEqual(summary["building_count"], 4)
+        self.assertIsNone(self.store.load("missing"))
+
+    def test_batched_upsert_keeps_owner(self):
+        colonies = {f"c{i}": Colony(seed=i) for i in range(20)}
+        self.store.save_many([(colony_id, colony, "bob") for colony_id, colony in colonies.items()])
+        colonies["c3"].resources["Energy"] = 999.0
+        self.store.save_many([("c3", colonies["c3"], None)])
+        self.assertEqual(self.store.count(), 20)
+        self.assertEqual(self.store.summary("c3")["owner"], "bob")
+        self.assertEqual(self.store.summary("c3")["energy"], 999.0)
+        self.assertEqual(len(self.store.colonies_of("bob")), 20)
+        self.assertTrue(self.store.delete("c3"))
+        self.assertEqual(self.store.count(), 19)
+
+    def test_idle_colonies_query(self):
+        self.store.save_many([("old", Colony(seed=1), None), ("new", Colony(seed=2), None)])
+        with self.store.connection() as connection:
+            connection.execute("UPDATE colonies SET last_update = last_update - 7200 WHERE colony_id = 'old'")
+            plan = " ".join(row[-1] for row in connection.execute(
+                "EXPLAIN QUERY PLAN SELECT colony_id FROM colonies WHERE last_update < 0 ORDER BY last_update"
+            ))
+        self.assertIn("colonies_last_update", plan)
+        idle = self.store.idle_colonies(3600)
+        self.assertEqual([row[0] for row in idle], ["old"])
+
+    def test_concurrent_saves_use_pool(self):
+        def worker(offset):
+            for i in range(10):
+                self.store.save(f"w{offset}-{i}", Colony(seed=i))
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.store.count(), 60)
+
+    def test_import_json_saves(self):
+        colony = Colony(seed=5)
+        colony.add_buildings(Mine, 2)
+        json_path = os.path.join(self.directory, "savegame.json")
+        bad_path = os.path.join(self.directory, "broken.json")
+        with contextlib.redirect_stdout(io.StringIO()):
+            save_game(colony, json_path)
+        with open(bad_path, "w") as f:
+            f.write("{not json")
+        with contextlib.redirect_stdout(io.StringIO()):
+            imported, skipped = import_save_files(self.store, [json_path, bad_path], owner="eve")
+        self.assertEqual(imported, ["savegame"])
+        self.assertEqual(skipped, [bad_path])
+        self.assertEqual(len(self.store.load("savegame").buildings), 2)
+        self.assertEqual(self.store.summary("savegame")["owner"], "eve")
+
+    def test_import_command(self):
+        json_path = os.path.join(self.directory, "savegame.json")
+        with contextlib.redirect_stdout(io.StringIO()):
+            save_game(Colony(seed=6), json_path)
+        database = os.path.join(self.directory, "cli.db")
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            main(["import", database, json_path])
+        self.assertIn("imported savegame", output.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
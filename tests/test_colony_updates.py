@@ -0,0 +1,89 @@
+import asyncio
+import json
+import unittest
+
+from buildings import Mine
+from colony import Colony
+from colony_sessions import ColonySession
+from colony_updates import UpdateHub, Subscriber, DEFAULT_PUSH_RATE, MAX_PUSH_RATE, MIN_PUSH_RATE
+
+
+class TestUpdateHub(unittest.IsolatedAsyncioTestCase):
+    def make_hub(self, speed=0.0):
+        # At speed 0 the colony only changes when a test changes it
+        self.session = ColonySession("test", Colony(seed=2), speed=speed)
+
+        async def run(key, action):
+            with self.session.lock:
+                self.session.advance()
+                return action(self.session)
+
+        return UpdateHub(run)
+
+    def build_mine(self, hub):
+        with self.session.lock:
+            self.session.colony.add_buildings(Mine, 1)
+        hub.notify("test")
+
+    async def receive(self, subscriber):
+        return json.loads(await asyncio.wait_for(subscriber.next_message(), 2.0))
+
+    async def test_full_state_then_patches(self):
+        hub = self.make_hub()
+        subscriber = hub.subscribe("test")
+        first = await self.receive(subscriber)
+        self.assertEqual(first["type"], "state")
+        self.assertEqual(first["state"]["buildings"], [])
+
+        self.build_mine(hub)
+        update = await self.receive(subscriber)
+        self.assertEqual((update["type"], update["since"]), ("patch", first["version"]))
+        self.assertIn({"op": "add", "path": "/buildings/-", "value": {"name": "Mine", "level": 1}}, update["patch"])
+
+    async def test_slow_subscriber_gets_one_coalesced_patch(self):
+        hub = self.make_hub()
+        fast, slow = hub.subscribe("test"), hub.subscribe("test")
+        first, _ = await asyncio.gather(self.receive(fast), self.receive(slow))
+        self.assertEqual(hub.messages_built, 1) # One serialization for both
+
+        for _ in range(3):
+            self.build_mine(hub)
+            await self.receive(fast)
+        update = await self.receive(slow)
+        self.assertEqual(update["since"], first["version"])
+        building_adds = [operation for operation in update["patch"] if operation["path"] == "/buildings/-"]
+        self.assertEqual(len(building_adds), 3)
+
+    async def test_ticks_follow_the_negotiated_rate(self):
+        hub = self.make_hub(speed=1.0)
+        self.assertEqual(Subscriber(1000.0).rate, MAX_PUSH_RATE)
+        self.assertEqual(Subscriber(0.0).rate, MIN_PUSH_RATE)
+        for rate in (float("nan"), float("inf"), "fast"):
+            self.assertEqual(Subscriber(rate).rate, DEFAULT_PUSH_RATE)
+        subscriber = hub.subscribe("test", rate=MAX_PUSH_RATE)
+        await self.receive(subscriber)
+        ticks = [await self.receive(subscriber) for _ in range(3)]
+        self.assertTrue(all(any(operation["path"] == "/resources/Minerals" for operation in tick["patch"])
+                            for tick in ticks))
+
+    async def test_wait_for_change(self):
+        hub = self.make_hub()
+        self.assertFalse(await hub.wait_for_change("test", 0.01))
+        waiter = asyncio.create_task(hub.wait_for_change("test", 2.0))
+        await asyncio.sleep(0)
+        self.build_mine(hub)
+        self.assertTrue(await waiter)
+        self.assertEqual(hub._change_waiters, {})
+
+    async def test_closing_ends_the_stream(self):
+        hub = self.make_hub()
+        subscriber = hub.subscribe("test")
+        await self.receive(subscriber)
+        hub.close("test")
+        self.assertIsNone(await asyncio.wait_for(subscriber.next_message(), 2.0))
+        await asyncio.sleep(0) # Lets the feed notice it has no subscribers left
+        self.assertEqual(hub.metrics()["feeds"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
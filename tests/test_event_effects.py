@@ -0,0 +1,75 @@
+import unittest
+
+from colony import Colony
+from buildings import Mine
+from events import MeteorStrikeWarning, MinorResourceBoost, ProductionSpike, SmallResourceDrain, SolarFlare
+from event_effects import Add, Drain, Say, Chance, Roll, Param, compile_effects, apply_effects, apply_batch
+
+
+def make_colony(seed, energy=60.0):
+    colony = Colony(seed=seed)
+    for _ in range(3):
+        colony.add_building(Mine())
+    colony.resources["Energy"] = energy
+    return colony
+
+
+class TestEventEffects(unittest.TestCase):
+    def test_drain_never_goes_below_zero(self):
+        colony = make_colony(1)
+        colony.resources["Minerals"] = 5.0
+        program = compile_effects([Drain("Minerals", 20.0, store="lost"), Say("Lost {lost:.1f}.")])
+        self.assertEqual(apply_effects(program, colony, {}), "Lost 5.0.")
+        self.assertEqual(colony.resources["Minerals"], 0.0)
+
+    def test_params_and_rolls(self):
+        colony = make_colony(2)
+        before = colony.resources["Food"]
+        program = compile_effects([
+            Add(Param("resource"), Roll(3, 3), store="gained"),
+            Say("{label}: +{gained:.0f} {resource}"),
+        ])
+        message = apply_effects(program, colony, {"resource": "Food", "label": "Cache"})
+        self.assertEqual(message, "Cache: +3 Food")
+        self.assertEqual(colony.resources["Food"], before + 3.0)
+
+    def test_chance_follows_probability(self):
+        program = compile_effects([Chance(0.25, then=[Say("hit")], otherwise=[Say("miss")])])
+        colonies = [Colony(seed=seed) for seed in range(4000)]
+        messages = apply_batch(program, colonies, [{}] * len(colonies))
+        self.assertAlmostEqual(messages.count("hit") / len(messages), 0.25, delta=0.03)
+
+    def test_unknown_effect_is_rejected(self):
+        with self.assertRaises(TypeError):
+            compile_effects([object()])
+
+    def test_programs_are_compiled_once_per_class(self):
+        self.assertIs(SolarFlare.program(), SolarFlare.program())
+        self.assertIsNot(SolarFlare.program(), SmallResourceDrain.program())
+        self.assertIs(MeteorStrikeWarning.program("bogus"), MeteorStrikeWarning.program())
+
+    def test_batch_matches_one_colony_at_a_time(self):
+        for choice_key in ("shoot_down", "brace"):
+            batch = [make_colony(seed, energy=40.0 + seed % 30) for seed in range(300)]
+            single = [make_colony(seed, energy=40.0 + seed % 30) for seed in range(300)]
+            batch_events = [MeteorStrikeWarning(colony.rng) for colony in batch]
+            messages = MeteorStrikeWarning.apply_batch(batch_events, batch, choice_key)
+            expected = [MeteorStrikeWarning(colony.rng).apply(colony, choice_key) for colony in single]
+            self.assertEqual(messages, expected)
+            for batch_colony, single_colony in zip(batch, single):
+                self.assertEqual(batch_colony.resources, single_colony.resources)
+                self.assertEqual(len(batch_colony.buildings), len(single_colony.buildings))
+                self.assertEqual(batch_colony.rng.getstate(), single_colony.rng.getstate())
+
+    def test_apply_drawn_matches_an_instance(self):
+        for event_class in (MinorResourceBoost, SmallResourceDrain, ProductionSpike, SolarFlare):
+            drawn, instance = make_colony(5, energy=25.0), make_colony(5, energy=25.0)
+            for _ in range(20):
+                event_class.apply_drawn(drawn, drawn.rng)
+                event_class(instance.rng).apply(instance)
+            self.assertEqual(drawn.resources, instance.resources)
+            self.assertEqual(drawn.rng.getstate(), instance.rng.getstate())
+
+
+if __name__ == "__main__":
+    unittest.main()
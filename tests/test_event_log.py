@@ -0,0 +1,60 @@
+import unittest
+import os
+import tempfile
+
+from colony import Colony
+from buildings import Mine
+from events import SolarFlare
+from event_log import EventHistory, EventRecord, JsonLinesSink, SEVERITY_ERROR, SEVERITY_INFO
+from game import _apply_and_record
+
+class TestEventHistory(unittest.TestCase):
+    def test_ring_buffer_keeps_newest(self):
+        history = EventHistory(capacity=3)
+        for i in range(5):
+            history.append(EventRecord(f"event {i}", turn=i))
+        self.assertEqual(len(history), 3)
+        self.assertEqual([record.message for record in history], ["event 4", "event 3", "event 2"])
+        self.assertEqual(history[-1].message, "event 2")
+        self.assertEqual([record.turn for record in history[:2]], [4, 3])
+
+    def test_query_by_type_and_severity(self):
+        colony = Colony()
+        colony.add_event_to_history("fine")
+        colony.add_event_to_history("bad", "build", SEVERITY_ERROR)
+        self.assertEqual([r.message for r in colony.event_history.query(severity=SEVERITY_ERROR)], ["bad"])
+        self.assertEqual([r.message for r in colony.event_history.query(event_type="build")], ["bad"])
+
+    def test_sink_keeps_full_history(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "history.jsonl")
+            sink = JsonLinesSink(path)
+            colony = Colony(event_history_capacity=2, event_sink=sink)
+            for i in range(5):
+                colony.add_event_to_history(f"event {i}")
+            sink.close()
+            self.assertEqual(len(colony.event_history), 2)
+            self.assertEqual([r.message for r in JsonLinesSink.read(path)], [f"event {i}" for i in range(5)])
+
+    def test_legacy_string_entries(self):
+        record = EventRecord.from_dict("Lost 10 Energy")
+        self.assertEqual(record.message, "Lost 10 Energy")
+        self.assertEqual(record.severity, SEVERITY_INFO)
+
+class TestEventRecording(unittest.TestCase):
+    def test_resource_loss_recorded_as_error(self):
+        colony = Colony()
+        colony.resources["Energy"] = 50.0
+        record = _apply_and_record(colony, lambda: SolarFlare().apply(colony))
+        self.assertEqual(record.severity, SEVERITY_ERROR)
+        self.assertLess(record.deltas["Energy"], 0)
+
+    def test_building_damage_recorded_as_error(self):
+        colony = Colony()
+        colony.add_building(Mine())
+        record = _apply_and_record(colony, colony.damage_random_building)
+        self.assertEqual(record.severity, SEVERITY_ERROR)
+        self.assertEqual(record.deltas, {})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+import random
+import unittest
+
+from colony import Colony
+from buildings import Mine
+from events import MinorResourceBoost, SolarFlare, MeteorStrikeWarning
+from event_registry import AliasTable, EventRegistry, as_registry
+from game import trigger_random_event, fast_forward, AVAILABLE_EVENT_CLASSES
+
+
+class TestAliasTable(unittest.TestCase):
+    def test_frequencies_follow_weights(self):
+        weights = [1.0, 2.0, 7.0, 0.5]
+        table = AliasTable(weights)
+        rng = random.Random(0)
+        counts = [0] * len(weights)
+        draws = 200000
+        for _ in range(draws):
+            counts[table.sample(rng)] += 1
+        total = sum(weights)
+        for weight, count in zip(weights, counts):
+            self.assertAlmostEqual(count / draws, weight / total, delta=0.01)
+
+    def test_rejects_empty_weights(self):
+        with self.assertRaises(ValueError):
+            AliasTable([])
+
+
+class TestEventRegistry(unittest.TestCase):
+    def test_predicate_limits_eligibility(self):
+        registry = EventRegistry()
+        registry.register(MinorResourceBoost)
+        registry.register(MeteorStrikeWarning, predicate=lambda colony: len(colony.buildings) > 0)
+        colony = Colony(seed=1)
+        rng = random.Random(1)
+        self.assertEqual({registry.choose(colony, rng) for _ in range(50)}, {MinorResourceBoost})
+        colony.add_building(Mine())
+        self.assertIn(MeteorStrikeWarning, {registry.choose(colony, rng) for _ in range(50)})
+
+    def test_register_reads_what_the_event_declares(self):
+        rare_flare = type("RareFlare", (SolarFlare,), {"WEIGHT": 0.25, "COOLDOWN": 90.0})
+        registry = EventRegistry()
+        registry.register(rare_flare)
+        registry.register(MeteorStrikeWarning)
+        registry.register(MinorResourceBoost, weight=3.0)
+        flare, meteor, boost = registry.specs
+        self.assertEqual((flare.weight, flare.cooldown, flare.predicate), (0.25, 90.0, None))
+        self.assertEqual((boost.weight, boost.cooldown, boost.predicate), (3.0, 0.0, None))
+        colony = Colony(seed=1)
+        self.assertFalse(meteor.predicate(colony))
+        colony.add_building(Mine())
+        self.assertTrue(meteor.predicate(colony))
+
+    def test_cooldown_uses_colony_time(self):
+        registry = EventRegistry()
+        registry.register(SolarFlare, cooldown=60.0)
+        colony = Colony(seed=2)
+        rng = random.Random(2)
+        self.assertIs(registry.choose(colony, rng), SolarFlare)
+        self.assertIsNone(registry.choose(colony, rng))
+        colony.elapsed_time += 59.0
+        self.assertIsNone(registry.choose(colony, rng))
+        colony.elapsed_time += 1.0
+        self.assertIs(registry.choose(colony, rng), SolarFlare)
+
+    def test_cooldowns_do_not_rebuild_tables(self):
+        registry = EventRegistry()
+        for index in range(100):
+            registry.register(type(f"Event{index}", (MinorResourceBoost,), {}), weight=index + 1)
+        for index in range(10):
+            registry.register(type(f"Rare{index}", (SolarFlare,), {}), weight=50.0, cooldown=30.0)
+        colony = Colony(seed=3)
+        rng = random.Random(3)
+        for draw in range(2000):
+            colony.elapsed_time = draw * 10.0
+            registry.choose(colony, rng)
+        self.assertEqual(registry.table_builds, 1) # Ineligible draws are simply redrawn
+
+    def test_blocked_weight_falls_back_to_eligible_table(self):
+        registry = EventRegistry()
+        registry.register(MinorResourceBoost, weight=1.0)
+        registry.register(SolarFlare, weight=1e6, predicate=lambda colony: False)
+        colony = Colony(seed=6)
+        rng = random.Random(6)
+        self.assertEqual({registry.choose(colony, rng) for _ in range(20)}, {MinorResourceBoost})
+        self.assertEqual(registry.table_builds, 2)
+
+    def test_plain_class_lists_still_work(self):
+        self.assertIs(as_registry(AVAILABLE_EVENT_CLASSES), as_registry(list(AVAILABLE_EVENT_CLASSES)))
+        colony = Colony(seed=4)
+        for _ in range(100):
+            trigger_random_event(colony, [MinorResourceBoost])
+        self.assertTrue(all(record.message.startswith("Minor Resource Boost") for record in colony.event_history))
+
+    def test_fast_forward_respects_cooldowns(self):
+        registry = EventRegistry()
+        registry.register(MinorResourceBoost, cooldown=3600.0)
+        colony = Colony(seed=5)
+        summary = fast_forward(colony, 10 * 3600, registry)
+        self.assertLessEqual(summary["background_events"], 10)
+        self.assertGreaterEqual(summary["background_events"], 8)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import random
+import unittest
+
+from colony import Colony
+from event_schedule import EventSchedule
+from game import SimulationClock, fast_forward, schedule_next_event, run_due_events, EVENT_RATE
+
+
+class TestEventSchedule(unittest.TestCase):
+    def test_pops_due_keys_in_time_order(self):
+        schedule = EventSchedule()
+        schedule.push("b", 20.0)
+        schedule.push("a", 10.0)
+        schedule.push("c", 30.0)
+        self.assertEqual(schedule.next_due(), 10.0)
+        self.assertEqual(schedule.pop_due(25.0), ["a", "b"])
+        self.assertEqual(len(schedule), 1)
+        self.assertEqual(schedule.pop_due(25.0), [])
+
+    def test_reschedule_and_remove_replace_old_entries(self):
+        schedule = EventSchedule()
+        schedule.push("a", 10.0)
+        schedule.push("a", 50.0)
+        schedule.push("b", 20.0)
+        schedule.remove("b")
+        self.assertEqual(schedule.next_due(), 50.0)
+        self.assertEqual(schedule.pop_due(100.0), ["a"])
+        self.assertIsNone(schedule.next_due())
+
+    def test_many_colonies(self):
+        rng = random.Random(0)
+        schedule = EventSchedule()
+        due_times = {}
+        for colony_id in range(100_000):
+            due_times[colony_id] = rng.expovariate(EVENT_RATE)
+            schedule.push(colony_id, due_times[colony_id])
+        for colony_id in range(0, 100_000, 2): # Reschedule half of them
+            due_times[colony_id] += 1000.0
+            schedule.push(colony_id, due_times[colony_id])
+        due = schedule.pop_due(60.0)
+        self.assertEqual(sorted(due), sorted(key for key, time in due_times.items() if time <= 60.0))
+        self.assertEqual([due_times[key] for key in due], sorted(due_times[key] for key in due))
+        self.assertEqual(len(schedule), 100_000 - len(due))
+
+
+class TestPoissonEvents(unittest.TestCase):
+    def test_gaps_average_one_over_rate(self):
+        colony = Colony(seed=5)
+        times = [schedule_next_event(colony, 0.0)]
+        for _ in range(20000):
+            times.append(schedule_next_event(colony, times[-1]))
+        mean_gap = (times[-1] - times[0]) / (len(times) - 1)
+        self.assertAlmostEqual(mean_gap * EVENT_RATE, 1.0, delta=0.03)
+
+    def test_run_due_events_only_fires_reached_events(self):
+        colony = Colony(seed=2)
+        schedule_next_event(colony)
+        self.assertEqual(run_due_events(colony), 0)
+        colony.elapsed_time = colony.next_event_time
+        self.assertGreaterEqual(run_due_events(colony), 1)
+        self.assertGreater(colony.next_event_time, colony.elapsed_time)
+
+    def test_live_clock_and_fast_forward_share_the_schedule(self):
+        # Both fire the colony's pre-drawn events, so a colony advanced live
+        # and one fast-forwarded see the same event times.
+        live, fast = Colony(seed=9), Colony(seed=9)
+        SimulationClock().advance(live, 600.0)
+        fast_forward(fast, 600.0)
+        self.assertEqual(live.next_event_time, fast.next_event_time)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,6 +4,8 @@ import random
 from colony import Colony
 from buildings import Mine
 from events import SolarFlare
+from game import trigger_random_event, resolve_major_event, save_game, load_game, AVAILABLE_EVENT_CLASSES
+import os
 
 class TestEventConsequences(unittest.TestCase):
     def test_damage_random_building_downgrade(self):
@@ -33,6 +35,50 @@ class TestEventConsequences(unittest.TestCase):
         message = event.apply(colony)
         self.assertIn("Lost", message)
         self.assertLess(colony.resources["Energy"], 50.0)
+class TestColonyRandomStreams(unittest.TestCase):
+    def play(self, colony, checks=200):
+        for _ in range(checks):
+            major = trigger_random_event(colony, AVAILABLE_EVENT_CLASSES)
+            if major:
+                resolve_major_event(colony, major, "brace")
+        return colony.to_dict()
+
+    def make_colony(self, seed):
+        colony = Colony(seed=seed)
+        for _ in range(5):
+            colony.add_building(Mine())
+        return colony
+
+    def test_same_seed_replays_exactly(self):
+        first = self.make_colony(42)
+        random.seed(1)
+        first_state = self.play(first)
+        second = self.make_colony(42)
+        random.seed(2) # The global stream must not matter
+        second_state = self.play(second)
+        for state in (first_state, second_state):
+            for record in state["event_history"]:
+                record.pop("timestamp")
+        self.assertEqual(first_state, second_state)
+
+    def test_split_seeds_are_stable_and_distinct(self):
+        colony = Colony(seed=5)
+        seeds = colony.split_seeds(3)
+        self.assertEqual(seeds, Colony(seed=5).split_seeds(3))
+        self.assertEqual(len(set(seeds)), 3)
+
+    def test_save_load_resumes_stream(self):
+        filename = "test_rng_save.json"
+        try:
+            colony = self.make_colony(9)
+            self.play(colony, 20)
+            save_game(colony, filename)
+            loaded = load_game(filename)
+            self.assertEqual(loaded.rng_seed, 9)
+            self.assertEqual([colony.rng.random() for _ in range(5)], [loaded.rng.random() for _ in range(5)])
+        finally:
+            if os.path.exists(filename):
+                os.remove(filename)
 
 if __name__ == '__main__':
     unittest.main()
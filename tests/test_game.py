@@ -2,7 +2,9 @@ import unittest
 import os
 import json
 from colony import Colony
-from game import save_game, load_game, BUILDING_CLASSES
+import random
+from unittest import mock
+from game import save_game, load_game, build_many, fast_forward, accrue, generate_resources, get_production_rates, SimulationClock, BUILDING_CLASSES, EVENT_CHECK_INTERVAL, EVENT_CHANCE
 from buildings import Mine, GeothermalPlant  # For testing specific building instances
 from research import RESEARCH_PROJECTS
 
@@ -113,10 +115,162 @@ class TestGameLoadSave(unittest.TestCase):
         
         self.assertIsNotNone(loaded_colony)
         self.assertEqual(len(loaded_colony.event_history), 2)
-        self.assertIn("Test event 1", loaded_colony.event_history)
-        self.assertIn("Test event 2", loaded_colony.event_history)
-        # Note: Colony adds events to the beginning, so order is reversed from add calls
-        self.assertEqual(loaded_colony.event_history[0], "Test event 2")
+        messages = [record.message for record in loaded_colony.event_history]
+        self.assertIn("Test event 1", messages)
+        self.assertIn("Test event 2", messages)
+        # Note: history is newest first, so order is reversed from add calls
+        self.assertEqual(loaded_colony.event_history[0].message, "Test event 2")
+
+
+class TestBuildMany(unittest.TestCase):
+    def test_build_many_all_or_nothing(self):
+        colony = Colony()
+        colony.resources["Minerals"] = 175.0
+
+        success, affordable = build_many(colony, Mine, 4)
+        self.assertFalse(success)
+        self.assertEqual(affordable, 3)
+        self.assertEqual(len(colony.buildings), 0)
+        self.assertEqual(colony.resources["Minerals"], 175.0)
+
+        success, _ = build_many(colony, Mine, 3)
+        self.assertTrue(success)
+        self.assertEqual(len(colony.buildings), 3)
+        self.assertEqual(colony.resources["Minerals"], 25.0)
+        self.assertEqual(colony.calculate_production_bonuses()["Minerals"], 15)
+
+    def test_build_many_stops_if_spending_fails(self):
+        colony = Colony()
+        colony.resources["Minerals"] = 175.0
+        with mock.patch.object(colony, "spend_resources", return_value=False):
+            success, _ = build_many(colony, Mine, 3)
+        self.assertFalse(success)
+        self.assertEqual(len(colony.buildings), 0)
+        self.assertIn("Not enough resources", colony.event_history[0].message)
+
+    def test_build_many_compact_colony(self):
+        colony = Colony(compact_buildings=True)
+        colony.resources["Minerals"] = 1_000_000.0
+        colony.resources["Energy"] = 1_000_000.0
+        success, _ = build_many(colony, GeothermalPlant, 5000)
+        self.assertTrue(success)
+        self.assertEqual(len(colony.buildings), 5000)
+        self.assertTrue(colony.verify_production_rates())
+
+
+class TestFastForward(unittest.TestCase):
+    def test_production_matches_live_ticks(self):
+        fast = Colony()
+        live = Colony()
+        for colony in (fast, live):
+            colony.add_building(Mine())
+        fast_forward(fast, 3600, available_event_classes=[])
+        for _ in range(3600):
+            generate_resources(live, 1.0)
+        for resource_name, amount in live.resources.items():
+            self.assertAlmostEqual(fast.resources[resource_name], amount, places=6)
+
+    def test_event_count_follows_check_rate(self):
+        random.seed(3)
+        colony = Colony()
+        seconds = 7 * 24 * 3600
+        summary = fast_forward(colony, seconds)
+        fired = summary["background_events"] + summary["queued_major_events"]
+        expected = seconds / EVENT_CHECK_INTERVAL * EVENT_CHANCE
+        self.assertLess(abs(fired - expected), 5 * (expected ** 0.5))
+        self.assertEqual(len(colony.pending_major_events), summary["queued_major_events"])
+        self.assertTrue(all(event.is_major for event in colony.pending_major_events))
+
+    def test_load_game_catch_up(self):
+        filename = "test_catch_up.json"
+        try:
+            colony = Colony()
+            colony.resources["Minerals"] = 0.0
+            save_game(colony, filename)
+            with open(filename) as f:
+                data = json.load(f)
+            data["saved_at"] -= 100.0
+            with open(filename, "w") as f:
+                json.dump(data, f)
+            self.assertAlmostEqual(load_game(filename).resources["Minerals"], 0.0)
+            random.seed(0)
+            # 100s of base production, minus at most a few small drains
+            self.assertGreater(load_game(filename, catch_up=True).resources["Minerals"], 40.0)
+        finally:
+            if os.path.exists(filename):
+                os.remove(filename)
+
+
+class TestAccrue(unittest.TestCase):
+    def test_production_is_rate_times_idle_time(self):
+        colony = Colony()
+        colony.add_building(Mine())
+        rates = get_production_rates(colony)
+        resources_before = dict(colony.resources)
+        accrue(colony, 3600, available_event_classes=[])
+        for resource_name, rate in rates.items():
+            self.assertAlmostEqual(colony.resources[resource_name], resources_before[resource_name] + rate * 3600)
+        self.assertEqual(colony.elapsed_time, 3600)
+
+    def test_one_late_read_matches_many_reads(self):
+        once = Colony(seed=5)
+        often = Colony(seed=5)
+        for colony in (once, often):
+            colony.add_building(Mine())
+        fired = accrue(once, 3600.0)
+        for _ in range(1440):
+            fired -= accrue(often, 2.5)
+        self.assertEqual(fired, 0)
+        self.assertGreater(len(once.event_history), 0)
+        self.assertEqual([record.message for record in once.event_history],
+                         [record.message for record in often.event_history])
+        for resource_name, amount in once.resources.items():
+            self.assertAlmostEqual(often.resources[resource_name], amount, places=6)
+
+
+class TestSimulationClock(unittest.TestCase):
+    def _run(self, frame_times, speed=1.0):
+        colony = Colony(seed=42)
+        clock = SimulationClock(speed=speed)
+        for frame in frame_times:
+            clock.advance(colony, frame)
+        return colony, clock
+
+    def test_same_seed_and_duration_replay_identically(self):
+        # Irregular frame pacing must not change the outcome
+        steady, _ = self._run([0.05] * 4000)
+        jittery, _ = self._run([0.013, 0.137, 0.05] * 1000)
+        self.assertEqual(steady.resources, jittery.resources)
+        self.assertEqual(
+            [record.message for record in steady.event_history],
+            [record.message for record in jittery.event_history],
+        )
+
+    def test_events_fire_at_their_scheduled_times(self):
+        colony = Colony(seed=1)
+        clock = SimulationClock()
+        fired_at = []
+        with mock.patch("game.fire_event", side_effect=lambda colony, registry, now=None: fired_at.append(now)):
+            for _ in range(1000):
+                clock.advance(colony, 1.0)
+        self.assertEqual(clock.total_ticks, 10000)
+        self.assertGreater(len(fired_at), 0)
+        self.assertEqual(fired_at, sorted(fired_at))
+        self.assertLessEqual(fired_at[-1], colony.elapsed_time)
+        self.assertGreater(colony.next_event_time, colony.elapsed_time)
+
+    def test_speed_scales_simulated_time(self):
+        colony, clock = self._run([1.0] * 10, speed=100.0)
+        self.assertAlmostEqual(colony.elapsed_time, 1000.0, places=3)
+        self.assertEqual(clock.total_ticks, 10000)
+
+    def test_backlog_beyond_cap_is_fast_forwarded(self):
+        colony = Colony(seed=5)
+        clock = SimulationClock(max_catch_up_ticks=100, available_event_classes=[])
+        stepped = clock.advance(colony, 3600.0)
+        self.assertEqual(stepped, 100)
+        self.assertAlmostEqual(clock.fast_forwarded_seconds, 3600.0 - 10.0, places=6)
+        self.assertAlmostEqual(colony.elapsed_time, 3600.0, places=3)
 
 
 if __name__ == '__main__':
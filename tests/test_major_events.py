@@ -0,0 +1,73 @@
+import unittest
+
+from colony import Colony
+from buildings import Mine
+from events import MeteorStrikeWarning
+from major_events import MajorEventQueue, DEFAULT_DEADLINE
+from game import SimulationClock, resolve_pending_event, expire_major_events
+
+
+class TestMajorEventQueue(unittest.TestCase):
+    def test_priority_then_deadline_order(self):
+        queue = MajorEventQueue()
+        late = queue.push(MeteorStrikeWarning(), 0.0, deadline=500.0)
+        soon = queue.push(MeteorStrikeWarning(), 10.0, deadline=100.0)
+        urgent = queue.push(MeteorStrikeWarning(), 20.0, deadline=900.0, priority=5)
+        self.assertEqual([entry.event_id for entry in queue.entries()], [urgent.event_id, soon.event_id, late.event_id])
+        self.assertIs(queue.pop(), urgent)
+        self.assertIs(queue.peek(), soon)
+        self.assertEqual(queue.next_deadline(), 100.0)
+
+    def test_remove_by_id_and_expire(self):
+        queue = MajorEventQueue()
+        first = queue.push(MeteorStrikeWarning(), 0.0)
+        second = queue.push(MeteorStrikeWarning(), 50.0)
+        self.assertEqual(first.deadline, DEFAULT_DEADLINE)
+        self.assertIs(queue.remove(first.event_id), first)
+        self.assertIsNone(queue.remove(first.event_id))
+        self.assertEqual(queue.pop_expired(DEFAULT_DEADLINE), [])
+        self.assertEqual(queue.pop_expired(50.0 + DEFAULT_DEADLINE), [second])
+        self.assertEqual(len(queue), 0)
+
+
+class TestPendingEventResolution(unittest.TestCase):
+    def make_colony(self):
+        colony = Colony(seed=3)
+        for _ in range(4):
+            colony.add_building(Mine())
+        return colony
+
+    def test_resolve_by_id_validates(self):
+        colony = self.make_colony()
+        entry = colony.pending_major_events.push(MeteorStrikeWarning(colony.rng), colony.elapsed_time)
+        with self.assertRaises(KeyError):
+            resolve_pending_event(colony, entry.event_id + 1, "brace")
+        with self.assertRaises(ValueError):
+            resolve_pending_event(colony, entry.event_id, "surrender")
+        self.assertEqual(len(colony.pending_major_events), 1)
+        record = resolve_pending_event(colony, entry.event_id, "brace")
+        self.assertTrue(record.message.startswith("Meteor Strike Warning! - "))
+        self.assertEqual(len(colony.pending_major_events), 0)
+
+    def test_default_choice_applies_on_timeout(self):
+        colony = self.make_colony()
+        entry = colony.pending_major_events.push(MeteorStrikeWarning(colony.rng), 0.0, deadline=5.0)
+        self.assertEqual(entry.default_choice, "brace")
+        self.assertEqual(expire_major_events(colony, 4.9), 0)
+        self.assertEqual(expire_major_events(colony, 5.0), 1)
+        self.assertIn("defaulted", colony.event_history[0].message)
+
+    def test_clock_never_leaves_alerts_unanswered(self):
+        colony = self.make_colony()
+        clock = SimulationClock(available_event_classes=[MeteorStrikeWarning])
+        for _ in range(200):
+            clock.advance(colony, 5.0)
+        # Every alert raised more than a deadline ago has been settled
+        for entry in colony.pending_major_events.entries():
+            self.assertGreater(entry.deadline, colony.elapsed_time)
+        defaulted = [record for record in colony.event_history if "defaulted" in record.message]
+        self.assertGreater(len(defaulted), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+
+from colony import Colony
+from buildings import Mine
+from game import generate_resources, build_structure, BUILDING_CLASSES
+from planner import plan_route, parse_goal, time_to_afford
+
+class TestPlanner(unittest.TestCase):
+    def replay(self, colony, plan):
+        """Executes a plan without events and checks every step is affordable at its ETA."""
+        now = 0.0
+        for step in plan["steps"]:
+            generate_resources(colony, step["eta"] - now + 1e-6)
+            now = step["eta"]
+            if step["action"] == "build":
+                self.assertTrue(build_structure(colony, BUILDING_CLASSES[step["target"]]))
+            elif step["action"] == "upgrade":
+                candidates = [i for i, b in enumerate(colony.buildings) if b.name == step["target"]]
+                index = min(candidates, key=lambda i: colony.buildings[i].level)
+                self.assertTrue(colony.upgrade_building(index))
+            elif step["action"] == "research":
+                self.assertTrue(colony.research_project(step["target"]))
+
+    def test_plan_to_research_is_executable(self):
+        colony = Colony()
+        plan = plan_route(colony, {"research": "geothermal_power"}, time_budget=0.2)
+        self.assertIsNotNone(plan["eta"])
+        self.assertEqual((plan["steps"][-1]["action"], plan["steps"][-1]["target"]), ("research", "geothermal_power"))
+        self.replay(colony, plan)
+        self.assertIn("geothermal_power", colony.completed_research)
+
+    def test_plan_to_building_goes_through_research(self):
+        plan = plan_route(Colony(), {"building": "Geothermal Plant"}, time_budget=0.2)
+        actions = [(step["action"], step["target"]) for step in plan["steps"]]
+        self.assertIn(("research", "geothermal_power"), actions)
+        self.assertEqual(actions[-1], ("build", "Geothermal Plant"))
+
+    def test_goal_already_met(self):
+        colony = Colony()
+        colony.add_building(Mine())
+        plan = plan_route(colony, {"building": "Mine"})
+        self.assertEqual(plan["steps"], [])
+        self.assertEqual(plan["eta"], 0.0)
+
+    def test_invalid_goal(self):
+        with self.assertRaises(ValueError):
+            parse_goal({"research": "warp_drive"})
+        for goal in ({"resource": ["Energy"]}, {"building": {"Mine": 1}}, {"research": None}):
+            with self.assertRaises(ValueError):
+                parse_goal(goal)
+
+    def test_invalid_goal_amount(self):
+        for amount in (float("nan"), float("inf"), "nan", "1000", True, None):
+            with self.assertRaises(ValueError):
+                parse_goal({"resource": "Energy", "amount": amount})
+        self.assertEqual(parse_goal({"resource": "Energy", "amount": 1000}), ("resource", "Energy", 1000.0))
+
+    def test_invalid_time_budget(self):
+        for time_budget in (float("nan"), float("inf"), -1.0):
+            with self.assertRaises(ValueError):
+                plan_route(Colony(), {"building": "Geothermal Plant"}, time_budget)
+
+    def test_time_to_afford(self):
+        self.assertEqual(time_to_afford((10.0, 0.0), (0.0, 0.0), (2.0, 0.0)), 5.0)
+        self.assertIsNone(time_to_afford((0.0, 10.0), (0.0, 0.0), (2.0, 0.0)))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from colony import Colony
+from buildings import Mine, SolarPanel, GeothermalPlant
+from building_store import TYPE_IDS_BY_NAME
+from game import save_game, load_game
+from save_format import (
+    encode_colony, decode_save, read_save, is_binary_save, write_atomic,
+    SaveFormatError, HEADER, MAGIC, FORMAT_VERSION,
+)
+
+
+def _sample_colony(compact=False):
+    colony = Colony(seed=1234, compact_buildings=compact)
+    colony.resources.update({"Minerals": 12.5, "Energy": 7.25, "Food": 3.0, "ResearchPoints": 99.0})
+    colony.add_buildings(Mine, 3)
+    colony.add_building(SolarPanel())
+    geothermal = GeothermalPlant()
+    geothermal.level = 4
+    colony.add_building(geothermal)
+    colony.completed_research = {"geothermal_power", "fusion_power"}
+    colony.unlocked_buildings |= {"Geothermal Plant", "Some Future Building"}
+    colony.elapsed_time = 321.5
+    colony.rng.random() # Move the stream away from its seeded start
+    colony.add_event_to_history("Something happened.", "test")
+    return colony
+
+
+class TestBinarySaveFormat(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "colony.sav")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def assertSameColony(self, original, loaded):
+        self.assertEqual(loaded.resources, original.resources)
+        self.assertEqual(
+            [(b.name, b.level) for b in loaded.buildings],
+            [(b.name, b.level) for b in original.buildings],
+        )
+        self.assertEqual(loaded.calculate_production_bonuses(), original.calculate_production_bonuses())
+        self.assertEqual(loaded.completed_research, original.completed_research)
+        self.assertEqual(loaded.unlocked_buildings, original.unlocked_buildings)
+        self.assertEqual(loaded.elapsed_time, original.elapsed_time)
+        self.assertEqual(loaded.rng_seed, original.rng_seed)
+        self.assertEqual(loaded.rng.random(), original.rng.random())
+        self.assertEqual(loaded.event_history[0].message, original.event_history[0].message)
+
+    def test_round_trip_object_buildings(self):
+        colony = _sample_colony()
+        save_game(colony, self.path, binary=True)
+        self.assertTrue(is_binary_save(self.path))
+        self.assertSameColony(colony, load_game(self.path))
+
+    def test_round_trip_compact_buildings(self):
+        colony = _sample_colony(compact=True)
+        save_game(colony, self.path, binary=True)
+        loaded = load_game(self.path, compact_buildings=True)
+        self.assertSameColony(colony, loaded)
+        self.assertEqual(loaded.buildings.type_ids.tolist()[:3], [TYPE_IDS_BY_NAME["Mine"]] * 3)
+
+    def test_json_saves_still_load(self):
+        colony = _sample_colony()
+        json_path = os.path.join(self.directory, "colony.json")
+        save_game(colony, json_path)
+        self.assertFalse(is_binary_save(json_path))
+        self.assertSameColony(colony, load_game(json_path))
+
+    def test_corrupted_payload_is_rejected(self):
+        data = bytearray(encode_colony(_sample_colony()))
+        data[-1] ^= 0xFF
+        with self.assertRaises(SaveFormatError):
+            decode_save(bytes(data))
+        with open(self.path, "wb") as f:
+            f.write(data)
+        self.assertIsNone(load_game(self.path))
+
+    def test_truncated_and_newer_files_are_rejected(self):
+        data = encode_colony(_sample_colony())
+        with self.assertRaises(SaveFormatError):
+            decode_save(data[:HEADER.size + 10])
+        newer = HEADER.pack(MAGIC, FORMAT_VERSION + 1, 0, 0, 0)
+        with self.assertRaises(SaveFormatError):
+            decode_save(newer)
+
+    def test_read_save_uses_file_buffer(self):
+        colony = _sample_colony()
+        write_atomic(self.path, encode_colony(colony, saved_at=5.0))
+        fields = read_save(self.path)
+        self.assertEqual(fields["saved_at"], 5.0)
+        self.assertEqual(len(fields["levels"]), len(colony.buildings))
+
+    def test_atomic_write_leaves_no_temp_files(self):
+        write_atomic(self.path, b"first")
+        write_atomic(self.path, b"second")
+        self.assertEqual(os.listdir(self.directory), ["colony.sav"])
+        with open(self.path, "rb") as f:
+            self.assertEqual(f.read(), b"second")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,138 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from colony import Colony
+from buildings import Mine, SolarPanel
+from game import load_game, trigger_random_event, AVAILABLE_EVENT_CLASSES
+from save_journal import SaveJournal, BackgroundSaver, journal_path
+
+
+class TestSaveJournal(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "colony.sav")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def _busy_colony(self, compact=False):
+        colony = Colony(seed=7, compact_buildings=compact)
+        colony.resources.update({"Minerals": 1e6, "Energy": 1e6, "ResearchPoints": 1e4})
+        colony.add_buildings(Mine, 50)
+        return colony
+
+    def _mutate(self, colony):
+        colony.add_building(SolarPanel())
+        colony.upgrade_building(3)
+        colony.upgrade_to(10, 5)
+        for _ in range(3):
+            colony.damage_random_building() # Mostly level 1 buildings, so mostly removals
+        colony.research_project("geothermal_power")
+        for _ in range(30):
+            trigger_random_event(colony, AVAILABLE_EVENT_CLASSES[:-1])
+        colony.elapsed_time += 12.0
+
+    def assertSameColony(self, original, loaded):
+        self.assertEqual(loaded.resources, original.resources)
+        self.assertEqual(
+            [(b.name, b.level) for b in loaded.buildings],
+            [(b.name, b.level) for b in original.buildings],
+        )
+        self.assertEqual(loaded.calculate_production_bonuses(), original.calculate_production_bonuses())
+        self.assertEqual(loaded.completed_research, original.completed_research)
+        self.assertEqual(loaded.unlocked_buildings, original.unlocked_buildings)
+        self.assertEqual(loaded.elapsed_time, original.elapsed_time)
+        self.assertEqual(
+            [record.message for record in loaded.event_history],
+            [record.message for record in original.event_history],
+        )
+        self.assertEqual(loaded.rng.random(), original.rng.random())
+
+    def test_first_save_is_full_then_deltas(self):
+        colony = self._busy_colony()
+        journal = SaveJournal(self.path)
+        self.assertEqual(journal.save(colony), "full")
+        base_size = os.path.getsize(self.path)
+        self._mutate(colony)
+        self.assertEqual(journal.save(colony), "delta")
+        self.assertEqual(os.path.getsize(self.path), base_size)
+        self.assertGreater(os.path.getsize(journal_path(self.path)), 0)
+
+    def test_load_replays_base_plus_journal(self):
+        for compact in (False, True):
+            colony = self._busy_colony(compact)
+            journal = SaveJournal(self.path)
+            journal.save(colony)
+            for _ in range(3):
+                self._mutate(colony)
+                journal.save(colony)
+            loaded = load_game(self.path, compact_buildings=compact)
+            self.assertSameColony(colony, loaded)
+
+    def test_journal_compacts_past_threshold(self):
+        colony = self._busy_colony()
+        journal = SaveJournal(self.path, compact_threshold=1)
+        journal.save(colony)
+        self._mutate(colony)
+        self.assertEqual(journal.save(colony), "delta")
+        self._mutate(colony)
+        self.assertEqual(journal.save(colony), "full")
+        self.assertEqual(os.path.getsize(journal_path(self.path)), 0)
+        self.assertSameColony(colony, load_game(self.path))
+
+    def test_stale_and_torn_journal_lines_are_ignored(self):
+        colony = self._busy_colony()
+        journal = SaveJournal(self.path)
+        journal.save(colony)
+        self._mutate(colony)
+        journal.save(colony)
+        with open(journal_path(self.path)) as f:
+            stale_delta = f.read()
+        # A new base was written but the crash happened before the journal was truncated
+        journal.compact(colony)
+        with open(journal_path(self.path), "w") as f:
+            f.write(stale_delta + '{"generation": 1, "trunc')
+        self.assertSameColony(colony, load_game(self.path))
+
+    def test_failed_write_makes_the_next_save_full(self):
+        colony = self._busy_colony()
+        journal = SaveJournal(self.path)
+        journal.save(colony)
+        self._mutate(colony)
+        failing = journal.prepare(colony)
+        self._mutate(colony)
+        after_failure = journal.prepare(colony) # Prepared before the failure, written after it
+        journal.journal_path = os.path.join(self.directory, "missing", "colony.sav.journal")
+        with self.assertRaises(OSError):
+            journal.write(failing)
+        journal.journal_path = journal_path(self.path)
+        journal.write(after_failure) # Skipped: it would follow a missing delta
+        self.assertEqual(os.path.getsize(journal_path(self.path)), 0)
+        self.assertEqual(journal.save(colony), "full")
+        self.assertSameColony(colony, load_game(self.path))
+
+    def test_background_saver_writes_in_order(self):
+        colony = self._busy_colony(compact=True)
+        saver = BackgroundSaver(SaveJournal(self.path))
+        self.assertEqual(saver.save(colony), "full")
+        for _ in range(3):
+            self._mutate(colony)
+            self.assertEqual(saver.save(colony), "delta")
+        expected = colony.snapshot() # The saver thread may still be writing while the colony moves on
+        self._mutate(colony)
+        saver.stop()
+        self.assertIsNone(saver.take_error())
+        self.assertSameColony(expected, load_game(self.path, compact_buildings=True))
+
+    def test_background_failure_is_reported(self):
+        saver = BackgroundSaver(SaveJournal(os.path.join(self.directory, "missing", "colony.sav")))
+        saver.save(self._busy_colony())
+        saver.stop()
+        self.assertIsNotNone(saver.take_error())
+        self.assertIsNone(saver.take_error())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,29 @@
+import unittest
+import os
+import csv
+import tempfile
+
+from sim.runner import simulate_colony, run_batch, write_results
+
+class TestHeadlessSimulator(unittest.TestCase):
+    def test_same_seed_same_result(self):
+        first = simulate_colony(7, "balanced", duration=600)
+        second = simulate_colony(7, "balanced", duration=600)
+        self.assertEqual(first, second)
+        self.assertGreater(first["building_count"], 0)
+
+    def test_batch_writes_csv(self):
+        results, stats = run_batch(range(2), ["idle", "miner"], duration=120, workers=1)
+        self.assertEqual(stats["runs"], 4)
+        self.assertGreater(stats["throughput"], 0)
+        with tempfile.TemporaryDirectory() as tmp:
+            write_results(results, tmp)
+            with open(os.path.join(tmp, "runs.csv")) as f:
+                rows = list(csv.DictReader(f))
+            self.assertEqual(len(rows), 4)
+            self.assertEqual(rows[0]["strategy"], "idle")
+            with open(os.path.join(tmp, "curves.csv")) as f:
+                self.assertEqual(next(csv.reader(f))[:2], ["run_id", "time"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+from colony import Colony
+from buildings import Mine
+from game import load_game, generate_resources
+from snapshotter import Snapshotter
+
+
+class TestColonySnapshot(unittest.TestCase):
+    def test_snapshot_is_detached(self):
+        colony = Colony(seed=3)
+        colony.add_buildings(Mine, 5)
+        colony.add_event_to_history("Before snapshot.")
+        copy = colony.snapshot()
+        colony.add_building(Mine())
+        colony.buildings[0].level = 9
+        colony.resources["Minerals"] += 100.0
+        colony.add_event_to_history("After snapshot.")
+        colony.completed_research.add("fusion_power")
+        self.assertEqual(len(copy.buildings), 5)
+        self.assertEqual(copy.buildings[0].level, 1)
+        self.assertEqual(copy.resources["Minerals"], 50.0)
+        self.assertEqual(copy.event_history[0].message, "Before snapshot.")
+        self.assertEqual(copy.completed_research, set())
+        self.assertEqual(copy.calculate_production_bonuses(), {"Minerals": 25.0})
+
+
+class TestSnapshotter(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "snapshot.sav")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_snapshot_now_writes_loadable_save(self):
+        colony = Colony(seed=4)
+        colony.add_buildings(Mine, 10)
+        snapshotter = Snapshotter(colony, self.path, threading.Lock())
+        self.assertTrue(snapshotter.snapshot_now())
+        stats = snapshotter.stats()
+        self.assertEqual(stats["snapshots_written"], 1)
+        self.assertGreaterEqual(stats["last_pause_seconds"], 0.0)
+        self.assertGreaterEqual(stats["last_write_seconds"], 0.0)
+        loaded = load_game(self.path)
+        self.assertEqual(len(loaded.buildings), 10)
+        self.assertEqual(loaded.resources, colony.resources)
+
+    def test_snapshot_is_stamped_with_the_last_update(self):
+        colony = Colony(seed=4)
+        snapshotter = Snapshotter(colony, self.path, threading.Lock(), last_update=lambda: 1000.0)
+        self.assertTrue(snapshotter.snapshot_now())
+        self.assertEqual(load_game(self.path).saved_at, 1000.0) # Loading credits the idle time since
+
+    def test_background_thread_runs_alongside_mutations(self):
+        colony = Colony(seed=5, compact_buildings=True)
+        lock = threading.Lock()
+        snapshotter = Snapshotter(colony, self.path, lock, interval=0.001)
+        snapshotter.start()
+        for _ in range(2000):
+            with lock:
+                colony.add_buildings(Mine, 10)
+                generate_resources(colony, 1.0)
+        snapshotter.stop(final_snapshot=True)
+        self.assertGreaterEqual(snapshotter.snapshots_written, 1)
+        loaded = load_game(self.path, compact_buildings=True)
+        self.assertEqual(len(loaded.buildings), len(colony.buildings))
+        self.assertEqual(loaded.elapsed_time, colony.elapsed_time)
+
+
+if __name__ == '__main__':
+    unittest.main()
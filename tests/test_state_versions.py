@@ -0,0 +1,130 @@
+import copy
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from colony import Colony
+from buildings import Mine, SolarPanel
+from events import MeteorStrikeWarning
+from game import accrue, build_many, save_game, load_game
+from state_versions import DEFAULT_VERSION_LOG_CAPACITY
+
+
+def apply_patch(document, patch):
+    """Minimal JSON Patch (add/replace/remove) for checking the deltas."""
+    document = copy.deepcopy(document)
+    for operation in patch:
+        *parents, last = operation["path"].split("/")[1:]
+        target = document
+        for part in parents:
+            target = target[int(part)] if isinstance(target, list) else target[part]
+        if isinstance(target, list):
+            if operation["op"] == "remove":
+                del target[int(last)]
+            elif operation["op"] == "add":
+                target.insert(len(target) if last == "-" else int(last), operation["value"])
+            else:
+                target[int(last)] = operation["value"]
+        elif operation["op"] == "remove":
+            del target[last]
+        else:
+            target[last] = operation["value"]
+    return document
+
+
+def comparable(state):
+    state = json.loads(json.dumps(state))
+    for field in ("completed_research", "unlocked_buildings"):
+        state[field] = sorted(state[field])
+    return state
+
+
+class TestVersionLog(unittest.TestCase):
+    def make_colony(self, **kwargs):
+        colony = Colony(seed=11, **kwargs)
+        colony.resources["Minerals"] = 10000.0
+        colony.resources["Energy"] = 10000.0
+        return colony
+
+    def test_version_only_moves_when_the_state_changes(self):
+        colony = self.make_colony()
+        version = colony.state_version()
+        self.assertEqual(colony.state_version(), version)
+        colony.to_dict()
+        self.assertEqual(colony.state_version(), version)
+        build_many(colony, Mine, 2)
+        self.assertEqual(colony.state_version(), version + 1)
+
+    def test_discrete_version_ignores_accrual(self):
+        colony = self.make_colony()
+        build_many(colony, Mine, 2)
+        discrete = colony.discrete_version()
+        version = colony.state_version()
+        accrue(colony, 1.0, []) # Production only, no events
+        self.assertGreater(colony.state_version(), version)
+        self.assertEqual(colony.discrete_version(), discrete)
+        colony.upgrade_building(0)
+        self.assertEqual(colony.discrete_version(), colony.state_version())
+        discrete = colony.discrete_version()
+        colony.pending_major_events.push(MeteorStrikeWarning(), colony.elapsed_time)
+        self.assertGreater(colony.discrete_version(), discrete)
+
+    def test_patch_turns_old_state_into_current(self):
+        for compact in (False, True):
+            colony = self.make_colony(compact_buildings=compact, event_history_capacity=5)
+            build_many(colony, Mine, 3)
+            old_state = colony.to_dict()
+            since = old_state["version"]
+
+            build_many(colony, SolarPanel, 2)
+            colony.upgrade_building(1)
+            colony.damage_random_building()
+            accrue(colony, 2000.0) # Production, several events, more than fill the history
+            colony.resources["ResearchPoints"] = 500.0
+            colony.research_project("lab_efficiency_1")
+
+            patch = colony.versions.patch_since(colony, since)
+            self.assertIsNotNone(patch)
+            self.assertEqual(comparable(apply_patch(old_state, patch)), comparable(colony.to_dict()))
+            self.assertEqual(colony.versions.patch_since(colony, colony.state_version()), [])
+
+            # A few new records on a full history: inserted at the front, oldest dropped
+            old_state = colony.to_dict()
+            build_many(colony, Mine, 1)
+            colony.upgrade_building(0)
+            patch = colony.versions.patch_since(colony, old_state["version"])
+            self.assertIn({"op": "remove", "path": "/event_history/5"}, patch)
+            self.assertEqual(comparable(apply_patch(old_state, patch)), comparable(colony.to_dict()))
+
+    def test_unknown_or_expired_versions_get_no_patch(self):
+        colony = self.make_colony()
+        first = colony.state_version()
+        self.assertIsNone(colony.versions.patch_since(colony, first + 1))
+        for _ in range(DEFAULT_VERSION_LOG_CAPACITY):
+            accrue(colony, 1.0)
+            colony.state_version()
+        self.assertIsNone(colony.versions.patch_since(colony, first))
+        colony.add_buildings(Mine, 2000) # Longer than a patch is worth
+        self.assertIsNone(colony.versions.patch_since(colony, colony.state_version() - 1))
+
+    def test_versions_continue_after_reload(self):
+        colony = self.make_colony()
+        build_many(colony, Mine, 2)
+        saved_version = colony.state_version()
+        for binary in (False, True):
+            directory = tempfile.mkdtemp()
+            path = os.path.join(directory, "versions.sav")
+            try:
+                save_game(colony, path, binary=binary)
+                loaded = load_game(path)
+                self.assertGreater(loaded.state_version(), saved_version)
+                # The state at the saved version is not in the new log
+                self.assertIsNone(loaded.versions.patch_since(loaded, saved_version))
+            finally:
+                shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    unittest.main()
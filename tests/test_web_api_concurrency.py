@@ -0,0 +1,101 @@
+import asyncio
+import importlib
+import importlib.util
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+HAVE_SERVER_DEPS = all(importlib.util.find_spec(name) for name in ("fastapi", "httpx"))
+
+MINE_COST = 50.0
+AFFORDABLE_MINES = 20
+REQUESTS_PER_COLONY = 100
+
+
+@unittest.skipUnless(HAVE_SERVER_DEPS, "pip install -r requirements-dev.txt for the API tests")
+class TestConcurrentBuilds(unittest.IsolatedAsyncioTestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.mkdtemp()
+        cls.environ = mock.patch.dict(os.environ, {
+            "COLONY_SNAPSHOT_PATH": os.path.join(cls.directory, "snapshot.sav"),
+            "COLONY_STORE_PATH": os.path.join(cls.directory, "colonies.db"),
+            "COLONY_SIM_SPEED": "1e-9", # Nothing is produced while the test runs
+        })
+        cls.environ.start()
+        cls.web_api = importlib.import_module("web_api")
+        cls.web_api.open_sessions()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.web_api.close_sessions()
+        cls.environ.stop()
+        shutil.rmtree(cls.directory)
+
+    async def test_concurrent_builds_spend_each_mineral_once(self):
+        import httpx
+
+        web_api = self.web_api
+        transport = httpx.ASGITransport(app=web_api.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.post("/colonies", json={"id": "stress", "seed": 1})
+            self.assertEqual(response.status_code, 200)
+            colonies = [web_api.colony, web_api.sessions.resident("stress").colony]
+            buildings_before = []
+            for colony in colonies:
+                colony.resources["Minerals"] = MINE_COST * AFFORDABLE_MINES + 25.0
+                buildings_before.append(len(colony.buildings))
+
+            # Both colonies at once, so one colony's lock does not serialize the other
+            requests = []
+            for _ in range(REQUESTS_PER_COLONY):
+                requests.append(client.post("/build", json={"building": "Mine"}))
+                requests.append(client.post("/colonies/stress/build", json={"building": "Mine"}))
+            responses = await asyncio.gather(*requests)
+
+        self.assertTrue(all(response.status_code == 200 for response in responses))
+        for offset, colony, before in zip((0, 1), colonies, buildings_before):
+            successes = sum(response.json()["success"] for response in responses[offset::2])
+            self.assertEqual(successes, AFFORDABLE_MINES)
+            self.assertEqual(len(colony.buildings) - before, AFFORDABLE_MINES)
+            self.assertAlmostEqual(colony.resources["Minerals"], 25.0)
+
+    async def test_etag_survives_accrual(self):
+        import httpx
+
+        transport = httpx.ASGITransport(app=self.web_api.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            await client.post("/colonies", json={"id": "etag", "seed": 2})
+            first = await client.get("/colonies/etag/state")
+            etag = first.headers["ETag"]
+            # Resources and elapsed time moved on, but nothing happened
+            again = await client.get("/colonies/etag/state", headers={"If-None-Match": etag})
+            self.assertEqual(again.status_code, 304)
+            await client.post("/colonies/etag/build", json={"building": "Mine"})
+            changed = await client.get("/colonies/etag/state", headers={"If-None-Match": etag})
+            self.assertEqual(changed.status_code, 200)
+            self.assertNotEqual(changed.headers["ETag"], etag)
+            response = await client.post("/colonies/etag/commands",
+                                         json={"commands": [{"action": "build", "building": "Mine"}], "since": True})
+            self.assertEqual(response.status_code, 400)
+            state = (await client.get("/colonies/etag/state")).json()
+            self.assertEqual(len(state["buildings"]), 1) # The rejected batch was not applied
+
+    async def test_malformed_goals_are_rejected(self):
+        import httpx
+
+        transport = httpx.ASGITransport(app=self.web_api.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            await client.post("/colonies", json={"id": "goals", "seed": 3})
+            # Raw bodies, since httpx will not encode an infinite amount
+            for goal in ('{"resource": ["Energy"]}', '{"resource": "Energy", "amount": "nan"}',
+                         '{"resource": "Energy", "amount": 1e999}', '{"resource": "Energy", "amount": true}'):
+                response = await client.post("/colonies/goals/plan", content='{"goal": %s}' % goal,
+                                             headers={"Content-Type": "application/json"})
+                self.assertEqual(response.status_code, 400, goal)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,109 +1,657 @@
-from fastapi import FastAPI, BackgroundTasks, HTTPException
+from fastapi import FastAPI, HTTPException, Header, Response, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse, StreamingResponse
+import asyncio
+import json
+import math
+import os
+import threading
 import time
+import weakref
+from contextlib import contextmanager
 from colony import Colony
-from game import (
-    generate_resources,
-    build_structure,
-    trigger_random_event,
-    AVAILABLE_EVENT_CLASSES,
-    resolve_major_event,
-    BUILDING_CLASSES,
-)
-from research import RESEARCH_PROJECTS
+from game import AccrualClock, load_game, seconds_until_event
+from planner import plan_route, DEFAULT_TIME_BUDGET
+from snapshotter import Snapshotter, DEFAULT_SNAPSHOT_INTERVAL
+from event_schedule import EventSchedule
+from colony_store import ColonyStore
+from colony_sessions import ColonySession, SessionCache, UnknownColonyError, DEFAULT_MAX_COLONIES
+from colony_updates import UpdateHub, DEFAULT_PUSH_RATE
+import colony_commands
+from colony_commands import CommandError
+
+# Upper bound on the search time a client may request from /plan.
+MAX_PLAN_TIME_BUDGET = 5.0
+# Longest a client may wait on /affordable/next before getting an answer.
+MAX_LONG_POLL_SECONDS = 60.0
+# Longest the event timer sleeps, so colonies created meanwhile are picked up.
+MAX_EVENT_TIMER_SLEEP = 1.0
+# WebSocket close code for a stream of a colony that does not exist.
+WS_UNKNOWN_COLONY = 4404
+# Wall-clock seconds the event timer wakes a colony after its event is due,
+# so rounding never wakes it just before and makes it sleep again.
+EVENT_TIMER_SLACK = 0.01
+
+SIM_SPEED = float(os.environ.get("COLONY_SIM_SPEED", "1"))
+# The default colony (the routes without /colonies/{id}) is snapshotted here
+# periodically and resumed from it on restart.
+SNAPSHOT_PATH = os.environ.get("COLONY_SNAPSHOT_PATH", "colony_snapshot.sav")
+SNAPSHOT_INTERVAL = float(os.environ.get("COLONY_SNAPSHOT_INTERVAL", DEFAULT_SNAPSHOT_INTERVAL))
+# Colonies under /colonies/{id} live in this SQLite store; at most
+# COLONY_SESSION_MAX of them (and COLONY_SESSION_MAX_BYTES estimated bytes,
+# if set) stay in memory.
+COLONY_STORE_PATH = os.environ.get("COLONY_STORE_PATH", "colonies.db")
+SESSION_MAX_COLONIES = int(os.environ.get("COLONY_SESSION_MAX", DEFAULT_MAX_COLONIES))
+SESSION_MAX_BYTES = int(os.environ.get("COLONY_SESSION_MAX_BYTES", "0")) or None
 
 app = FastAPI()
 
-colony = Colony()
-last_update = time.time()
-current_major_event = None
+# Credit the time the server was down, like a resumed CLI session.
+colony = load_game(SNAPSHOT_PATH, catch_up=True) or Colony()
+clock = AccrualClock(speed=SIM_SPEED)
+# Held while a request works on the default colony (on a worker thread, see
+# run_on_colony) and briefly by the snapshotter while it copies the state.
+state_lock = threading.RLock()
+default_session = ColonySession("default", colony, clock=clock, lock=state_lock)
+scheduler = default_session.scheduler
+snapshotter = Snapshotter(colony, SNAPSHOT_PATH, state_lock, SNAPSHOT_INTERVAL,
+                          last_update=lambda: default_session.last_update)
+
+# The colony store and its session cache; opened by the startup hook, not on import.
+store = None
+sessions = None
+
+# Wall-clock time each colony's next random event or alert deadline is due,
+# so the server only wakes up a colony when something happens to it. Keyed
+# by COLONY_KEY for the default colony and ("colony", id) for the others.
+COLONY_KEY = "default"
+event_schedule = EventSchedule()
+schedule_lock = threading.Lock() # Requests reschedule from worker threads
+server_tasks = []
+timer_tasks = set() # Wake-ups in flight; a busy colony does not hold up the others
+# One asyncio lock per colony key, alive while some request holds or awaits it
+colony_locks = weakref.WeakValueDictionary()
+
+
+def open_sessions():
+    """Opens the colony store at COLONY_STORE_PATH and the session cache on top of it."""
+    global store, sessions
+    store = ColonyStore(COLONY_STORE_PATH)
+    sessions = SessionCache(store, SESSION_MAX_COLONIES, SESSION_MAX_BYTES, SIM_SPEED)
+
+
+def close_sessions():
+    """Writes changed colonies back and closes the store."""
+    sessions.flush(wait=True)
+    store.close()
+
+
+@app.on_event("startup")
+async def start_background_tasks():
+    open_sessions()
+    snapshotter.start()
+    server_tasks.append(asyncio.create_task(run_event_timer()))
+    server_tasks.append(asyncio.create_task(run_session_flusher()))
+
+
+@app.on_event("shutdown")
+async def stop_background_tasks():
+    for task in server_tasks + list(timer_tasks):
+        task.cancel()
+    snapshotter.stop(final_snapshot=True)
+    close_sessions()
+
+
+def schedule_events(key, session):
+    """(Re)schedules a colony's next event or alert deadline in wall-clock time."""
+    with session.lock:
+        session_colony = session.colony
+        colony_seconds = seconds_until_event(session_colony)
+        deadline = session_colony.pending_major_events.next_deadline()
+        if deadline is not None:
+            colony_seconds = min(colony_seconds, max(0.0, deadline - session_colony.elapsed_time))
+        due = time.time() + colony_seconds / session.clock.speed + EVENT_TIMER_SLACK
+    with schedule_lock:
+        event_schedule.push(key, due)
+
+
+async def run_event_timer():
+    """
+    Sleeps until the next scheduled event or alert deadline is due, then
+    advances that colony so it happens even if no client is polling. A
+    client request that advanced the colony in the meantime only makes the
+    wake-up early, which just reschedules. Evicted colonies are skipped;
+    loading them again credits their events.
+    """
+    schedule_events(COLONY_KEY, default_session)
+    while True:
+        with schedule_lock:
+            next_due = event_schedule.next_due()
+        wait = MAX_EVENT_TIMER_SLEEP if next_due is None else next_due - time.time()
+        await asyncio.sleep(min(max(0.0, wait), MAX_EVENT_TIMER_SLEEP))
+        with schedule_lock:
+            due = event_schedule.pop_due(time.time())
+        for key in due:
+            task = asyncio.create_task(_advance_resident(key))
+            timer_tasks.add(task)
+            task.add_done_callback(timer_tasks.discard)
+
+
+async def _advance_resident(key):
+    session = default_session if key == COLONY_KEY else sessions.resident(key[1])
+    if session is not None:
+        async with colony_lock(key):
+            await asyncio.to_thread(_advance_session, key, session)
+        updates.notify(key)
+
+
+def _advance_session(key, session):
+    with session.lock:
+        if session.evicted:
+            return
+        session.advance()
+    schedule_events(key, session)
+
+
+async def run_session_flusher():
+    """Writes changed colonies to the store every SNAPSHOT_INTERVAL seconds."""
+    while True:
+        await asyncio.sleep(SNAPSHOT_INTERVAL)
+        await asyncio.to_thread(sessions.flush)
+
+
+def colony_lock(key):
+    lock = colony_locks.get(key)
+    if lock is None:
+        lock = colony_locks[key] = asyncio.Lock()
+    return lock
+
+
+async def run_on_colony(key, action, notify=True):
+    """
+    Returns action(session) for the colony with this key (locked and
+    advanced to now). Requests for one colony wait their turn on its asyncio
+    lock without tying up a thread, then run one at a time on a worker
+    thread, so the event loop never blocks on a colony's lock and requests
+    for different colonies run in parallel. Afterwards the colony's stream
+    subscribers are sent the change unless notify is False.
+    """
+    async with colony_lock(key):
+        result = await asyncio.to_thread(_run_locked, key, action)
+    if notify:
+        updates.notify(key)
+    return result
+
+
+def _run_locked(key, action):
+    open_session = default_colony if key == COLONY_KEY else lambda: colony_session(key[1])
+    with open_session() as session:
+        return action(session)
+
+
+def on_default_colony(action):
+    return run_on_colony(COLONY_KEY, action)
+
+
+def on_colony(colony_id, action):
+    return run_on_colony(("colony", colony_id), action)
+
+
+# Pushes updates to /ws and /sse subscribers; building them does not count as a change
+updates = UpdateHub(lambda key, action: run_on_colony(key, action, notify=False))
+
+
+@contextmanager
+def default_colony():
+    """The default colony's session, locked and advanced to now."""
+    with state_lock:
+        default_session.advance()
+        yield default_session
+    schedule_events(COLONY_KEY, default_session)
+
+
+@contextmanager
+def colony_session(colony_id):
+    """The session of colony_id, locked and advanced to now; 404 if there is no such colony."""
+    try:
+        with sessions.use(colony_id) as session:
+            yield session
+    except UnknownColonyError:
+        raise HTTPException(status_code=404, detail="Unknown colony")
+    schedule_events(("colony", colony_id), session)
+
+
+def _state(session, since=None, if_none_match=None):
+    """
+    The colony's state, with its discrete version as a weak ETag (see
+    state_versions.py); 304 when If-None-Match already names it, i.e.
+    nothing happened to the colony since the client's copy and its
+    resources only accrued. With `since`, the response is {"version",
+    "patch"}: a JSON Patch from the client's copy at that version, or
+    {"version", "state"} if the version is too old for one.
+    """
+    colony = session.colony
+    etag = f'W/"{colony.discrete_version()}"'
+    headers = {"ETag": etag}
+    if if_none_match and _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    if since is None:
+        return JSONResponse(colony.to_dict(), headers=headers)
+    return JSONResponse(_state_or_patch(colony, since), headers=headers)
+
+
+def _state_or_patch(colony, since):
+    """{"version", "patch"} from version `since` if the version log still has it, else {"version", "state"}."""
+    _check_since(since)
+    patch = None
+    if since is not None:
+        patch = colony.versions.patch_since(colony, since)
+    if patch is None:
+        return {"version": colony.state_version(), "state": colony.to_dict()}
+    return {"version": colony.state_version(), "patch": patch}
+
+
+def _check_since(since):
+    if since is not None and (isinstance(since, bool) or not isinstance(since, int)): # bool is an int subclass
+        raise HTTPException(status_code=400, detail="since must be an integer version")
+
+
+def _etag_matches(if_none_match, etag):
+    """Weak comparison, as If-None-Match uses."""
+    etag = etag.removeprefix("W/")
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or any(tag.removeprefix("W/") == etag for tag in tags)
+
+
+def _command(session, command, data):
+    """Runs one colony_commands command and answers with its result and the new state."""
+    try:
+        result = command(session.colony, data)
+    except CommandError as e:
+        raise HTTPException(status_code=e.status, detail=str(e))
+    result["state"] = session.colony.to_dict()
+    return result
+
+
+def _build(session, data):
+    return _command(session, colony_commands.build, data)
+
+
+def _upgrade(session, data):
+    return _command(session, colony_commands.upgrade, data)
+
+
+def _research(session, data):
+    return _command(session, colony_commands.research, data)
+
+
+def _commands(session, data):
+    """
+    Runs a batch of commands (see colony_commands.run_batch) and answers
+    with the per-command results and one final state, or a JSON Patch
+    when the client sent the version of its copy as "since".
+    """
+    _check_since(data.get("since")) # Before anything is applied
+    try:
+        committed, results = colony_commands.run_batch(
+            session.colony, data.get("commands"), data.get("mode", colony_commands.ATOMIC)
+        )
+    except CommandError as e:
+        raise HTTPException(status_code=e.status, detail=str(e))
+    response = {"committed": committed, "results": results}
+    response.update(_state_or_patch(session.colony, data.get("since")))
+    return response
+
+
+def _plan(session, data):
+    goal = data.get("goal")
+    if not isinstance(goal, dict):
+        raise HTTPException(status_code=400, detail="Missing goal")
+    try:
+        time_budget = float(data.get("time_budget", DEFAULT_TIME_BUDGET))
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="time_budget must be a number")
+    # min() lets NaN through, and a NaN deadline never passes
+    if not math.isfinite(time_budget) or time_budget < 0:
+        raise HTTPException(status_code=400, detail="time_budget must be a finite number of seconds, at least 0")
+    time_budget = min(time_budget, MAX_PLAN_TIME_BUDGET)
+    try:
+        return plan_route(session.colony, goal, time_budget)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def _option_dict(scheduler, key):
+    """The option as the API shows it; an upgrade group resolves to one building's index."""
+    resolved = scheduler.resolve(key)
+    return {"action": key[0], "target": None if resolved is None else resolved[1]}
+
+
+def _check_unlock(session, option):
+    """
+    Returns (seconds, option, shown, state): the state if `option` is
+    affordable now, else the next option to unlock and the wall-clock
+    seconds until then (option None if nothing will unlock at current
+    rates). `shown` is the option resolved for the response, under the
+    colony's lock.
+    """
+    scheduler = session.scheduler
+    if option is not None and scheduler.is_affordable(option):
+        return 0.0, option, _option_dict(scheduler, option), session.colony.to_dict()
+    next_unlock = scheduler.next_unlock()
+    if next_unlock is None:
+        return None, None, None, None
+    colony_seconds, option = next_unlock
+    return colony_seconds / session.clock.speed, option, _option_dict(scheduler, option), None
+
+
+async def _next_affordable(key, timeout):
+    """
+    Long-polls the colony with this key until the option that unlocks next
+    is affordable, or `timeout` seconds pass. Every wake-up re-checks the
+    colony under its lock, and a change to the colony (a build, an event)
+    wakes the poll early since it can move the unlock either way.
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + min(max(timeout, 0.0), MAX_LONG_POLL_SECONDS)
+    option = None
+    while True:
+        seconds, option, shown, state = await run_on_colony(key, lambda session: _check_unlock(session, option), notify=False)
+        if state is not None:
+            return {"option": shown, "state": state}
+        if option is None:
+            return {"option": None, "seconds": None}
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            return {"option": None, "timed_out": True, "next": dict(shown, seconds=seconds)}
+        await updates.wait_for_change(key, min(seconds, remaining))
+
+
+def _list_events(session):
+    now = session.colony.elapsed_time
+    return {"events": [entry.to_dict(now) for entry in session.colony.pending_major_events.entries()]}
 
 
-def update_resources():
-    """Generate resources based on real time elapsed."""
-    global last_update
-    now = time.time()
-    elapsed = now - last_update
-    if elapsed > 0:
-        generate_resources(colony, elapsed)
-    last_update = now
+def _resolve_event(session, event_id, data):
+    return _command(session, colony_commands.resolve_event, dict(data, event_id=event_id))
+
+
+def _event(session, data):
+    if data and data.get("choice"):
+        # By the id the client was shown: a more urgent alert may have arrived since
+        if "id" not in data:
+            raise HTTPException(status_code=400, detail="Missing id of the event to resolve")
+        return _resolve_event(session, data["id"], data)
+    entry = session.colony.pending_major_events.peek()
+    if entry:
+        return {"event": entry.to_dict(session.colony.elapsed_time)}
+    return {"state": session.colony.to_dict()}
 
 
 @app.get("/state")
-def get_state(background_tasks: BackgroundTasks):
-    """Return current colony state."""
-    background_tasks.add_task(update_resources)
-    return colony.to_dict()
+async def get_state(since: int | None = None, if_none_match: str | None = Header(None)):
+    """Return current colony state.
+
+    Sends an ETag and answers If-None-Match with 304 while nothing changed;
+    `since=<version>` returns only a JSON Patch from that version.
+    """
+    return await on_default_colony(lambda session: _state(session, since, if_none_match))
 
 
 @app.post("/build")
-def build(data: dict, background_tasks: BackgroundTasks):
-    """Construct a building by name."""
-    background_tasks.add_task(update_resources)
-    name = data.get("building")
-    if not name:
-        raise HTTPException(status_code=400, detail="Missing building name")
-    cls = BUILDING_CLASSES.get(name)
-    if not cls:
-        raise HTTPException(status_code=400, detail="Unknown building")
-    success = build_structure(colony, cls)
-    return {"success": success, "state": colony.to_dict()}
+async def build(data: dict):
+    """Construct a building by name. An optional "count" builds several at once."""
+    return await on_default_colony(lambda session: _build(session, data))
 
 
 @app.post("/upgrade")
-def upgrade(data: dict, background_tasks: BackgroundTasks):
-    """Upgrade a building by index."""
-    background_tasks.add_task(update_resources)
-    if "index" not in data:
-        raise HTTPException(status_code=400, detail="Missing index")
-    index = int(data["index"])
-    success = colony.upgrade_building(index)
-    return {"success": success, "state": colony.to_dict()}
+async def upgrade(data: dict):
+    """Upgrade a building by index. An optional "target_level" upgrades several levels at once."""
+    return await on_default_colony(lambda session: _upgrade(session, data))
 
 
 @app.post("/research")
-def research(data: dict, background_tasks: BackgroundTasks):
+async def research(data: dict):
     """Research a technology project."""
-    background_tasks.add_task(update_resources)
-    project_id = data.get("project_id")
-    if not project_id:
-        raise HTTPException(status_code=400, detail="Missing project_id")
-    if project_id not in RESEARCH_PROJECTS:
-        raise HTTPException(status_code=400, detail="Invalid project_id")
-    success = colony.research_project(project_id)
-    return {"success": success, "state": colony.to_dict()}
+    return await on_default_colony(lambda session: _research(session, data))
+
+
+@app.post("/plan")
+async def plan(data: dict):
+    """Plan a build/upgrade/research route to a goal.
+
+    The goal is {"resource": name, "amount": x}, {"building": name} or
+    {"research": project_id}; "time_budget" caps the search in seconds.
+    """
+    return await on_default_colony(lambda session: _plan(session, data))
+
+
+@app.post("/commands")
+async def run_commands(data: dict):
+    """
+    Apply an ordered list of commands under one lock, e.g.
+    {"commands": [{"action": "build", "building": "Mine"},
+                  {"action": "upgrade", "index": 0},
+                  {"action": "research", "project_id": "..."},
+                  {"action": "resolve", "event_id": 1, "choice": "brace"}],
+     "mode": "atomic" | "best_effort", "since": <version>}.
+
+    Atomic batches are applied only if every command succeeds. Answers
+    with "committed", one result per command and the final state (a JSON
+    Patch with "since").
+    """
+    return await on_default_colony(lambda session: _commands(session, data))
+
+
+@app.get("/affordable/next")
+async def next_affordable(timeout: float = 30.0):
+    """Long-poll until the next build/upgrade/research option becomes affordable.
+
+    Returns as soon as that happens (or after `timeout` seconds) instead of
+    making clients poll /state.
+    """
+    return await _next_affordable(COLONY_KEY, timeout)
+
+
+@app.get("/events")
+async def list_events():
+    """Major events awaiting a decision, most urgent first, with their deadlines."""
+    return await on_default_colony(lambda session: _list_events(session))
+
+
+@app.post("/events/{event_id}/resolve")
+async def resolve_event(event_id: int, data: dict):
+    """Resolve one queued major event by id with {"choice": key}."""
+    return await on_default_colony(lambda session: _resolve_event(session, event_id, data))
 
 
 @app.post("/event")
-def event(data: dict | None = None, background_tasks: BackgroundTasks = None):
-    """Trigger or resolve events."""
-    background_tasks.add_task(update_resources)
-    global current_major_event
-    choice = None
-    if data:
-        choice = data.get("choice")
-
-    if current_major_event and choice:
-        resolve_major_event(colony, current_major_event, choice)
-        current_major_event = None
-        return {"state": colony.to_dict()}
-
-    if current_major_event:
-        return {
-            "event": {
-                "name": current_major_event.name,
-                "description": current_major_event.description,
-                "choices": current_major_event.choices,
-            }
-        }
-
-    event_instance = trigger_random_event(colony, AVAILABLE_EVENT_CLASSES)
-    if event_instance and event_instance.is_major:
-        current_major_event = event_instance
-        return {
-            "event": {
-                "name": event_instance.name,
-                "description": event_instance.description,
-                "choices": event_instance.choices,
-            }
-        }
-    return {"state": colony.to_dict()}
+async def event(data: dict | None = None):
+    """
+    Show the most urgent pending major event, or resolve the one shown with
+    {"id": id, "choice": key}. Events are raised by the colony's own event
+    schedule, not by calling this endpoint; see /events for the whole queue.
+    """
+    return await on_default_colony(lambda session: _event(session, data))
+
+
+@app.get("/snapshot/stats")
+async def snapshot_stats():
+    """Timings of the last background snapshot (lock pause and write time)."""
+    return snapshotter.stats()
+
+
+# Session-scoped colonies: the same routes under /colonies/{colony_id}.
+
+@app.post("/colonies")
+async def create_colony(data: dict | None = None):
+    """Start a new colony. Optional "id" (default: a random one) and "seed"."""
+    data = data or {}
+    return await asyncio.to_thread(_create_colony, data.get("id"), data.get("seed"))
+
+
+def _create_colony(colony_id, seed):
+    try:
+        session = sessions.create(colony_id, seed)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    schedule_events(("colony", session.colony_id), session)
+    with session.lock:
+        return {"id": session.colony_id, "state": session.colony.to_dict()}
+
+
+@app.delete("/colonies/{colony_id}")
+async def delete_colony(colony_id: str):
+    key = ("colony", colony_id)
+    async with colony_lock(key):
+        deleted = await asyncio.to_thread(sessions.delete, colony_id)
+    if not deleted:
+        raise HTTPException(status_code=404, detail="Unknown colony")
+    with schedule_lock:
+        event_schedule.remove(key)
+    updates.close(key)
+    return {"deleted": colony_id}
+
+
+@app.get("/colonies/{colony_id}/state")
+async def colony_state(colony_id: str, since: int | None = None, if_none_match: str | None = Header(None)):
+    return await on_colony(colony_id, lambda session: _state(session, since, if_none_match))
+
+
+@app.post("/colonies/{colony_id}/build")
+async def colony_build(colony_id: str, data: dict):
+    return await on_colony(colony_id, lambda session: _build(session, data))
+
+
+@app.post("/colonies/{colony_id}/upgrade")
+async def colony_upgrade(colony_id: str, data: dict):
+    return await on_colony(colony_id, lambda session: _upgrade(session, data))
+
+
+@app.post("/colonies/{colony_id}/research")
+async def colony_research(colony_id: str, data: dict):
+    return await on_colony(colony_id, lambda session: _research(session, data))
+
+
+@app.post("/colonies/{colony_id}/plan")
+async def colony_plan(colony_id: str, data: dict):
+    return await on_colony(colony_id, lambda session: _plan(session, data))
+
+
+@app.post("/colonies/{colony_id}/commands")
+async def colony_run_commands(colony_id: str, data: dict):
+    return await on_colony(colony_id, lambda session: _commands(session, data))
+
+
+@app.get("/colonies/{colony_id}/affordable/next")
+async def colony_next_affordable(colony_id: str, timeout: float = 30.0):
+    return await _next_affordable(("colony", colony_id), timeout)
+
+
+@app.get("/colonies/{colony_id}/events")
+async def colony_events(colony_id: str):
+    return await on_colony(colony_id, lambda session: _list_events(session))
+
+
+@app.post("/colonies/{colony_id}/events/{event_id}/resolve")
+async def colony_resolve_event(colony_id: str, event_id: int, data: dict):
+    return await on_colony(colony_id, lambda session: _resolve_event(session, event_id, data))
+
+
+@app.post("/colonies/{colony_id}/event")
+async def colony_event(colony_id: str, data: dict | None = None):
+    return await on_colony(colony_id, lambda session: _event(session, data))
+
+
+async def _stream_websocket(websocket, key, rate):
+    try:
+        await run_on_colony(key, lambda session: None, notify=False)
+    except HTTPException:
+        await websocket.close(code=WS_UNKNOWN_COLONY)
+        return
+    await websocket.accept()
+    subscriber = updates.subscribe(key, rate)
+    disconnected = asyncio.create_task(_receive_rates(websocket, subscriber))
+    try:
+        await websocket.send_text(json.dumps({"type": "hello", "rate": subscriber.rate}))
+        while True:
+            next_message = asyncio.ensure_future(subscriber.next_message())
+            await asyncio.wait({next_message, disconnected}, return_when=asyncio.FIRST_COMPLETED)
+            if not next_message.done(): # The client went away
+                next_message.cancel()
+                return
+            message = next_message.result()
+            if message is None: # The colony was deleted
+                await websocket.close()
+                return
+            await websocket.send_text(message)
+    except (WebSocketDisconnect, RuntimeError): # Send after the client went away
+        pass
+    finally:
+        disconnected.cancel()
+        updates.unsubscribe(key, subscriber)
+
+
+async def _receive_rates(websocket, subscriber):
+    """Applies {"rate": x} messages from the client until it disconnects."""
+    try:
+        while True:
+            try:
+                subscriber.set_rate(float(json.loads(await websocket.receive_text())["rate"]))
+            except (ValueError, TypeError, KeyError):
+                continue # Not a rate change; ignored
+    except WebSocketDisconnect:
+        pass
+
+
+def _stream_sse(key, rate):
+    subscriber = updates.subscribe(key, rate)
+
+    async def stream():
+        try:
+            yield f"data: {json.dumps({'type': 'hello', 'rate': subscriber.rate})}\n\n"
+            while (message := await subscriber.next_message()) is not None:
+                yield f"data: {message}\n\n"
+        finally:
+            updates.unsubscribe(key, subscriber)
+
+    return StreamingResponse(stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+
+@app.websocket("/ws")
+async def stream_websocket(websocket: WebSocket, rate: float = DEFAULT_PUSH_RATE):
+    """
+    Streams the default colony: {"type": "hello", "rate"} with the
+    negotiated tick rate, the full state, then JSON Patch updates at `rate`
+    per second and whenever the colony changes. Send {"rate": x} to change
+    the rate. Pending major events come as "alerts" when they change.
+    """
+    await _stream_websocket(websocket, COLONY_KEY, rate)
+
+
+@app.get("/sse")
+async def stream_sse(rate: float = DEFAULT_PUSH_RATE):
+    """The /ws stream as Server-Sent Events, for clients without WebSockets."""
+    return _stream_sse(COLONY_KEY, rate)
+
+
+@app.websocket("/colonies/{colony_id}/ws")
+async def colony_stream_websocket(websocket: WebSocket, colony_id: str, rate: float = DEFAULT_PUSH_RATE):
+    await _stream_websocket(websocket, ("colony", colony_id), rate)
+
+
+@app.get("/colonies/{colony_id}/sse")
+async def colony_stream_sse(colony_id: str, rate: float = DEFAULT_PUSH_RATE):
+    await run_on_colony(("colony", colony_id), lambda session: None, notify=False) # 404 before the stream starts
+    return _stream_sse(("colony", colony_id), rate)
+
+
+@app.get("/streams/metrics")
+async def stream_metrics():
+    """Open update streams and how many messages were built for them."""
+    return updates.metrics()
+
+
+@app.get("/sessions/metrics")
+async def session_metrics():
+    """Hits, misses and evictions of the in-memory colony cache, for sizing it."""
+    return sessions.metrics()